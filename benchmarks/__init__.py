@@ -0,0 +1,7 @@
+# benchmarks/__init__.py
+"""
+Offline benchmark suite (no network):
+- generate: synthetic creator CSVs (10k / 100k / 1M rows)
+- server: local HTTP stand-in simulating many websites (latency, 403/429, redirects, page sizes)
+- run: end-to-end run reporting rows/s, pages/s and peak RSS per stage against baseline.json
+"""
@@ -0,0 +1,109 @@
+# benchmarks/generate.py
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator
+
+# Preset sizes for `python -m benchmarks.generate <size>` and `python -m benchmarks.run --size`.
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Virtual hosts served by benchmarks.server; ".invalid" never resolves (RFC 2606), so a
+# misrouted request fails instead of hitting a real site.
+HOST_SUFFIX = "bench.invalid"
+
+COLUMNS = ("username", "nickname", "followers", "bio_text", "bio_links", "description", "detected_emails")
+
+_WORDS = (
+    "daily", "vlogs", "recipes", "fitness", "coach", "travel", "beauty", "tips", "music",
+    "producer", "gaming", "streams", "fashion", "art", "digital", "creator", "paris", "lyon",
+    "collabs", "welcome", "new", "videos", "every", "week", "shop", "handmade", "official",
+)
+_SOCIAL_LINKS = ("https://instagram.com/{u}", "https://www.tiktok.com/@{u}", "https://youtube.com/@{u}")
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """
+    Shape of a synthetic creator export (rates are per row, independent):
+    - detected_email_rate: detected_emails filled (resolved by local enrichment)
+    - bio_email_rate: email written in bio_text
+    - bio_link_rate: own website in bio_links (crawl candidate); social links otherwise
+    - text_url_rate: website only mentioned in bio_text / description
+    - hosts: number of distinct websites; rows share them, as creators of one agency do
+    """
+    rows: int = 10_000
+    seed: int = 42
+    detected_email_rate: float = 0.15
+    bio_email_rate: float = 0.10
+    bio_link_rate: float = 0.45
+    text_url_rate: float = 0.15
+    hosts: int | None = None  # default: rows // 5
+
+    @property
+    def host_count(self) -> int:
+        return max(1, self.hosts if self.hosts is not None else self.rows // 5)
+
+
+def host_name(index: int) -> str:
+    return f"site{index}.{HOST_SUFFIX}"
+
+
+def generate_rows(cfg: GeneratorConfig) -> Iterator[Dict[str, str]]:
+    """Deterministic rows for a config (same seed -> same file)."""
+    rng = random.Random(cfg.seed)
+    for i in range(cfg.rows):
+        user = f"creator{i}"
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 16)))
+        host = host_name(rng.randrange(cfg.host_count))
+        row = {
+            "username": user,
+            "nickname": user.title(),
+            "followers": str(rng.randint(100, 2_000_000)),
+            "bio_text": words,
+            "bio_links": rng.choice(_SOCIAL_LINKS).format(u=user),
+            "description": "",
+            "detected_emails": "",
+        }
+        if rng.random() < cfg.detected_email_rate:
+            row["detected_emails"] = f"{user}@mail-{i % 97}.com"
+        if rng.random() < cfg.bio_email_rate:
+            row["bio_text"] += f" pro: {user}.pro@agency-{i % 31}.fr"
+        if rng.random() < cfg.bio_link_rate:
+            row["bio_links"] = f"https://{host}"
+        elif rng.random() < cfg.text_url_rate:
+            row[rng.choice(("bio_text", "description"))] += f" more on {host}/contact"
+        yield row
+
+
+def write_csv(path: Path, cfg: GeneratorConfig) -> Path:
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(generate_rows(cfg))
+    return path
+
+
+def parse_size(text: str) -> int:
+    """'10k' / '100k' / '1m' presets, or a plain row count."""
+    return SIZES[text.lower()] if text.lower() in SIZES else int(text)
+
+
+def main(argv: list[str] | None = None) -> None:
+    p = argparse.ArgumentParser(description="Generate a synthetic creator CSV for benchmarks.")
+    p.add_argument("size", type=parse_size, help="Rows: 10k, 100k, 1m or a number")
+    p.add_argument("-o", "--output", default=None, help="Output CSV (default: bench-<rows>.csv)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--hosts", type=int, default=None, help="Distinct websites (default rows / 5)")
+    args = p.parse_args(argv)
+
+    cfg = GeneratorConfig(rows=args.size, seed=args.seed, hosts=args.hosts)
+    out = write_csv(Path(args.output or f"bench-{args.size}.csv"), cfg)
+    print(f"Wrote {cfg.rows} rows ({cfg.host_count} hosts) to {out}")
+
+
+if __name__ == "__main__":
+    main()
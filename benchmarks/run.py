@@ -0,0 +1,171 @@
+# benchmarks/run.py
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict
+
+from benchmarks.generate import GeneratorConfig, parse_size, write_csv
+from benchmarks.server import BenchServer, SiteProfile
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Stages timed once per row (busy time summed over rows and threads); the others are phases.
+PER_ROW_STAGES = ("local", "discovery", "crawl")
+STAGE_ORDER = ("read", "local", "discovery", "crawl", "pipeline", "write", "stats")
+
+
+def run_benchmark(rows: int, concurrency: int, profile: SiteProfile, workdir: Path, seed: int = 42) -> Dict[str, Any]:
+    """Generate the input, run enrich.py against a BenchServer in a subprocess, return the summary."""
+    input_csv = write_csv(workdir / f"bench-{rows}.csv", GeneratorConfig(rows=rows, seed=seed))
+    metrics_path = workdir / "metrics.json"
+
+    with BenchServer(profile) as server:
+        cmd = [
+            sys.executable, "-m", "benchmarks.target", str(server.port),
+            str(input_csv), "-o", str(workdir / "out.csv"),
+            "--concurrency", str(concurrency),
+            "--progress", "off",
+            "--metrics-json", str(metrics_path),
+            "--metrics-interval", "0",
+        ]
+        started = time.perf_counter()
+        subprocess.run(cmd, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+        wall = time.perf_counter() - started
+
+    metrics = json.loads(metrics_path.read_text(encoding="utf-8"))
+    return summarize(metrics, rows, wall, concurrency)
+
+
+def summarize(metrics: Dict[str, Any], rows: int, wall: float, concurrency: int) -> Dict[str, Any]:
+    phases = metrics["phases"]
+    stages: Dict[str, Dict[str, Any]] = {}
+    for name in STAGE_ORDER:
+        p = phases.get(name)
+        if p is None:
+            continue
+        units = p["calls"] if name in PER_ROW_STAGES else rows
+        stages[name] = {
+            "seconds": round(p["seconds"], 3),
+            "rows_per_s": round(units / p["seconds"], 1) if p["seconds"] > 0 else None,
+            "max_rss_bytes": p.get("max_rss_bytes"),
+        }
+
+    pipeline_s = phases.get("pipeline", {}).get("seconds", 0.0)
+    pages = metrics["fetch"]["requests"]
+    return {
+        "rows": rows,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 3),
+        "rows_per_s": round(rows / wall, 1),
+        "pages": pages,
+        "pages_per_s": round(pages / pipeline_s, 1) if pipeline_s > 0 else None,
+        "peak_rss_bytes": max((s["max_rss_bytes"] or 0 for s in stages.values()), default=0),
+        "stages": stages,
+    }
+
+
+def _delta(current: float | None, base: float | None) -> float | None:
+    if not current or not base:
+        return None
+    return (current - base) / base
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any] | None, tolerance: float) -> list[str]:
+    """Names of the throughput figures (overall or per stage) more than `tolerance` below baseline."""
+    if baseline is None:
+        return []
+    regressions = []
+    for key in ("rows_per_s", "pages_per_s"):
+        d = _delta(result[key], baseline.get(key))
+        if d is not None and d < -tolerance:
+            regressions.append(key)
+    for name, stage in result["stages"].items():
+        d = _delta(stage["rows_per_s"], baseline.get("stages", {}).get(name, {}).get("rows_per_s"))
+        if d is not None and d < -tolerance:
+            regressions.append(f"{name}.rows_per_s")
+    return regressions
+
+
+def _mb(n: int | None) -> str:
+    return "-" if not n else f"{n / 1024 / 1024:.0f} MB"
+
+
+def _pct(d: float | None) -> str:
+    return "" if d is None else f"{d * 100:+.0f}%"
+
+
+def format_report(result: Dict[str, Any], baseline: Dict[str, Any] | None) -> str:
+    base = baseline or {}
+    lines = [
+        f"Rows: {result['rows']} | concurrency: {result['concurrency']} | wall: {result['wall_seconds']}s",
+        f"Overall: {result['rows_per_s']} rows/s {_pct(_delta(result['rows_per_s'], base.get('rows_per_s')))}"
+        f" | {result['pages_per_s']} pages/s {_pct(_delta(result['pages_per_s'], base.get('pages_per_s')))}"
+        f" | peak RSS {_mb(result['peak_rss_bytes'])}",
+        "",
+        f"{'stage':<10} {'seconds':>9} {'rows/s':>11} {'peak RSS':>9}  vs baseline",
+    ]
+    for name, s in result["stages"].items():
+        b = base.get("stages", {}).get(name, {})
+        lines.append(
+            f"{name:<10} {s['seconds']:>9.3f} {s['rows_per_s'] or 0:>11.1f} {_mb(s['max_rss_bytes']):>9}"
+            f"  {_pct(_delta(s['rows_per_s'], b.get('rows_per_s')))}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    p = argparse.ArgumentParser(description="Offline end-to-end benchmark of enrich.py.")
+    p.add_argument("--size", type=parse_size, default=10_000, help="Rows: 10k, 100k, 1m or a number (default 10k)")
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--latency-ms", default="20,200", help="Simulated server latency range 'min,max' (default 20,200)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON (default benchmarks/baseline.json)")
+    p.add_argument("--update-baseline", action="store_true", help="Store this result as the baseline for its size")
+    p.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop before failing (default 0.2)")
+    p.add_argument("--workdir", default=None, help="Keep generated input / output / metrics here")
+    args = p.parse_args(argv)
+
+    lo, hi = (int(x) for x in args.latency_ms.split(","))
+    profile = SiteProfile(latency_ms=(lo, hi), seed=args.seed)
+
+    if args.workdir:
+        workdir = Path(args.workdir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        result = run_benchmark(args.size, args.concurrency, profile, workdir, args.seed)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run_benchmark(args.size, args.concurrency, profile, Path(tmp), args.seed)
+
+    baseline_path = Path(args.baseline)
+    baselines = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    key = str(args.size)
+    baseline = baselines.get(key)
+
+    print(format_report(result, baseline))
+
+    if args.update_baseline:
+        result["recorded"] = {"date": date.today().isoformat(), "python": platform.python_version()}
+        baselines[key] = result
+        baseline_path.write_text(json.dumps(baselines, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline for {key} rows written to {baseline_path}")
+        return
+
+    regressions = compare(result, baseline, args.tolerance)
+    if baseline is None:
+        print(f"\nNo baseline for {key} rows (use --update-baseline to record one).")
+    elif regressions:
+        print(f"\nRegressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# benchmarks/server.py
+from __future__ import annotations
+
+import hashlib
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+
+from enricher import crawler
+
+
+@dataclass(frozen=True)
+class SiteProfile:
+    """
+    Behaviour of the simulated websites (drawn once per host, deterministically from its name):
+    - latency_ms: (min, max) server delay per response
+    - blocked_rate / throttled_rate: share of hosts answering 403 / 429 to everything
+    - redirect_rate: share of hosts whose homepage 301-redirects to /home
+    - page_kb: (min, max) HTML size, padded with filler text
+    - email_home_rate / email_contact_rate: share of hosts with an email on the homepage /
+      on /contact (the others have none)
+    """
+    latency_ms: Tuple[int, int] = (20, 200)
+    blocked_rate: float = 0.05
+    throttled_rate: float = 0.03
+    redirect_rate: float = 0.2
+    page_kb: Tuple[int, int] = (5, 60)
+    email_home_rate: float = 0.25
+    email_contact_rate: float = 0.35
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class Site:
+    latency: float
+    status: int  # 200, 403 or 429
+    redirect: bool
+    page_bytes: int
+    email_on: str  # "home", "contact" or ""
+
+
+def site_for(host: str, profile: SiteProfile) -> Site:
+    digest = hashlib.blake2b(f"{profile.seed}:{host}".encode(), digest_size=8).digest()
+    rng = random.Random(int.from_bytes(digest, "big"))
+    roll = rng.random()
+    status = 403 if roll < profile.blocked_rate else 429 if roll < profile.blocked_rate + profile.throttled_rate else 200
+    email_roll = rng.random()
+    email_on = (
+        "home" if email_roll < profile.email_home_rate
+        else "contact" if email_roll < profile.email_home_rate + profile.email_contact_rate
+        else ""
+    )
+    return Site(
+        latency=rng.uniform(*profile.latency_ms) / 1000.0,
+        status=status,
+        redirect=rng.random() < profile.redirect_rate,
+        page_bytes=rng.randint(*profile.page_kb) * 1024,
+        email_on=email_on,
+    )
+
+
+_FILLER = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</p>\n"
+
+
+def render_page(host: str, path: str, site: Site) -> str:
+    links = "".join(
+        f'<a href="https://{host}/{p}">{p}</a>\n' for p in ("contact", "about", "privacy", "blog")
+    )
+    email = ""
+    if (site.email_on == "home" and path in ("/", "/home")) or (site.email_on == "contact" and path == "/contact"):
+        email = f"<p>Business: hello@{host}</p>\n"
+    head = f"<html><head><title>{host}</title></head><body>\n<nav>{links}</nav>\n{email}"
+    filler = _FILLER * max(0, (site.page_bytes - len(head)) // len(_FILLER))
+    return head + filler + "</body></html>\n"
+
+
+class BenchServer:
+    """
+    Local HTTP stand-in for many websites: one ThreadingHTTPServer on 127.0.0.1 that
+    picks the site from the Host header. Pages: / (or /home after a redirect), /contact,
+    /about, /privacy, /blog; anything else is 404.
+    """
+
+    def __init__(self, profile: SiteProfile | None = None, port: int = 0) -> None:
+        self.profile = profile or SiteProfile()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 (http.server API)
+                with server._lock:
+                    server.requests += 1
+                host = (self.headers.get("Host") or "").split(":")[0].lower()
+                path = urlsplit(self.path).path or "/"
+                site = site_for(host, server.profile)
+                time.sleep(site.latency)
+
+                if site.status != 200:
+                    return self._send(site.status, "")
+                if path == "/" and site.redirect:
+                    return self._send(301, "", location=f"https://{host}/home")
+                if path not in ("/", "/home", "/contact", "/about", "/privacy", "/blog"):
+                    return self._send(404, "")
+                self._send(200, render_page(host, path, site))
+
+            def _send(self, code: int, body: str, location: str | None = None) -> None:
+                data = body.encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                if location:
+                    self.send_header("Location", location)
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the crawler gave up on this page (timeout or deadline)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "BenchServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="bench-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "BenchServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+class LocalAdapter(HTTPAdapter):
+    """
+    Transport adapter sending every request (http or https) to the local BenchServer,
+    keeping the original host in the Host header. Redirects come back with the virtual
+    host in Location and go through the adapter again.
+    """
+
+    def __init__(self, port: int, **kwargs: object) -> None:
+        self.port = port
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.headers["Host"] = parts.hostname or ""
+        request.url = urlunsplit(("http", f"127.0.0.1:{self.port}", parts.path or "/", parts.query, ""))
+        return super().send(request, **kwargs)
+
+
+def route_crawler_to(port: int) -> None:
+    """Make every CrawlState session created from now on talk to the BenchServer on `port`."""
+
+    def make_session(pool_size: int = 16):
+        session = crawler.requests.Session()
+        session.trust_env = False
+        adapter = LocalAdapter(port, pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    crawler.make_session = make_session
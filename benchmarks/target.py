@@ -0,0 +1,22 @@
+# benchmarks/target.py
+"""
+Run enrich.py with its crawler routed to a local BenchServer:
+
+    python -m benchmarks.target <port> <enrich.py arguments...>
+"""
+from __future__ import annotations
+
+import sys
+
+import enrich
+from benchmarks.server import route_crawler_to
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    route_crawler_to(int(argv[0]))
+    enrich.main(argv[1:])
+
+
+if __name__ == "__main__":
+    main()
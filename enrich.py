@@ -2,60 +2,494 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import dataclasses
+import functools
+import io
+import itertools
+import re
+import sys
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-
-import pandas as pd
-
-from enricher.io_utils import read_csv_robust, ensure_columns, write_csv_safe
-from enricher.extractors import enrich_row_local
-from enricher.discovery import DiscoveryConfig, discover_external_urls_from_row
-from enricher.urls import get_domain
-from enricher.crawler import crawl_for_email
-from enricher.stats import compute_stats, format_stats
-from enricher.io_utils import read_csv_robust, ensure_columns, write_csv_safe
-from enricher.extractors import enrich_row_local
-from enricher.crawler import crawl_for_email
-
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Mapping, TextIO
+
+from enricher.io_utils import (
+    compact_columns,
+    ensure_columns,
+    expand_inputs,
+    format_bytes,
+    memory_footprint,
+    read_csv_robust,
+    read_rows_robust,
+    write_csv_safe,
+    write_rows_safe,
+)
+from enricher.api import TODO_STATUSES, Enricher, EnricherConfig
+from enricher.metrics import Metrics, MetricsExporter
+from enricher.profiling import StageProfiler
+from enricher.pipeline import PipelineCounters, Record
+from enricher.planner import PLAN_LATENCY_SECONDS, CrawlPlanner, format_plan
+from enricher.progress import ProgressReporter
+from enricher.stats import RunStats, StatsTally, combine_stats, compute_stats, format_stats
+from enricher.streaming import read_records, write_record
+from enricher.constants import AUDIT_COLUMN_DEFAULTS, RESULT_COLUMN_DEFAULTS, SPECULATIVE_PATHS
+
+# pandas, requests and the crawler are heavy to import and not needed by every run:
+# pandas loads only for the pandas engine and split/merge, the crawler only when crawling.
+if TYPE_CHECKING:
+    import pandas as pd
+    from enricher.crawler import CrawlState
+
+# Phases made of the per-row stages (local, discovery, crawl), each profiled under its own name.
+STAGE_PHASES = ("pipeline", "stream")
+
+# --engine auto: inputs up to this size are read and written with the csv module (no pandas).
+PYTHON_ENGINE_MAX_BYTES = 2 * 1024 * 1024
+
+
+def __getattr__(name: str) -> Any:
+    """Lazy module attributes: crawl_for_email / CrawlState import the crawler on first use."""
+    if name in ("crawl_for_email", "CrawlState"):
+        from enricher import crawler
+
+        value = getattr(crawler, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="CSV email enricher (public-only, controlled discovery).")
-    p.add_argument("input_csv", help="Path to input CSV")
-    p.add_argument("-o", "--output", default=None, help="Output path (default: <input>_enriched.csv)")
+    p.add_argument(
+        "input_csv",
+        nargs="+",
+        help="Input CSV file(s), directories or glob patterns ('-' reads stdin in --stream mode)",
+    )
+    p.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Output path (default: <input>_enriched.csv; single input only)",
+    )
     p.add_argument("--in-sep", default=None, help="Input delimiter (auto if omitted)")
     p.add_argument("--out-sep", default=None, help="Output delimiter (defaults to input delimiter)")
     p.add_argument("--encoding", default="utf-8-sig", help="Input encoding (default utf-8-sig)")
 
     # performance + safety
     p.add_argument("--max-urls-per-row", type=int, default=2, help="Max external URLs retained per row (default 2)")
-    p.add_argument("--timeout", type=int, default=10, help="HTTP timeout seconds (default 10)")
+    p.add_argument("--timeout", type=int, default=10, help="HTTP read timeout seconds (default 10)")
     p.add_argument("--max-pages", type=int, default=3, help="Max pages per domain (default 3)")
+    p.add_argument("--connect-timeout", type=float, default=5.0, help="HTTP connect timeout seconds (default 5)")
+    p.add_argument(
+        "--domain-budget",
+        type=parse_duration,
+        default=None,
+        help="Total crawl time allowed for one website (domain) over the whole run, summed over every row "
+        "and start URL on it, e.g. 15 or 30s (default: no limit)",
+    )
+    p.add_argument(
+        "--row-budget",
+        type=parse_duration,
+        default=None,
+        help="Total crawl time allowed for one row, over all its URLs (default: no limit)",
+    )
+    p.add_argument(
+        "--adaptive-timeout",
+        type=float,
+        default=None,
+        metavar="MULT",
+        help="Cap read timeouts at MULT x the p95 latency seen so far in the run, e.g. 3 (default: off)",
+    )
+    p.add_argument(
+        "--sitemap",
+        action="store_true",
+        help="Read each website's sitemap.xml (once per domain) and crawl its contact / imprint / "
+        "legal pages first, within --max-pages",
+    )
+    p.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Fetch each website's start page and conventional contact paths (see --speculative-paths) "
+        "in one parallel wave (at most --max-pages) and stop at the first hit; guesses that miss do not count "
+        "towards --max-pages",
+    )
+    p.add_argument(
+        "--speculative-paths",
+        type=parse_paths,
+        default=SPECULATIVE_PATHS,
+        metavar="PATHS",
+        help=f"Comma-separated paths for --speculative (default {','.join(SPECULATIVE_PATHS)})",
+    )
+    p.add_argument(
+        "--archive",
+        default=None,
+        metavar="FILE",
+        help="Append every fetched page (URL, status, headers, body) to FILE as gzipped WARC records; "
+        "replay it later with 'enrich.py reextract FILE input.csv'",
+    )
+    p.add_argument(
+        "--race-urls",
+        action="store_true",
+        help="Crawl a row's candidate URLs concurrently and keep the first hit (a higher-priority "
+        "URL finishing shortly after still wins); all crawls stay within --concurrency",
+    )
+    p.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Re-fetches per page after a transient failure (connect error, read timeout, 5xx), "
+        "with jittered exponential backoff; 0 disables (default 2)",
+    )
+    p.add_argument(
+        "--retry-budget",
+        type=int,
+        default=None,
+        help="Max retries over the whole run; once spent, failures are final (default: unlimited)",
+    )
     p.add_argument("--no-crawl", action="store_true", help="Disable website crawling (local extraction + discovery only)")
     p.add_argument("--print-urls", action="store_true", help="Print unique detected external URLs")
+    p.add_argument(
+        "--plan",
+        action="store_true",
+        help="Dry run: local enrichment and discovery only, then print what the crawl would cost "
+        "(domains, max requests, cache hits, blocklisted domains, projected duration) and exit. "
+        "No network access, no output file",
+    )
+    p.add_argument(
+        "--plan-latency",
+        type=float,
+        default=PLAN_LATENCY_SECONDS,
+        metavar="SECONDS",
+        help=f"Seconds per page fetch assumed by --plan's projected duration (default {PLAN_LATENCY_SECONDS:g})",
+    )
     p.add_argument("--limit-rows", type=int, default=0, help="Process only first N rows (debug). 0 = all")
+    p.add_argument(
+        "--no-compact",
+        action="store_true",
+        help="Keep result columns as plain strings (no categoricals / Arrow strings)",
+    )
+
+    p.add_argument(
+        "--time-budget",
+        type=parse_duration,
+        default=None,
+        help="Wall-clock budget for the run, e.g. 1200, 20m, 1h. Crawls are ordered by expected "
+        "yield per second; rows not crawled in time get status 'skipped_budget'",
+    )
+
+    # streaming (pipeline use)
+    p.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read CSV/JSONL records and write one enriched JSON line per row to stdout as soon as it is decided",
+    )
+    p.add_argument(
+        "--in-format",
+        choices=("auto", "csv", "jsonl"),
+        default="auto",
+        help="Input format in --stream mode (default: auto)",
+    )
+    p.add_argument(
+        "--progress",
+        choices=("auto", "bar", "log", "off"),
+        default="auto",
+        help="Progress on stderr: bar (TTY), log (logfmt lines), off; auto picks bar on a TTY (default)",
+    )
+    p.add_argument(
+        "--progress-interval",
+        type=float,
+        default=None,
+        help="Seconds between progress updates (default 0.5 for bar, 10 for log)",
+    )
+    p.add_argument("--keep-order", action="store_true", help="In --stream mode, emit records in input order")
+    p.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Concurrent row crawls; also sizes the HTTP connection pool (default 8)",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Processes running local enrichment and discovery over chunks of rows; crawling "
+        "still overlaps. Same output as 1 (default 1)",
+    )
+    p.add_argument("--metrics-json", default=None, help="Write run metrics (phase timings, latency histograms) as JSON")
+    p.add_argument("--metrics-prom", default=None, help="Write run metrics as a Prometheus textfile-collector file")
+    p.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between metrics file refreshes during the run; 0 = only at the end (default 30)",
+    )
+    p.add_argument(
+        "--engine",
+        choices=("auto", "pandas", "python"),
+        default="auto",
+        help=(
+            "CSV engine: python (csv module, no pandas import) or pandas; "
+            f"auto uses python for inputs up to {PYTHON_ENGINE_MAX_BYTES // (1024 * 1024)} MB (default)"
+        ),
+    )
+    p.add_argument(
+        "--audit-columns",
+        action="store_true",
+        help="Add per-row crawl cost columns: crawl_pages, crawl_bytes, crawl_seconds, crawl_http_status, crawl_url_index",
+    )
+    p.add_argument(
+        "--profile",
+        default=None,
+        metavar="DIR",
+        help="Profile each stage with cProfile and write DIR/<stage>.pstats (read, local, discovery, crawl, write, stats...)",
+    )
+    p.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also record peak memory per phase with tracemalloc (slower)",
+    )
 
     return p
 
 
-def _safe_get(df: pd.DataFrame, idx: int, col: str) -> str:
-    if col in df.columns:
-        return str(df.at[idx, col] or "")
-    return ""
+def parse_duration(text: str) -> float:
+    """'90' / '90s' -> 90.0, '20m' -> 1200.0, '1.5h' -> 5400.0"""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", text or "")
+    if not m:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text!r} (use e.g. 90, 20m, 1h)")
+    return float(m.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[m.group(2)]
 
 
-def main() -> None:
-    args = build_arg_parser().parse_args()
+def parse_paths(text: str) -> tuple[str, ...]:
+    """'contact, /impressum' -> ('/contact', '/impressum')"""
+    paths = tuple("/" + p.strip().lstrip("/") for p in (text or "").split(",") if p.strip())
+    if not paths:
+        raise argparse.ArgumentTypeError(f"invalid path list: {text!r} (use e.g. /contact,/about)")
+    return paths
 
-    input_path = Path(args.input_csv)
-    if not input_path.exists():
-        raise SystemExit(f"Input file not found: {input_path}")
 
-    # 1) Read CSV robustly
+def main_defaults(**overrides: Any) -> dict[str, Any]:
+    """
+    Defaults of every main-parser option (argparse dest -> value), with `overrides`: the
+    base of the subcommand parsers, so options added to the main parser reach them too.
+    """
+    defaults = vars(build_arg_parser().parse_args(["-"]))
+    del defaults["input_csv"]
+    defaults.update(overrides)
+    return defaults
+
+
+def build_split_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="enrich.py split",
+        description="Partition a CSV into N shards by primary_domain (local enrichment + discovery only, no network).",
+    )
+    # before add_argument: the options defined below keep their own defaults
+    p.set_defaults(**main_defaults(no_crawl=True, concurrency=1, retries=0, connect_timeout=None))
+    p.add_argument("input_csv", help="Path to input CSV")
+    p.add_argument("--shards", type=int, required=True, help="Number of shards")
+    p.add_argument("--out-dir", default=None, help="Directory for shard files (default: next to the input)")
+    p.add_argument("--in-sep", default=None, help="Input delimiter (auto if omitted)")
+    p.add_argument("--out-sep", default=None, help="Output delimiter (defaults to input delimiter)")
+    p.add_argument("--encoding", default="utf-8-sig", help="Input encoding (default utf-8-sig)")
+    p.add_argument("--max-urls-per-row", type=int, default=2, help="Max external URLs retained per row (default 2)")
+    p.add_argument("--workers", type=int, default=1, metavar="N", help="Processes for enrichment and discovery (default 1)")
+    return p
+
+
+def build_serve_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="enrich.py serve",
+        description="Local HTTP API: POST /enrich with a JSON row (or array of rows), GET /stats.",
+    )
+    # before add_argument: the crawl options below take the main parser's defaults
+    p.set_defaults(**main_defaults(keep_order=True))
+    p.add_argument("--host", default="127.0.0.1", help="Bind address (default 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="Port (default 8765)")
+    p.add_argument("--max-urls-per-row", type=int, help="Max external URLs retained per row (default %(default)s)")
+    p.add_argument("--timeout", type=int, help="HTTP read timeout seconds (default %(default)s)")
+    p.add_argument("--max-pages", type=int, help="Max pages per domain (default %(default)s)")
+    p.add_argument("--concurrency", type=int, help="Concurrent crawls per request (default %(default)s)")
+    p.add_argument("--retries", type=int, help="Re-fetches per page after a transient failure (default %(default)s)")
+    p.add_argument("--retry-budget", type=int, help="Max retries over the service lifetime (default: unlimited)")
+    p.add_argument("--connect-timeout", type=float, help="HTTP connect timeout seconds (default %(default)s)")
+    p.add_argument("--domain-budget", type=parse_duration, help="Time allowed per website (default: no limit)")
+    p.add_argument("--row-budget", type=parse_duration, help="Crawl time allowed per row (default: no limit)")
+    p.add_argument(
+        "--adaptive-timeout", type=float, metavar="MULT",
+        help="Cap read timeouts at MULT x the p95 latency seen so far (default: off)",
+    )
+    p.add_argument("--no-crawl", action="store_true", help="Disable website crawling (local extraction + discovery only)")
+    p.add_argument("--race-urls", action="store_true", help="Crawl a row's candidate URLs concurrently")
+    p.add_argument("--sitemap", action="store_true", help="Crawl contact pages listed in each site's sitemap first")
+    p.add_argument("--speculative", action="store_true", help="Fetch conventional contact paths with the start page")
+    p.add_argument(
+        "--speculative-paths", type=parse_paths, metavar="PATHS", help="Comma-separated paths for --speculative"
+    )
+    p.add_argument("--archive", metavar="FILE", help="Append every fetched page to FILE (WARC)")
+    p.add_argument("--audit-columns", action="store_true", help="Add per-row crawl cost columns")
+    return p
+
+
+def build_reextract_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="enrich.py reextract",
+        description="Re-run the enrichment of an input CSV with the current extractors, crawling pages "
+        "from an archive written with --archive instead of the network.",
+    )
+    # before add_argument: the options defined below keep their own defaults; pages come
+    # from the archive (no retries, no connect timeout, nothing archived again)
+    p.set_defaults(**main_defaults(retries=0, connect_timeout=None))
+    p.add_argument("archive_path", metavar="archive", help="Archive written by a run with --archive")
+    p.add_argument("input_csv", help="Input CSV of the archived run")
+    p.add_argument("-o", "--output", default=None, help="Output path (default: <input>_reextracted.csv)")
+    p.add_argument("--in-sep", default=None, help="Input delimiter (auto if omitted)")
+    p.add_argument("--out-sep", default=None, help="Output delimiter (defaults to input delimiter)")
+    p.add_argument("--encoding", default="utf-8-sig", help="Input encoding (default utf-8-sig)")
+    p.add_argument("--max-urls-per-row", type=int, default=2, help="Max external URLs retained per row (default 2)")
+    p.add_argument("--max-pages", type=int, default=3, help="Max pages per domain (default 3)")
+    p.add_argument("--concurrency", type=int, default=8, help="Concurrent crawls (default 8)")
+    p.add_argument("--sitemap", action="store_true", help="As the archived run's --sitemap")
+    p.add_argument("--speculative", action="store_true", help="As the archived run's --speculative")
+    p.add_argument("--speculative-paths", type=parse_paths, default=SPECULATIVE_PATHS, metavar="PATHS")
+    p.add_argument("--race-urls", action="store_true", help="As the archived run's --race-urls")
+    p.add_argument("--audit-columns", action="store_true", help="Add per-row crawl cost columns")
+    p.add_argument("--engine", choices=("auto", "pandas", "python"), default="auto", help="CSV engine (default auto)")
+    return p
+
+
+def build_merge_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="enrich.py merge",
+        description="Reassemble enriched shard outputs into the original row order.",
+    )
+    p.add_argument("shard_outputs", nargs="+", help="Enriched shard CSVs (files, directories or glob patterns)")
+    p.add_argument("-o", "--output", default=None, help="Output path (default: <input>_enriched.csv next to the shards)")
+    p.add_argument("--in-sep", default=None, help="Shard delimiter (auto if omitted)")
+    p.add_argument("--out-sep", default=None, help="Output delimiter (defaults to shard delimiter)")
+    p.add_argument("--encoding", default="utf-8-sig", help="Shard encoding (default utf-8-sig)")
+    return p
+
+
+@dataclass
+class RunContext:
+    """
+    Process-wide state handed to every file of a run:
+    - enricher: the Enricher (warm crawl state shared by every file, metrics, profiler);
+      no crawling by default
+    - deadline: time.monotonic() value for --time-budget
+    - progress: live progress reporter
+    """
+    enricher: Enricher = field(default_factory=lambda: Enricher(EnricherConfig(crawl=False)))
+    deadline: float | None = None
+    progress: ProgressReporter = field(default_factory=lambda: ProgressReporter(mode="off"))
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase into the run metrics and profile it (each a no-op when disabled)."""
+        with contextlib.ExitStack() as stack:
+            if self.enricher.metrics is not None:
+                stack.enter_context(self.enricher.metrics.phase(name))
+            if self.enricher.profiler is not None:
+                # the per-row stages run inside these and profile themselves
+                cpu = name not in STAGE_PHASES
+                stack.enter_context(self.enricher.profiler.section(name, memory=True, cpu=cpu))
+            yield
+
+
+def enricher_config(args: argparse.Namespace) -> EnricherConfig:
+    """EnricherConfig from the command-line options."""
+    return EnricherConfig(
+        max_urls_per_row=args.max_urls_per_row,
+        timeout=args.timeout,
+        max_pages=args.max_pages,
+        concurrency=args.concurrency,
+        crawl=not getattr(args, "no_crawl", True),
+        audit_columns=args.audit_columns,
+        keep_order=getattr(args, "keep_order", False),
+        retries=args.retries,
+        retry_budget=args.retry_budget,
+        connect_timeout=args.connect_timeout,
+        domain_budget=args.domain_budget,
+        row_budget=args.row_budget,
+        adaptive_timeout=args.adaptive_timeout,
+        race_urls=args.race_urls,
+        sitemap=args.sitemap,
+        speculative=args.speculative,
+        speculative_paths=args.speculative_paths,
+        archive=args.archive,
+        workers=getattr(args, "workers", 1),
+    )
+
+
+def build_enricher(
+    args: argparse.Namespace, metrics: Metrics | None = None, profiler: StageProfiler | None = None
+) -> Enricher:
+    """
+    The process-wide Enricher: pooled connections, result cache and circuit breakers
+    are shared by every file (and every row, or every request) of the run.
+    """
+    config = enricher_config(args)
+    state = crawl_fn = None
+    if config.crawl:
+        module = sys.modules[__name__]  # attribute access goes through the lazy __getattr__
+        state = module.CrawlState(**config.crawl_state_options())
+        crawl_fn = functools.partial(module.crawl_for_email, state=state)
+    return Enricher(config, crawl_fn=crawl_fn, state=state, metrics=metrics, profiler=profiler)
+
+
+def run_stream(args: argparse.Namespace, ctx: RunContext) -> None:
+    """
+    Streaming mode: records in (stdin or file, CSV or JSONL), one JSON line out per row.
+    Progress and the summary go to stderr so stdout stays machine-readable.
+    """
+    if len(args.input_csv) != 1:
+        raise SystemExit("--stream takes exactly one input ('-' for stdin).")
+
+    if args.input_csv[0] == "-":
+        raw = getattr(sys.stdin, "buffer", None)
+        src = io.TextIOWrapper(raw, encoding=args.encoding, newline="") if raw is not None else sys.stdin
+    else:
+        input_path = Path(args.input_csv[0])
+        if not input_path.exists():
+            raise SystemExit(f"Input file not found: {input_path}")
+        src = input_path.open("r", encoding=args.encoding, newline="")
+
+    out = Path(args.output).open("w", encoding="utf-8") if args.output else sys.stdout
+
+    records = read_records(src, fmt=args.in_format, sep=args.in_sep)
+    if args.limit_rows and args.limit_rows > 0:
+        records = itertools.islice(records, args.limit_rows)
+
+    tally = StatsTally()
+    counters = PipelineCounters()
+    ctx.progress.set_stage("stream", counters=counters)
+    try:
+        with ctx.phase("stream"):
+            for record in ctx.enricher.enrich_rows(records, deadline=ctx.deadline, counters=counters):
+                write_record(record, out)
+                tally.add(record)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if src is not sys.stdin:
+            src.close()
+
+    print(format_stats(tally.result()), file=sys.stderr)
+    _print_fetch_limits(ctx.enricher.state, file=sys.stderr)
+
+
+def load_frame(input_path: Path, args: argparse.Namespace) -> tuple[pd.DataFrame, str]:
+    """Step 1: read the CSV robustly, add result columns, apply --limit-rows and compaction."""
     df, in_sep = read_csv_robust(input_path, args.in_sep, args.encoding)
     if len(df.columns) == 0:
         raise SystemExit("Input CSV has no columns. Please provide a valid CSV with headers.")
 
     df = ensure_columns(df)
+    if args.audit_columns:
+        df = ensure_columns(df, AUDIT_COLUMN_DEFAULTS)
 
     # Optional debug limit
     if args.limit_rows and args.limit_rows > 0:
@@ -63,121 +497,400 @@ def main() -> None:
 
     print(f"Loaded {len(df)} rows from {input_path.name} (in-sep='{in_sep}')")
 
-    # 2) Local enrichment: detected_emails -> bio_text
-    found_local = 0
-    for idx in range(len(df)):
-        if df.at[idx, "status"] != "not_processed":
-            continue
-
-        bio = _safe_get(df, idx, "bio_text")
-        det = _safe_get(df, idx, "detected_emails")
-
-        email, src, method, status, conf = enrich_row_local(bio, det)
-
-        df.at[idx, "email"] = email
-        df.at[idx, "source_url"] = src
-        df.at[idx, "method"] = method
-        df.at[idx, "status"] = status
-        df.at[idx, "confidence"] = conf
-
-        if status == "found":
-            found_local += 1
-
-    print(f"Local enrichment done. Found emails on {found_local}/{len(df)} rows.")
+    # Compact in-memory representation of the result columns
+    if not args.no_compact:
+        mem_before = memory_footprint(df, RESULT_COLUMN_DEFAULTS)
+        df = compact_columns(df)
+        mem_after = memory_footprint(df, RESULT_COLUMN_DEFAULTS)
+        print(f"Result columns memory: {format_bytes(mem_before)} -> {format_bytes(mem_after)}")
+
+    return df, in_sep
+
+
+def _on_prepared(n_rows: int, n_todo: int, ctx: RunContext) -> Callable[[PipelineCounters], None]:
+    """
+    Steps 2-4 run as one overlapping pipeline (see enricher.pipeline.run_pipeline):
+    rows go through local enrichment and discovery on a producer thread, and a row that
+    needs crawling is handed to the crawl workers right away.
+    This callback reports the end of the first two steps and switches progress to the crawl.
+    """
+    def _prepared(c: PipelineCounters) -> None:
+        print(f"Local enrichment done. Found emails on {c.found_local}/{n_rows} rows.")
+        print(f"External URL discovery done. Prepared {c.prepared} rows with external_urls.")
+        if ctx.enricher.crawl_fn is not None:
+            ctx.progress.set_stage("crawl", total=n_todo, counters=c)
+
+    return _prepared
+
+
+def enrich_frame(df: pd.DataFrame, ctx: RunContext) -> PipelineCounters:
+    """Steps 2-4 on a dataframe (updated in place, from this thread only)."""
+    n_todo = int(df["status"].isin(TODO_STATUSES).sum()) if "status" in df.columns else len(df)
+    counters = PipelineCounters()
+    ctx.progress.set_stage("local+discovery+crawl", total=n_todo, counters=counters)
+    ctx.enricher.enrich_dataframe(
+        df,
+        inplace=True,
+        deadline=ctx.deadline,
+        counters=counters,
+        on_prepared=_on_prepared(len(df), n_todo, ctx),
+    )
+    return counters
+
+
+def load_rows(input_path: Path, args: argparse.Namespace) -> tuple[list[str], list[dict], str] | None:
+    """
+    Step 1 without pandas: (columns, rows, in-sep) with result columns added and --limit-rows
+    applied, or None when the file needs the pandas reader (see io_utils.read_rows_robust).
+    """
+    table = read_rows_robust(input_path, args.in_sep, args.encoding)
+    if table is None:
+        return None
+    columns, rows, in_sep = table
+
+    defaults = dict(RESULT_COLUMN_DEFAULTS)
+    if args.audit_columns:
+        defaults.update(AUDIT_COLUMN_DEFAULTS)
+    added = {c: v for c, v in defaults.items() if c not in columns}
+    for row in rows:
+        row.update(added)
+    columns = columns + list(added)
 
-    # 3) Controlled public discovery: build external_urls from multiple fields
-    cfg = DiscoveryConfig(
-    field_priority=("bio_links", "bio_text", "description"),
-    max_urls_per_row=args.max_urls_per_row,
-    exclude_low_value=True,
-    )
-
-    prepared = 0
-    for idx in range(len(df)):
-        if df.at[idx, "status"] != "not_found":
-            continue
-
-        row_map = {
-            "bio_links": df.at[idx, "bio_links"] if "bio_links" in df.columns else "",
-            "bio_text": df.at[idx, "bio_text"] if "bio_text" in df.columns else "",
-            "description": df.at[idx, "description"] if "description" in df.columns else "",
-        }
-
-        urls, src_field = discover_external_urls_from_row(row_map, cfg)
-
-        if urls:
-            df.at[idx, "external_urls"] = "|".join(urls)
-            df.at[idx, "primary_domain"] = get_domain(urls[0])
-            df.at[idx, "discovery_source"] = src_field
-            prepared += 1
+    if args.limit_rows and args.limit_rows > 0:
+        rows = rows[: args.limit_rows]
+
+    print(f"Loaded {len(rows)} rows from {input_path.name} (in-sep='{in_sep}')")
+    return columns, rows, in_sep
+
+
+def enrich_rows(rows: list[dict], ctx: RunContext) -> PipelineCounters:
+    """Steps 2-4 on plain row dicts (python engine); rows are updated in place."""
+    todo: list[Record] = [row for row in rows if row["status"] in TODO_STATUSES]
+    counters = PipelineCounters()
+    ctx.progress.set_stage("local+discovery+crawl", total=len(todo), counters=counters)
+    for _ in ctx.enricher.run(
+        todo, counters=counters, on_prepared=_on_prepared(len(rows), len(todo), ctx), deadline=ctx.deadline
+    ):
+        pass
+    return counters
+
+
+def _print_fetch_limits(state: CrawlState | None, file: TextIO | None = None) -> None:
+    """Retries and fetches cut by timeouts / budgets over the run, when there were any."""
+    if state is None:
+        return
+    if state.retry_budget.used or state.retry_budget.denied:
+        print(state.retry_budget.summary(), file=file)
+    if any(state.timeouts.cuts.values()):
+        print(state.timeouts.summary(), file=file)
+
+
+def _use_python_engine(input_path: Path, args: argparse.Namespace) -> bool:
+    if args.engine == "auto":
+        return input_path.stat().st_size <= PYTHON_ENGINE_MAX_BYTES
+    return args.engine == "python"
+
+
+def _print_urls(values: Iterable[object]) -> None:
+    unique = set()
+    for ext in values:
+        for u in str(ext or "").split("|"):
+            u = u.strip()
+            if u:
+                unique.add(u)
+
+    print("\nDetected external URLs:")
+    for u in sorted(unique):
+        print("-", u)
+    print(f"\nTotal unique external URLs: {len(unique)}")
+
+
+def run_file(input_path: Path, args: argparse.Namespace, ctx: RunContext) -> RunStats:
+    """
+    Enrich one CSV file end-to-end and return its stats.
+    Small inputs go through plain row dicts and the csv module (python engine);
+    the output is the same as with the pandas engine.
+    """
+    # 1) Read CSV robustly
+    ctx.progress.set_stage("read")
+    with ctx.phase("read"):
+        table = load_rows(input_path, args) if _use_python_engine(input_path, args) else None
+        if table is None:
+            df, in_sep = load_frame(input_path, args)
         else:
-            df.at[idx, "discovery_source"] = "none"
-
-    print(f"External URL discovery done. Prepared {prepared} rows with external_urls.")
-
-
-    # 4) Optional: print unique external URLs
-    if args.print_urls:
-        unique = set()
-        for idx in range(len(df)):
-            ext = str(df.at[idx, "external_urls"] or "")
-            if not ext:
-                continue
-            for u in ext.split("|"):
-                u = u.strip()
-                if u:
-                    unique.add(u)
-
-        print("\nDetected external URLs:")
-        for u in sorted(unique):
-            print("-", u)
-        print(f"\nTotal unique external URLs: {len(unique)}")
-
-    # 5) Crawl (Option A): only crawl discovered external URLs, limited by max_pages
-    crawled_found = crawled_blocked = crawled_errors = 0
-    if not args.no_crawl:
-        for idx in range(len(df)):
-            if df.at[idx, "status"] != "not_found":
-                continue
-
-            ext = str(df.at[idx, "external_urls"] or "")
-            if not ext:
-                continue
-
-            urls = [u.strip() for u in ext.split("|") if u.strip()]
-            for u in urls:
-                email, src, st, conf = crawl_for_email(u, timeout=args.timeout, max_pages=args.max_pages)
-
-                if st == "found":
-                    df.at[idx, "email"] = email
-                    df.at[idx, "source_url"] = src
-                    df.at[idx, "method"] = "crawl"
-                    df.at[idx, "status"] = "found"
-                    df.at[idx, "confidence"] = conf
-                    crawled_found += 1
-                    break
-
-                if st == "blocked":
-                    crawled_blocked += 1
-
-                if st == "error":
-                    crawled_errors += 1
+            columns, rows, in_sep = table
 
+    # 2) Local enrichment: detected_emails -> bio_text
+    # 3) Controlled public discovery: build external_urls from multiple fields
+    # 4) Crawl (Option A): only crawl discovered external URLs, limited by max_pages
+    # Steps 2-4 overlap: crawling starts with the first row that needs it.
+    with ctx.phase("pipeline"):
+        counters = enrich_frame(df, ctx) if table is None else enrich_rows(rows, ctx)
+    if ctx.enricher.crawl_fn is not None:
         print(
-            f"Crawl done. Newly found emails: {crawled_found} | blocked: {crawled_blocked} | errors: {crawled_errors}"
+            f"Crawl done. Newly found emails: {counters.found_crawl} | blocked: {counters.blocked} | errors: {counters.errors}"
+            + (f" | skipped (time budget): {counters.skipped_budget}" if ctx.deadline is not None else "")
         )
     else:
         print("Crawl skipped (--no-crawl).")
 
+    # 5) Optional: print unique external URLs
+    if args.print_urls:
+        _print_urls(df["external_urls"].tolist() if table is None else (r["external_urls"] for r in rows))
+
     # 6) Write output
+    ctx.progress.set_stage("write")
     out_sep = args.out_sep or in_sep
     out_path = Path(args.output) if args.output else input_path.with_name(input_path.stem + "_enriched.csv")
-    out_path = write_csv_safe(df, out_path, sep=out_sep)
+    with ctx.phase("write"):
+        if table is None:
+            out_path = write_csv_safe(df, out_path, sep=out_sep)
+        else:
+            out_path = write_rows_safe(columns, rows, out_path, sep=out_sep)
     print(f"Output written to {out_path.name} (out-sep='{out_sep}')")
 
     # 7) Print stats summary
-    stats = compute_stats(df)
+    ctx.progress.set_stage("stats")
+    with ctx.phase("stats"):
+        if table is None:
+            stats = compute_stats(df)
+        else:
+            tally = StatsTally()
+            for row in rows:
+                tally.add(row)
+            stats = tally.result()
     print(format_stats(stats))
+    return stats
+
+
+def _planned_records(df: pd.DataFrame, fields: Iterable[str]) -> Iterator[dict]:
+    columns = [c for c in dict.fromkeys(("status", "external_urls", *fields)) if c in df.columns]
+    for values in zip(*(df[c].tolist() for c in columns)):
+        yield dict(zip(columns, values))
+
+
+def run_plan(inputs: list[Path], args: argparse.Namespace) -> None:
+    """
+    --plan: local enrichment and discovery of every input (never crawling, whatever the
+    options), then one crawl plan over all of them, as a run would share its result cache.
+    """
+    config = dataclasses.replace(enricher_config(args), crawl=False)
+    ctx = RunContext(enricher=Enricher(config))
+    fields = ctx.enricher.discovery.field_priority
+    planner = CrawlPlanner(
+        max_pages=args.max_pages,
+        concurrency=args.concurrency,
+        latency=args.plan_latency,
+        fields=fields,
+        sitemap=args.sitemap,
+        race_urls=args.race_urls,
+        retries=args.retries,
+        speculative=args.speculative,
+        speculative_paths=args.speculative_paths,
+    )
+    for input_path in inputs:
+        table = load_rows(input_path, args) if _use_python_engine(input_path, args) else None
+        if table is None:
+            df, _ = load_frame(input_path, args)
+            enrich_frame(df, ctx)
+            records: Iterable[Mapping[str, object]] = _planned_records(df, fields)
+        else:
+            records = table[1]
+            enrich_rows(table[1], ctx)
+        for record in records:
+            planner.add(record)
+    print(format_plan(planner.result(), deadline_seconds=args.time_budget))
+
+
+def run_split(args: argparse.Namespace) -> None:
+    """
+    Prepare rows (local enrichment + discovery) and write one CSV per shard.
+    Rows are partitioned by primary_domain, so each domain is crawled by exactly one shard run.
+    """
+    if args.shards < 1:
+        raise SystemExit("--shards must be >= 1")
+    input_path = Path(args.input_csv)
+    if not input_path.exists():
+        raise SystemExit(f"Input file not found: {input_path}")
+
+    from enricher.sharding import shard_path, split_frame
+
+    df, in_sep = load_frame(input_path, args)
+    enrich_frame(df, RunContext(enricher=Enricher(enricher_config(args))))
+
+    out_sep = args.out_sep or in_sep
+    out_dir = Path(args.out_dir) if args.out_dir else None
+    if out_dir is not None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    for i, part in enumerate(split_frame(df, args.shards)):
+        path = write_csv_safe(part, shard_path(input_path, i, args.shards, out_dir), sep=out_sep)
+        domains = part["primary_domain"].astype(str)
+        print(f"Shard {i + 1}/{args.shards}: {len(part)} rows, {domains[domains != ''].nunique()} domains -> {path.name}")
+
+
+def run_merge(args: argparse.Namespace) -> None:
+    """Merge enriched shard outputs back into input order and print the combined stats."""
+    from enricher.sharding import merge_frames, merged_path
+
+    inputs = expand_inputs(args.shard_outputs, skip_outputs=False)
+    if not inputs:
+        raise SystemExit("No shard outputs matched.")
+
+    frames = []
+    parts: list[RunStats] = []
+    in_sep = ","
+    for path in inputs:
+        if not path.exists():
+            raise SystemExit(f"Shard output not found: {path}")
+        df, in_sep = read_csv_robust(path, args.in_sep, args.encoding)
+        frames.append(df)
+        parts.append(compute_stats(df))
+        print(f"Loaded {len(df)} rows from {path.name}")
+
+    try:
+        merged = merge_frames(frames)
+    except ValueError as e:
+        raise SystemExit(f"Cannot merge shard outputs: {e}")
+
+    out_sep = args.out_sep or in_sep
+    out_path = Path(args.output) if args.output else merged_path(inputs[0])
+    out_path = write_csv_safe(merged, out_path, sep=out_sep)
+    print(f"Merged {len(inputs)} shard outputs ({len(merged)} rows) into {out_path.name} (out-sep='{out_sep}')")
+    print(format_stats(combine_stats(parts), title="Merged Run Summary"))
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    """Serve enrichment over local HTTP until interrupted (see enricher.service)."""
+    from enricher.service import EnrichService
+
+    enricher = build_enricher(args, metrics=Metrics())
+    service = EnrichService(enricher, args.host, args.port)
+    host, port = service.address
+    print(f"Serving on http://{host}:{port} (POST /enrich, GET /stats, GET /health). Ctrl+C to stop.", file=sys.stderr)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        enricher.close()
+
+
+def _resolve_inputs(args: argparse.Namespace) -> list[Path]:
+    inputs = expand_inputs(args.input_csv)
+    if not inputs:
+        raise SystemExit("No input CSV files matched.")
+    for input_path in inputs:
+        if not input_path.exists():
+            raise SystemExit(f"Input file not found: {input_path}")
+    return inputs
+
+
+def run_reextract(args: argparse.Namespace) -> None:
+    """
+    Replay an archived crawl through the current extractors: the normal run, with every
+    page answered from the archive (no network, CPU speed, same answers every time).
+    """
+    from enricher.archive import ArchiveIndex
+    from enricher.crawler import ArchiveSession, CrawlState, crawl_for_email
+
+    input_path = Path(args.input_csv)
+    if not input_path.exists():
+        raise SystemExit(f"Input file not found: {input_path}")
+    if not Path(args.archive_path).exists():
+        raise SystemExit(f"Archive not found: {args.archive_path}")
+    if args.output is None:
+        args.output = str(input_path.with_name(input_path.stem + "_reextracted.csv"))
+
+    index = ArchiveIndex(args.archive_path)
+    print(f"Archive {Path(args.archive_path).name}: {len(index)} pages")
+    config = enricher_config(args)
+    state = CrawlState(session=ArchiveSession(index), **config.crawl_state_options())
+    enricher = Enricher(config, crawl_fn=functools.partial(crawl_for_email, state=state), state=state)
+    try:
+        run_file(input_path, args, RunContext(enricher=enricher))
+    finally:
+        enricher.close()
+
+
+SUBCOMMANDS = {
+    "split": (build_split_parser, run_split),
+    "merge": (build_merge_parser, run_merge),
+    "serve": (build_serve_parser, run_serve),
+    "reextract": (build_reextract_parser, run_reextract),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUBCOMMANDS:
+        build_parser, run = SUBCOMMANDS[argv[0]]
+        run(build_parser().parse_args(argv[1:]))
+        return
+
+    args = build_arg_parser().parse_args(argv)
+    if args.plan:
+        if args.stream:
+            raise SystemExit("--plan reads input files; it cannot be combined with --stream.")
+        run_plan(_resolve_inputs(args), args)
+        return
+
+    ctx = RunContext()
+    # the budget covers the whole run (all files), starting now
+    if args.time_budget is not None:
+        ctx.deadline = time.monotonic() + args.time_budget
+
+    metrics = Metrics() if args.metrics_json or args.metrics_prom else None
+    profiler = StageProfiler(Path(args.profile), memory=args.profile_memory) if args.profile else None
+
+    ctx.enricher = build_enricher(args, metrics, profiler)
+    state = ctx.enricher.state
+
+    exporter = None
+    if metrics is not None:
+        exporter = MetricsExporter(
+            metrics,
+            json_path=Path(args.metrics_json) if args.metrics_json else None,
+            prom_path=Path(args.metrics_prom) if args.metrics_prom else None,
+            interval=args.metrics_interval,
+        ).start()
+
+    ctx.progress = ProgressReporter(args.progress, args.progress_interval, sys.stderr, state).start()
+    try:
+        if args.stream:
+            run_stream(args, ctx)
+            return
+
+        inputs = _resolve_inputs(args)
+        if args.output and len(inputs) > 1:
+            raise SystemExit("-o/--output can only be used with a single input file.")
+
+        per_file: list[RunStats] = []
+        for input_path in inputs:
+            if len(inputs) > 1:
+                print(f"\n--- {input_path} ---")
+            per_file.append(run_file(input_path, args, ctx))
+
+        if len(inputs) > 1:
+            print(format_stats(combine_stats(per_file), title=f"All files ({len(inputs)})"))
+            if state is not None:
+                print(f"Crawl cache: {state.cache.hits} hits / {state.cache.misses} misses")
+        _print_fetch_limits(state)
+        if state is not None and state.archive is not None:
+            archive = state.archive
+            print(f"Archived {archive.pages} pages ({format_bytes(archive.bytes)}) to {archive.path}")
+    finally:
+        ctx.progress.stop()
+        if exporter is not None:
+            exporter.stop()
+        if profiler is not None:
+            paths = profiler.write()
+            profiler.close()
+            print(f"Profiles written to {profiler.out_dir}: {', '.join(p.name for p in paths)}", file=sys.stderr)
+            if profiler.unprofiled:
+                print(f"Sections not profiled (another profiler was active): {profiler.unprofiled}", file=sys.stderr)
+        ctx.enricher.close()
 
 
 if __name__ == "__main__":
@@ -1 +1,15 @@
 # Makes 'enricher' a package
+from __future__ import annotations
+
+from typing import Any
+
+__all__ = ["Enricher", "EnricherConfig"]
+
+
+def __getattr__(name: str) -> Any:
+    """Library entry points (enricher.api), imported on first use so submodules stay light."""
+    if name in __all__:
+        from . import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
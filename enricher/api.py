@@ -0,0 +1,324 @@
+# enricher/api.py
+from __future__ import annotations
+
+import concurrent.futures
+import functools
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Iterable, Iterator, Mapping
+
+from .archive import PageArchive
+from .constants import AUDIT_COLUMN_DEFAULTS, RESULT_COLUMN_DEFAULTS, SPECULATIVE_PATHS
+from .discovery import DiscoveryConfig
+from .metrics import Metrics
+from .pipeline import SKIPPED_BUDGET, CrawlFn, PipelineCounters, Record, run_pipeline, stream_enrich
+from .profiling import StageProfiler
+from .retry import RetryBudget, RetryPolicy
+from .scheduler import YieldModel
+from .sitemap import SitemapCache
+from .timeouts import FetchTimeouts, TimeoutPolicy
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from .crawler import CrawlState
+
+# Rows whose status is one of these go through the stages; others are kept as they are.
+TODO_STATUSES = ("not_processed", "not_found", SKIPPED_BUDGET)
+
+# aenrich_rows: rows decided ahead of the async consumer, per unit of concurrency.
+ASYNC_ROWS_PER_WORKER = 4
+
+# aenrich_rows: how often a pump waiting for room checks whether the consumer left (seconds).
+PUMP_POLL_SECONDS = 0.1
+
+
+@dataclass(frozen=True)
+class EnricherConfig:
+    """
+    Enricher settings (same meaning as the enrich.py options):
+    - max_urls_per_row / timeout / max_pages / concurrency: discovery and crawl limits
+    - crawl: False = local extraction + discovery only (--no-crawl)
+    - audit_columns: add the crawl cost columns (--audit-columns)
+    - keep_order: enrich_rows yields rows in input order (else as soon as each is decided)
+    - retries / retry_budget: re-fetches per page after transient failures, and the cap on
+      retries over the Enricher's lifetime (None = unlimited); see enricher.retry
+    - connect_timeout / domain_budget / row_budget / adaptive_timeout: connect timeout
+      (`timeout` is the read timeout), seconds allowed per website (over the Enricher's
+      lifetime) and per row, and the p95 multiple capping read timeouts (None = off);
+      see enricher.timeouts
+    - race_urls: crawl a row's URLs concurrently, first hit wins (pipeline.race_row)
+    - sitemap: crawl the contact-ish pages of each site's sitemap first (enricher.sitemap)
+    - speculative / speculative_paths: fetch the start URL and these conventional paths in one
+      parallel wave (within max_pages), first hit wins
+    - archive: path of a page archive every fetched page is appended to (enricher.archive)
+    - workers: processes running local enrichment and discovery (1 = on the pipeline's
+      producer thread); see pipeline.run_pipeline
+    """
+    max_urls_per_row: int = 2
+    timeout: int = 10
+    max_pages: int = 3
+    concurrency: int = 8
+    crawl: bool = True
+    audit_columns: bool = False
+    keep_order: bool = True
+    retries: int = 2
+    retry_budget: int | None = None
+    connect_timeout: float | None = 5.0
+    domain_budget: float | None = None
+    row_budget: float | None = None
+    adaptive_timeout: float | None = None
+    race_urls: bool = False
+    sitemap: bool = False
+    speculative: bool = False
+    speculative_paths: tuple[str, ...] = SPECULATIVE_PATHS
+    archive: str | None = None
+    workers: int = 1
+
+    def crawl_state_options(self) -> dict[str, Any]:
+        """CrawlState keyword arguments for these settings."""
+        return {
+            "pool_size": max(1, self.concurrency),
+            "retry": RetryPolicy(retries=self.retries) if self.retries > 0 else None,
+            "retry_budget": RetryBudget(self.retry_budget),
+            "timeouts": FetchTimeouts(
+                TimeoutPolicy(
+                    connect=self.connect_timeout,
+                    domain_budget=self.domain_budget,
+                    adaptive_multiplier=self.adaptive_timeout,
+                )
+            ),
+            "sitemaps": SitemapCache() if self.sitemap else None,
+            "speculative_paths": tuple(self.speculative_paths) if self.speculative else None,
+            "archive": PageArchive(self.archive) if self.archive else None,
+        }
+
+    @property
+    def result_columns(self) -> list[str]:
+        return [*RESULT_COLUMN_DEFAULTS, *(AUDIT_COLUMN_DEFAULTS if self.audit_columns else ())]
+
+
+class Enricher:
+    """
+    In-process enricher for embedding (services, notebooks, batch jobs).
+
+    Owns the discovery config and the crawl engine: one CrawlState (pooled HTTP
+    connections, per-URL result cache, per-domain circuit breakers) kept warm across
+    calls, so a site crawled for one batch is answered from cache for the next.
+    Calls may run concurrently from several threads; each runs its own pipeline over
+    the shared crawl state.
+
+        with Enricher(EnricherConfig(concurrency=16)) as enricher:
+            for row in enricher.enrich_rows(rows):
+                ...
+
+    - crawl_fn: custom crawler with crawl_for_email's signature (default: crawl_for_email
+      bound to `state`, created on demand)
+    - metrics / profiler: optional run instrumentation (see enricher.metrics / .profiling)
+    """
+
+    def __init__(
+        self,
+        config: EnricherConfig | None = None,
+        crawl_fn: CrawlFn | None = None,
+        state: CrawlState | None = None,
+        metrics: Metrics | None = None,
+        profiler: StageProfiler | None = None,
+    ) -> None:
+        self.config = config or EnricherConfig()
+        self.discovery = DiscoveryConfig(
+            field_priority=("bio_links", "bio_text", "description"),
+            max_urls_per_row=self.config.max_urls_per_row,
+            exclude_low_value=True,
+        )
+        self.state = state
+        self.crawl_fn: CrawlFn | None = None
+        if self.config.crawl:
+            if crawl_fn is None:
+                # the crawler (and requests) are only imported when crawling is enabled
+                from .crawler import CrawlState, crawl_for_email
+
+                if self.state is None:
+                    self.state = CrawlState(**self.config.crawl_state_options())
+                crawl_fn = functools.partial(crawl_for_email, state=self.state)
+            self.crawl_fn = crawl_fn
+
+        self.metrics = metrics
+        self.profiler = profiler
+        if metrics is not None and self.state is not None:
+            self.state.metrics = metrics
+            metrics.cache = self.state.cache
+
+    # -- lifecycle --
+    def close(self) -> None:
+        if self.state is not None:
+            self.state.close()
+
+    def __enter__(self) -> "Enricher":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -- core --
+    def run(
+        self,
+        records: Iterable[Record],
+        counters: PipelineCounters | None = None,
+        on_prepared: Callable[[PipelineCounters], None] | None = None,
+        deadline: float | None = None,
+    ) -> Iterator[tuple[int, Record]]:
+        """
+        Run the stages over records (updated in place), yielding (seq, record) as each is
+        decided. See pipeline.run_pipeline; a deadline enables yield-prioritized crawling.
+        """
+        cfg = self.config
+        return run_pipeline(
+            records,
+            self.discovery,
+            self.crawl_fn,
+            timeout=cfg.timeout,
+            max_pages=cfg.max_pages,
+            concurrency=cfg.concurrency,
+            counters=counters,
+            on_prepared=on_prepared,
+            deadline=deadline,
+            scheduler=YieldModel() if deadline is not None else None,
+            metrics=self.metrics,
+            profiler=self.profiler,
+            audit=cfg.audit_columns,
+            row_budget=cfg.row_budget,
+            race=cfg.race_urls,
+            workers=cfg.workers,
+        )
+
+    def enrich_rows(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        deadline: float | None = None,
+        counters: PipelineCounters | None = None,
+    ) -> Iterator[dict]:
+        """
+        Enrich rows (mappings of input fields) lazily: yields a copy of each row with the
+        result columns set. In input order with config.keep_order, else as decided.
+        """
+        cfg = self.config
+        return stream_enrich(
+            (dict(r) for r in rows),
+            self.discovery,
+            self.crawl_fn,
+            timeout=cfg.timeout,
+            max_pages=cfg.max_pages,
+            concurrency=cfg.concurrency,
+            keep_order=cfg.keep_order,
+            deadline=deadline,
+            counters=counters,
+            metrics=self.metrics,
+            profiler=self.profiler,
+            audit=cfg.audit_columns,
+            row_budget=cfg.row_budget,
+            race=cfg.race_urls,
+            workers=cfg.workers,
+        )
+
+    def enrich_dataframe(
+        self,
+        df: pd.DataFrame,
+        inplace: bool = False,
+        deadline: float | None = None,
+        counters: PipelineCounters | None = None,
+        on_prepared: Callable[[PipelineCounters], None] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Enrich a dataframe (string columns, as read by io_utils.read_csv_robust) and return it
+        with the result columns. Only rows with a to-do status are processed. Results are
+        buffered per column and written back from the calling thread, one column at a time.
+        """
+        from .io_utils import assign_columns, ensure_columns
+
+        if not inplace:
+            df = df.copy()
+        df = ensure_columns(df)
+        if self.config.audit_columns:
+            df = ensure_columns(df, AUDIT_COLUMN_DEFAULTS)
+
+        result_columns = self.config.result_columns
+        wanted = dict.fromkeys(("bio_text", "detected_emails", *self.discovery.field_priority, *result_columns))
+        fields = [c for c in wanted if c in df.columns]
+        # snapshot the columns the stages read, so worker threads never touch the frame;
+        # the result columns' lists double as the buffer results are written into
+        columns = {c: df[c].tolist() for c in fields}
+        todo = [i for i, st in enumerate(columns["status"]) if st in TODO_STATUSES]
+        records = ({c: columns[c][i] for c in fields} for i in todo)
+        results = {c: columns[c] for c in result_columns}
+
+        for seq, record in self.run(records, counters=counters, on_prepared=on_prepared, deadline=deadline):
+            row = todo[seq]
+            for col, values in results.items():
+                values[row] = record[col]
+
+        # one bulk assignment per column (per-cell frame writes dominate on large files)
+        if todo:
+            assign_columns(df, results)
+        return df
+
+    # -- asyncio --
+    async def aenrich_rows(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        deadline: float | None = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Async variant of enrich_rows: the pipeline runs in a worker thread and rows are
+        handed to the event loop as they are decided, so the loop never blocks on a crawl.
+        At most concurrency * ASYNC_ROWS_PER_WORKER rows wait for the consumer; beyond that
+        the pipeline waits too, so a slow consumer keeps memory bounded.
+        """
+        import asyncio  # ~50 ms; only async callers pay for it
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.config.concurrency) * ASYNC_ROWS_PER_WORKER)
+        done = object()
+        stop = threading.Event()
+
+        def _put(item: tuple) -> bool:
+            # wait for room in the queue; False once the consumer is gone
+            if stop.is_set() or loop.is_closed():
+                return False
+            put = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while not concurrent.futures.wait([put], timeout=PUMP_POLL_SECONDS).done:
+                if stop.is_set():
+                    put.cancel()
+                    return False
+            return True
+
+        def _pump() -> None:
+            results = self.enrich_rows(rows, deadline=deadline)
+            try:
+                for row in results:
+                    # a False put: the consumer is gone, stop pulling rows through the pipeline
+                    if not _put((row, None)):
+                        break
+            except BaseException as e:  # re-raised in the consumer
+                _put((None, e))
+            finally:
+                results.close()
+                _put((done, None))
+
+        pump = loop.run_in_executor(None, _pump)
+        try:
+            while True:
+                row, exc = await queue.get()
+                if exc is not None:
+                    raise exc
+                if row is done:
+                    break
+                yield row
+            await pump
+        finally:
+            stop.set()
+
+    async def aenrich_dataframe(self, df: pd.DataFrame, deadline: float | None = None) -> pd.DataFrame:
+        """Async variant of enrich_dataframe (runs in a worker thread, returns a new frame)."""
+        import asyncio
+
+        return await asyncio.to_thread(self.enrich_dataframe, df, False, deadline)
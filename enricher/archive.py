@@ -0,0 +1,166 @@
+# enricher/archive.py
+from __future__ import annotations
+
+import gzip
+import threading
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.client import responses as _REASONS
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Mapping, Tuple
+
+# Compressed bytes read at a time when scanning an archive.
+_SCAN_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ArchivedPage:
+    """One fetched page: the URL the crawler asked for, the answer's status, headers and body."""
+    url: str
+    status: int
+    headers: Tuple[Tuple[str, str], ...]
+    body: bytes
+    date: str = ""
+
+
+def _record(url: str, status: int, headers: Mapping[str, str], body: bytes) -> bytes:
+    """A WARC/1.1 response record holding the HTTP answer (status line, headers, body)."""
+    reason = _REASONS.get(status, "")
+    http = [f"HTTP/1.1 {status} {reason}".rstrip()]
+    for k, v in headers.items():
+        # the stored body is already decoded; its original framing no longer applies
+        if k.lower() in ("content-encoding", "transfer-encoding", "content-length"):
+            continue
+        http.append(f"{k}: {v}")
+    block = ("\r\n".join(http) + "\r\n\r\n").encode("utf-8", "replace") + body
+    warc = [
+        "WARC/1.1",
+        "WARC-Type: response",
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}",
+        f"WARC-Target-URI: {url}",
+        "Content-Type: application/http; msgtype=response",
+        f"Content-Length: {len(block)}",
+    ]
+    return ("\r\n".join(warc) + "\r\n\r\n").encode("utf-8") + block + b"\r\n\r\n"
+
+
+def _parse_record(data: bytes) -> ArchivedPage | None:
+    """An ArchivedPage from one WARC record (None for records other than responses)."""
+    head, _, rest = data.partition(b"\r\n\r\n")
+    fields: Dict[str, str] = {}
+    for line in head.decode("utf-8", "replace").split("\r\n")[1:]:
+        k, _, v = line.partition(":")
+        fields[k.strip().lower()] = v.strip()
+    if fields.get("warc-type") != "response":
+        return None
+    block = rest[: int(fields.get("content-length", len(rest)))]
+    http_head, _, body = block.partition(b"\r\n\r\n")
+    lines = http_head.decode("utf-8", "replace").split("\r\n")
+    parts = lines[0].split(" ", 2)
+    headers = tuple((k.strip(), v.strip()) for k, _, v in (line.partition(":") for line in lines[1:]) if k)
+    return ArchivedPage(
+        url=fields.get("warc-target-uri", ""),
+        status=int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0,
+        headers=headers,
+        body=body,
+        date=fields.get("warc-date", ""),
+    )
+
+
+def _members(f: BinaryIO) -> Iterator[Tuple[int, int, bytes]]:
+    """(offset, compressed length, data) of each gzip member; a truncated last member is dropped."""
+    offset = 0
+    buf = b""
+    while True:
+        d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        start = offset
+        out: List[bytes] = []
+        while not d.eof:
+            if not buf:
+                buf = f.read(_SCAN_BYTES)
+                if not buf:
+                    return
+            try:
+                out.append(d.decompress(buf))
+            except zlib.error:
+                return
+            offset += len(buf) - len(d.unused_data)
+            buf = d.unused_data
+        yield start, offset - start, b"".join(out)
+
+
+def read_archive(path: str | Path) -> Iterator[ArchivedPage]:
+    """Pages of an archive, in the order they were written."""
+    with open(path, "rb") as f:
+        for _, _, data in _members(f):
+            page = _parse_record(data)
+            if page is not None:
+                yield page
+
+
+class PageArchive:
+    """
+    Streaming page archive (thread-safe): every page the crawler fetches is appended as a
+    WARC response record, each record compressed as its own gzip member, so the file is a
+    standard .warc.gz and stays readable up to the last complete record if a run is killed.
+    Bodies are stored decoded (after Content-Encoding).
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.pages = 0
+        self.bytes = 0
+        self._f = self.path.open("ab")
+        self._lock = threading.Lock()
+
+    def write(self, url: str, status: int, headers: Mapping[str, str], body: bytes) -> None:
+        data = gzip.compress(_record(url, status, headers, body), compresslevel=6)
+        with self._lock:
+            self._f.write(data)
+            self.pages += 1
+            self.bytes += len(data)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._f.closed:
+                self._f.close()
+
+
+class ArchiveIndex:
+    """
+    Random access to an archive by URL (the last record of a URL wins): the index holds
+    file offsets only, and each lookup reads and decompresses one record (thread-safe).
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        with self.path.open("rb") as f:
+            for offset, length, data in _members(f):
+                page = _parse_record(data)
+                if page is not None:
+                    self._offsets[page.url] = (offset, length)
+        self._f = self.path.open("rb")
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> ArchivedPage | None:
+        loc = self._offsets.get(url)
+        if loc is None:
+            return None
+        offset, length = loc
+        with self._lock:
+            self._f.seek(offset)
+            data = self._f.read(length)
+        return _parse_record(gzip.decompress(data))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, url: object) -> bool:
+        return url in self._offsets
+
+    def close(self) -> None:
+        self._f.close()
@@ -39,6 +39,26 @@ KEYWORD_HINTS = (
     "support",
 )
 
+# Sitemap URLs worth visiting first (--sitemap), best first; matched against the URL path.
+SITEMAP_PAGE_HINTS = (
+    "contact",
+    "kontakt",
+    "impressum",
+    "imprint",
+    "mentions-legales",
+    "legal",
+    "about",
+)
+
+# Conventional contact paths fetched with the start URL under --speculative, most likely first.
+SPECULATIVE_PATHS = (
+    "/contact",
+    "/contact-us",
+    "/impressum",
+    "/mentions-legales",
+    "/about",
+)
+
 # Domains we do NOT crawl (low value / likely blocked / non-contact)
 # These are typically social platforms or profile platforms.
 BLOCKED_DOMAINS = {
@@ -88,3 +108,43 @@ PLACEHOLDER_DOMAIN_SUBSTRINGS = (
 PLACEHOLDER_TLDS = (
     "extension",
 )
+
+# -----------------------------
+# Output columns
+# -----------------------------
+RESULT_COLUMN_DEFAULTS = {
+    "email": "",
+    "source_url": "",
+    "method": "",
+    "status": "not_processed",
+    "confidence": "",
+    "external_urls": "",
+    "primary_domain": "",
+    "discovery_source": "",  # helpful for audit: bio_links / bio_text / description / none
+}
+
+# Status of rows a time budget (--time-budget, --domain-budget) left uncrawled; a rerun crawls them.
+SKIPPED_BUDGET = "skipped_budget"
+
+# Optional per-row crawl cost columns (--audit-columns), blank for rows that were not crawled.
+AUDIT_COLUMN_DEFAULTS = {
+    "crawl_pages": "",        # pages fetched over all the row's URLs (cache hits fetch nothing)
+    "crawl_bytes": "",        # response bytes downloaded
+    "crawl_seconds": "",      # wall time of the row's crawl
+    "crawl_http_status": "",  # HTTP status of the last page fetched (0 = connection error)
+    "crawl_url_index": "",    # 1-based position in external_urls of the URL that produced the hit
+}
+
+# Low-cardinality result columns are stored as categoricals; these are the
+# values the pipeline itself writes (input files may add their own).
+STATUS_VALUES = ("not_processed", "found", "not_found", "blocked", "error", "skipped_budget")
+METHOD_VALUES = ("", "detected_emails", "bio_text", "crawl")
+CONFIDENCE_VALUES = ("", "1.0", "0.8", "0.6")
+DISCOVERY_SOURCE_VALUES = ("", "bio_links", "bio_text", "description", "none")
+
+CATEGORICAL_COLUMNS = {
+    "status": STATUS_VALUES,
+    "method": METHOD_VALUES,
+    "confidence": CONFIDENCE_VALUES,
+    "discovery_source": DISCOVERY_SOURCE_VALUES,
+}
@@ -1,28 +1,485 @@
 # enricher/crawler.py
 from __future__ import annotations
 
+import contextlib
 import re
-from typing import Tuple
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, Tuple
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.exceptions import DecodeError, NameResolutionError, ProtocolError, ReadTimeoutError
 
-from .constants import HEADERS, KEYWORD_HINTS, LOW_VALUE_PAGE_HINTS
+from .archive import ArchiveIndex, PageArchive
+from .constants import HEADERS, KEYWORD_HINTS, LOW_VALUE_PAGE_HINTS, SKIPPED_BUDGET
 from .extractors import extract_emails_filtered
+from .metrics import CrawlCost, Metrics
+from .retry import RetryBudget, RetryPolicy
+from .sitemap import SitemapCache
+from .timeouts import FetchTimeouts, TimeoutPolicy
 from .urls import get_domain, normalize_url
 
 
-def fetch_html(url: str, timeout: int = 10) -> Tuple[int, str]:
+CrawlResult = Tuple[str, str, str, str]
+
+
+def make_session(pool_size: int = 16) -> requests.Session:
+    """requests.Session with a connection pool sized for `pool_size` concurrent crawls."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class _Flight:
+    """A crawl in progress; callers asking for the same key wait on it."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: CrawlResult | None = None
+
+
+class ResultCache:
+    """
+    Thread-safe cache of crawl results keyed by normalized start URL.
+    get_or_crawl is single-flight: concurrent callers for a key that is being crawled
+    wait for that crawl instead of starting their own (counted in `coalesced`).
+    """
+
+    def __init__(self) -> None:
+        self._data: Dict[str, CrawlResult] = {}
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> CrawlResult | None:
+        with self._lock:
+            res = self._data.get(key)
+            if res is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return res
+
+    def put(self, key: str, result: CrawlResult) -> None:
+        with self._lock:
+            self._data[key] = result
+
+    def get_or_crawl(self, key: str, crawl: Callable[[], Tuple[CrawlResult, bool]]) -> CrawlResult:
+        """
+        Cached result for key, else crawl() run once for all concurrent callers.
+        crawl() returns (result, cacheable); callers waiting on a crawl whose result is not
+        cacheable (or that raised) crawl on their own.
+        """
+        with self._lock:
+            res = self._data.get(key)
+            if res is not None:
+                self.hits += 1
+                return res
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            return flight.result if flight.result is not None else crawl()[0]
+
+        try:
+            result, cacheable = crawl()
+            if cacheable:
+                flight.result = result
+                self.put(key, result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DomainBreaker:
+    """
+    Per-domain circuit breaker.
+    After `threshold` consecutive failures (connection errors, 429, 5xx) a domain is
+    skipped for `cooldown` seconds; the first fetch after the cooldown is a trial.
+    """
+
+    def __init__(self, threshold: int = 3, cooldown: float = 300.0) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, domain: str) -> bool:
+        with self._lock:
+            opened = self._opened_at.get(domain)
+            if opened is None:
+                return False
+            if time.monotonic() - opened >= self.cooldown:
+                # half-open: let one trial through, re-open on the next failure
+                del self._opened_at[domain]
+                self._failures[domain] = self.threshold - 1
+                return False
+            return True
+
+    def record(self, domain: str, status_code: int) -> None:
+        failed = status_code == 0 or status_code == 429 or status_code >= 500
+        with self._lock:
+            if not failed:
+                self._failures.pop(domain, None)
+                return
+            n = self._failures.get(domain, 0) + 1
+            self._failures[domain] = n
+            if n >= self.threshold:
+                self._opened_at[domain] = time.monotonic()
+
+
+@dataclass
+class CrawlState:
+    """
+    Crawl state shared by every row, file and thread of one process:
+    - session: pooled HTTP connections
+    - cache: crawl results per start URL (a URL is crawled once per process)
+    - breaker: per-domain circuit breaker
+    - pages / inflight: live request counters (read by the progress reporter)
+    - metrics: optional Metrics, fed with fetch latencies / bytes / pages per domain
+    - retry / retry_budget: re-fetch after transient failures (None = no retries), with a
+      cap on retries over the whole run
+    - timeouts: connect timeout, per-domain budget, adaptive read timeout and cut counters
+      (default: the crawl's timeout for both connect and read, no budget)
+    - sitemaps: contact-ish URLs per domain from its sitemap, crawled first (None = off)
+    - speculative_paths: conventional contact paths fetched together with the start URL in
+      one parallel wave, on the `prefetch` pool (None = off)
+    - archive: every page fetched (and sitemap read) is appended to this archive (None = off)
+    """
+    pool_size: int = 16
+    session: requests.Session | None = None
+    cache: ResultCache = field(default_factory=ResultCache)
+    breaker: DomainBreaker = field(default_factory=DomainBreaker)
+    metrics: Metrics | None = None
+    retry: RetryPolicy | None = None
+    retry_budget: RetryBudget = field(default_factory=RetryBudget)
+    timeouts: FetchTimeouts = field(default_factory=lambda: FetchTimeouts(TimeoutPolicy(connect=None)))
+    sitemaps: SitemapCache | None = None
+    speculative_paths: Tuple[str, ...] | None = None
+    prefetch: ThreadPoolExecutor | None = None
+    archive: PageArchive | None = None
+    pages: int = 0
+    inflight: int = 0
+
+    def __post_init__(self) -> None:
+        if self.session is None:
+            self.session = make_session(self.pool_size)
+        if self.speculative_paths and self.prefetch is None:
+            self.prefetch = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="prefetch")
+        self._counter_lock = threading.Lock()
+
+    def request_started(self) -> None:
+        with self._counter_lock:
+            self.inflight += 1
+
+    def request_done(self) -> None:
+        with self._counter_lock:
+            self.inflight -= 1
+            self.pages += 1
+
+    def close(self) -> None:
+        if self.prefetch is not None:
+            self.prefetch.shutdown(wait=True, cancel_futures=True)
+        if self.session is not None:
+            self.session.close()
+        if self.archive is not None:
+            self.archive.close()
+
+
+class ArchiveSession:
+    """
+    Stand-in for the crawl session that answers from a page archive (see enricher.archive)
+    instead of the network: archived answers are replayed as recorded, and URLs missing
+    from the archive fail like unreachable sites.
+    """
+
+    def __init__(self, index: ArchiveIndex) -> None:
+        self.index = index
+
+    def get(self, url: str, headers=None, timeout=None, allow_redirects=True, stream=False) -> requests.Response:
+        page = self.index.get(url)
+        if page is None:
+            raise requests.ConnectionError(f"not in archive: {url}")
+        r = requests.Response()
+        r.status_code = page.status
+        r.headers = CaseInsensitiveDict(page.headers)
+        r.encoding = get_encoding_from_headers(r.headers)
+        r.url = url
+        r._content, r._content_consumed = page.body, True
+        return r
+
+    def close(self) -> None:
+        self.index.close()
+
+
+def fetch_html(url: str, timeout: int = 10, state: CrawlState | None = None) -> Tuple[int, str]:
     """
     Fetch HTML content from a public URL.
     Returns (status_code, html_text). If error, returns (0, "").
+    With a CrawlState, uses its pooled session and skips domains whose breaker is open.
+    """
+    code, html, _ = _fetch(url, timeout, state)
+    return code, html
+
+
+def _fetch(
+    url: str,
+    timeout: int,
+    state: CrawlState | None,
+    deadline: float | None = None,
+    deadline_kind: str = "row_deadline",
+    cheap_errors: bool = False,
+) -> Tuple[int, str, requests.Response | None]:
     """
+    fetch_html, also returning the response (None when no response was received).
+    With a retry policy, transient failures are retried after a jittered backoff while the
+    run's retry budget lasts; the breaker only sees the final outcome.
+    With a deadline (time.monotonic() value), timeouts are clamped to the time left and the
+    body is read in chunks, giving up once the deadline passes (a slow-dripping server
+    otherwise keeps each read under the read timeout). Cuts are counted in state.timeouts
+    under the limit that caused them (deadline_kind for the deadline).
+    With cheap_errors, error answers (404...) are closed without downloading their body.
+    """
+    domain = get_domain(url)
+    if state is not None and state.breaker.is_open(domain):
+        return 0, "", None
+
+    if state is None:
+        return _get(requests.get, url, timeout)[:3]
+
+    limits = state.timeouts
+    attempt = 0
+    while True:
+        connect, read, adaptive = limits.limits(timeout)
+        clamped = False
+        if deadline is not None:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                limits.cut(deadline_kind)
+                return 0, "", None
+            if left < read:
+                connect, read, clamped = min(connect, left), left, True
+
+        state.request_started()
+        started = time.perf_counter()
+        try:
+            code, html, response, error = _get(
+                state.session.get, url, read if connect == read else (connect, read), deadline, cheap_errors
+            )
+        finally:
+            state.request_done()
+        elapsed = time.perf_counter() - started
+        if state.metrics is not None:
+            state.metrics.observe_fetch(code, elapsed, response)
+        if response is not None:
+            limits.observe(elapsed)
+        elif isinstance(error, _BodyDeadline):
+            limits.cut(deadline_kind)
+        elif isinstance(error, requests.ConnectTimeout):
+            limits.cut(deadline_kind if clamped else "connect_timeout")
+        elif isinstance(error, requests.Timeout):
+            limits.cut(deadline_kind if clamped else "adaptive_timeout" if adaptive else "read_timeout")
+
+        kind = failure_class(code, error)
+        policy = state.retry
+        if (
+            policy is None
+            or not policy.should_retry(kind, attempt)
+            or state.breaker.is_open(domain)
+        ):
+            break
+        wait = policy.backoff(attempt)
+        if deadline is not None and time.monotonic() + wait >= deadline:
+            break
+        if not state.retry_budget.acquire(kind):
+            break
+        time.sleep(wait)
+        attempt += 1
+
+    state.breaker.record(domain, code)
+    if state.archive is not None and response is not None:
+        state.archive.write(url, code, response.headers, response.content or b"")
+    return code, html, response
+
+
+class _BodyDeadline(Exception):
+    """The deadline passed while the response body was being read."""
+
+
+# Body chunk size when reading against a deadline.
+_CHUNK_BYTES = 16 * 1024
+
+
+def _get(
+    getter, url: str, timeout, deadline: float | None = None, cheap_errors: bool = False
+) -> Tuple[int, str, requests.Response | None, Exception | None]:
     try:
-        r = requests.get(url, headers=HEADERS, timeout=timeout, allow_redirects=True)
+        if deadline is None and not cheap_errors:
+            r = getter(url, headers=HEADERS, timeout=timeout, allow_redirects=True)
+        else:
+            r = getter(url, headers=HEADERS, timeout=timeout, allow_redirects=True, stream=True)
+            if cheap_errors and not r.ok:
+                r._content, r._content_consumed = b"", True  # body never read
+                r.close()
+            else:
+                _read_body(r, deadline)
         if not r.ok:
-            return r.status_code, ""
-        return r.status_code, r.text or ""
+            return r.status_code, "", r, None
+        return r.status_code, page_text(r.content or b"", r.headers.get("Content-Type", "")), r, None
+    except requests.RequestException as e:
+        return 0, "", None, e
+    except _BodyDeadline as e:
+        return 0, "", None, e
+
+
+# Charset declared in a Content-Type value, or in a <meta> tag near the top of the page.
+_HEADER_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]{0,200}?charset=[\"']?([\w.:-]+)", re.I)
+
+
+def page_text(body: bytes, content_type: str = "") -> str:
+    """
+    Text of a page body, without charset detection (requests' r.text runs it over the whole
+    body when no charset is declared, which is slow on big pages):
+    - ASCII bodies (most pages; emails and hrefs always are) decode at C speed
+    - otherwise: the charset declared in Content-Type or a <meta> tag, then UTF-8, then cp1252
+    """
+    if body.isascii():
+        return body.decode("ascii")
+    m = _HEADER_CHARSET.search(content_type)
+    declared = m.group(1) if m else None
+    if declared is None:
+        meta = _META_CHARSET.search(body, 0, 2048)
+        declared = meta.group(1).decode("ascii") if meta else None
+    for encoding in (declared, "utf-8"):
+        if encoding:
+            try:
+                return body.decode(encoding)
+            except (LookupError, UnicodeDecodeError):
+                pass
+    return body.decode("cp1252", errors="replace")
+
+
+def _read_body(r: requests.Response, deadline: float | None) -> None:
+    """Read a streamed response body, raising _BodyDeadline once the deadline passes."""
+    read1 = getattr(r.raw, "read1", None)  # urllib3 >= 2: returns whatever bytes have arrived
+    if read1 is not None:
+        chunks_iter = iter(lambda: read1(_CHUNK_BYTES, decode_content=True), b"")
+    else:
+        chunks_iter = r.iter_content(_CHUNK_BYTES)  # blocks until a full chunk or EOF
+    chunks = []
+    try:
+        for chunk in chunks_iter:
+            chunks.append(chunk)
+            if deadline is not None and time.monotonic() >= deadline:
+                r.close()
+                raise _BodyDeadline()
+    except (ProtocolError, ReadTimeoutError, DecodeError) as e:
+        # raw urllib3 errors (iter_content converts them itself)
+        r.close()
+        raise requests.ConnectionError(e)
+    # what Response.content does after a full read; .text / .content then work as usual
+    r._content = b"".join(chunks)
+    r._content_consumed = True
+
+
+def _name_not_resolved(error: BaseException) -> bool:
+    """Whether a fetch error comes from a DNS lookup (requests wraps it several levels deep)."""
+    seen = 0
+    e: BaseException | None = error
+    while e is not None and seen < 10:
+        if isinstance(e, (socket.gaierror, NameResolutionError)):
+            return True
+        seen += 1
+        nested = e.args[0] if e.args and isinstance(e.args[0], BaseException) else None
+        e = getattr(e, "reason", None) or e.__cause__ or e.__context__ or nested
+    return False
+
+
+def failure_class(code: int, error: Exception | None = None) -> str | None:
+    """Failure class of a fetch outcome (see retry.RETRYABLE_CLASSES), None if it did not fail transiently."""
+    if error is not None:
+        # dead or parked domains: a DNS failure will not resolve on a retry seconds later
+        if isinstance(error, requests.ConnectionError) and _name_not_resolved(error):
+            return None
+        # ConnectTimeout is both a ConnectionError and a Timeout: test it first
+        if isinstance(error, (requests.ConnectTimeout, requests.ConnectionError)):
+            return "connect"
+        if isinstance(error, requests.Timeout):
+            return "read_timeout"
+        if isinstance(error, (requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError)):
+            return "read"
+        return None
+    if 500 <= code <= 599:
+        return "5xx"
+    return None
+
+
+# Sitemaps larger than this are only read up to here.
+_MAX_SITEMAP_BYTES = 10 * 1024 * 1024
+
+
+def _sitemap_body(url: str, timeout: int, state: CrawlState) -> Iterator[bytes] | None:
+    """Body of a sitemap as streamed chunks, or None when it is missing / not XML / unreachable."""
+    if state.breaker.is_open(get_domain(url)):
+        return None
+    state.request_started()
+    try:
+        r = state.session.get(url, headers=HEADERS, timeout=timeout, allow_redirects=True, stream=True)
     except requests.RequestException:
-        return 0, ""
+        return None
+    finally:
+        state.request_done()
+    if not r.ok or "html" in r.headers.get("Content-Type", "").lower():
+        r.close()  # soft 404s answer HTML
+        return None
+
+    def _chunks() -> Iterator[bytes]:
+        read = 0
+        body: list[bytes] | None = [] if state.archive is not None else None
+        try:
+            for chunk in r.iter_content(_CHUNK_BYTES):
+                if body is not None:
+                    body.append(chunk)
+                yield chunk
+                read += len(chunk)
+                if read >= _MAX_SITEMAP_BYTES:
+                    return
+        except requests.RequestException:
+            return
+        finally:
+            r.close()
+            if body is not None:
+                state.archive.write(url, r.status_code, r.headers, b"".join(body))
+
+    return _chunks()
 
 
 def extract_internal_links(base_url: str, html: str, max_links: int = 5) -> list[str]:
@@ -89,49 +546,186 @@ def _page_looks_low_value(url: str, html: str) -> bool:
     return any(hint in u or hint in h for hint in LOW_VALUE_PAGE_HINTS)
 
 
-def crawl_for_email(start_url: str, timeout: int = 10, max_pages: int = 3) -> Tuple[str, str, str, str]:
+def crawl_for_email(
+    start_url: str,
+    timeout: int = 10,
+    max_pages: int = 3,
+    state: CrawlState | None = None,
+    cost: CrawlCost | None = None,
+    deadline: float | None = None,
+    cancel: threading.Event | None = None,
+) -> CrawlResult:
     """
     Controlled crawl: visit at most `max_pages` pages on a domain:
-      - start_url
-      - then a few internal contact/privacy/about/legal links from the first page
+      - with state.sitemaps: the contact-ish pages listed in the site's sitemap
+      - start_url (with state.speculative_paths, fetched in parallel with those paths)
+      - then a few internal contact/privacy/about/legal links from the start page
 
     Returns: (email, source_url, status, confidence)
-      status: found / not_found / blocked / error
+      status: found / not_found / blocked / error / skipped_budget (the website's budget
+      was spent before this crawl: nothing fetched)
       confidence: "0.6" when found via crawl
+
+    With a CrawlState, results are cached per start URL and fetches share its session;
+    concurrent calls for a URL being crawled wait for that crawl (single flight).
+    With a CrawlCost, pages / bytes / last HTTP status of this crawl are added to it.
+    With a deadline (time.monotonic() value, the row's), the crawl stops when it passes;
+    the state's per-domain budget (state.timeouts) bounds it as well. A crawl cut by the
+    row deadline without a hit is not cached: the URL may get a full crawl from another row
+    (nor is a skipped_budget result).
+    With a `cancel` event, the crawl stops before the next page once it is set (not cached
+    either); used when racing a row's URLs.
     """
     first = normalize_url(start_url)
     if not first:
         return "", "", "error", ""
 
+    if state is None:
+        return _crawl(first, timeout, max_pages, None, cost, cancel=cancel)[0]
+
+    if deadline is not None and time.monotonic() >= deadline:
+        state.timeouts.cut("row_deadline")
+        return "", "", "not_found", ""
+
+    def _run() -> Tuple[CrawlResult, bool]:
+        result, pages = _crawl(first, timeout, max_pages, state, cost, deadline, cancel)
+        if state.metrics is not None:
+            state.metrics.observe_crawl(pages)
+        cut = (deadline is not None and time.monotonic() >= deadline) or (cancel is not None and cancel.is_set())
+        return result, not (cut and result[2] == "not_found") and result[2] != SKIPPED_BUDGET
+
+    return state.cache.get_or_crawl(first, _run)
+
+
+def _fetch_all(
+    urls: list[str],
+    timeout: int,
+    state: CrawlState | None,
+    deadline: float | None,
+    deadline_kind: str,
+    cheap_errors: bool = False,
+) -> Iterator[Tuple[str, Tuple[int, str, requests.Response | None]]]:
+    """
+    Fetch urls, yielding (url, fetch result) as each completes: one by one, or concurrently
+    on state.prefetch for several. Fetches not started when the caller stops are cancelled.
+    """
+    if len(urls) == 1 or state is None or state.prefetch is None:
+        for url in urls:
+            yield url, _fetch(url, timeout, state, deadline, deadline_kind, cheap_errors)
+        return
+    futures = {
+        state.prefetch.submit(_fetch, url, timeout, state, deadline, deadline_kind, cheap_errors): url
+        for url in urls
+    }
+    try:
+        for f in as_completed(futures):
+            yield futures[f], f.result()
+    finally:
+        for f in futures:
+            f.cancel()
+
+
+def _crawl(
+    first: str,
+    timeout: int,
+    max_pages: int,
+    state: CrawlState | None,
+    cost: CrawlCost | None = None,
+    deadline: float | None = None,
+    cancel: threading.Event | None = None,
+) -> Tuple[CrawlResult, int]:
+    """Crawl loop of crawl_for_email; also returns the number of pages fetched."""
+    left = state.timeouts.domain_time_left(get_domain(first)) if state is not None else None
+    if left is None:
+        return _crawl_pages(first, timeout, max_pages, state, cost, deadline, "row_deadline", cancel)
+    if left <= 0:  # earlier crawls of this website used its budget
+        state.timeouts.cut("domain_deadline")
+        return ("", "", SKIPPED_BUDGET, ""), 0
+    started = time.monotonic()
+    kind = "row_deadline"
+    if deadline is None or started + left < deadline:
+        deadline, kind = started + left, "domain_deadline"
+    try:
+        return _crawl_pages(first, timeout, max_pages, state, cost, deadline, kind, cancel)
+    finally:
+        state.timeouts.spend(get_domain(first), time.monotonic() - started)
+
+
+def _crawl_pages(
+    first: str,
+    timeout: int,
+    max_pages: int,
+    state: CrawlState | None,
+    cost: CrawlCost | None,
+    deadline: float | None,
+    kind: str,
+    cancel: threading.Event | None,
+) -> Tuple[CrawlResult, int]:
+    # with sitemaps, the site's contact-ish pages go first, then the start URL
     to_visit = [first]
+    parts = urlsplit(first)
+    root = f"{parts.scheme}://{parts.netloc}"
+    if state is not None and state.sitemaps is not None and not (cancel is not None and cancel.is_set()):
+        to_visit = [*state.sitemaps.contact_urls(root, lambda u: _sitemap_body(u, timeout, state)), first]
+    # speculative: conventional contact paths join the start URL in one parallel first wave;
+    # a guess that misses (any non-2xx) is free, so the start page's links keep their budget
+    wave = state is not None and bool(state.speculative_paths)
+    guesses: set[str] = set()
+    if wave:
+        paths = [normalize_url(root + p) for p in state.speculative_paths]
+        guesses = set(paths) - {first}
+        to_visit += paths
     visited = set()
-    pages_checked = 0
+    pages_checked = fetched = 0
 
     while to_visit and pages_checked < max_pages:
-        url = to_visit.pop(0)
-        if not url or url in visited:
-            continue
-        visited.add(url)
+        batch: list[str] = []
+        while to_visit and len(batch) < (max_pages - pages_checked if wave else 1):
+            url = to_visit.pop(0)
+            if url and url not in visited:
+                visited.add(url)
+                batch.append(url)
+        if not batch:
+            break
+        if wave:
+            # guesses that did not fit in the wave are dropped, not fetched one by one
+            to_visit = [u for u in to_visit if u not in guesses]
+        if cancel is not None and cancel.is_set():
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            state.timeouts.cut(kind)
+            break
 
-        code, html = fetch_html(url, timeout=timeout)
-        pages_checked += 1
+        with contextlib.closing(_fetch_all(batch, timeout, state, deadline, kind, cheap_errors=wave)) as results:
+            for url, (code, html, response) in results:
+                fetched += 1
+                if cost is not None:
+                    cost.pages += 1
+                    cost.http_status = code
+                    if response is not None:
+                        cost.bytes += len(response.content or b"")
 
-        if code in (401, 403, 429):
-            return "", "", "blocked", ""
+                if url in guesses and not 200 <= code < 300:
+                    continue  # a wrong guess says nothing about the site
+                pages_checked += 1
 
-        if not html:
-            continue
+                if code in (401, 403, 429):
+                    return ("", "", "blocked", ""), fetched
+
+                if not html:
+                    continue
 
-        # Avoid selecting misleading "example email" pages (gentle filter)
-        if not _page_looks_low_value(url, html):
-            emails = extract_emails_filtered(html)
-            if emails:
-                return emails[0], url, "found", "0.6"
+                # Avoid selecting misleading "example email" pages (gentle filter)
+                if not _page_looks_low_value(url, html):
+                    emails = extract_emails_filtered(html)
+                    if emails:
+                        return (emails[0], url, "found", "0.6"), fetched
 
-        # only from first page: enqueue internal “contact-ish” pages
-        if pages_checked == 1:
-            for link in extract_internal_links(url, html, max_links=5):
-                if link not in visited:
-                    to_visit.append(link)
+                # only from the start page: enqueue internal “contact-ish” pages
+                if url == first:
+                    for link in extract_internal_links(url, html, max_links=5):
+                        if link not in visited:
+                            to_visit.append(link)
+        wave = False
 
-    return "", "", "not_found", ""
+    return ("", "", "not_found", ""), fetched
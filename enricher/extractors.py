@@ -10,6 +10,7 @@ from .constants import (
     PLACEHOLDER_DOMAIN_SUBSTRINGS,
     PLACEHOLDER_TLDS,
 )
+from .tokens import EMAIL, tokenize
 
 
 def is_placeholder_email(email: str) -> bool:
@@ -44,12 +45,7 @@ def is_placeholder_email(email: str) -> bool:
     return False
 
 
-def extract_emails(text: str) -> List[str]:
-    """Extract and normalize emails from arbitrary text."""
-    if not text:
-        return []
-
-    raw = EMAIL_REGEX.findall(str(text))
+def _clean_emails(raw: List[str]) -> List[str]:
     cleaned: List[str] = []
 
     for e in raw:
@@ -69,12 +65,27 @@ def extract_emails(text: str) -> List[str]:
     return uniq
 
 
+def extract_emails(text: str) -> List[str]:
+    """Extract and normalize emails from arbitrary text (crawled pages included)."""
+    if not text:
+        return []
+    return _clean_emails(EMAIL_REGEX.findall(str(text)))
+
+
 def extract_emails_filtered(text: str) -> List[str]:
     """Extract emails and remove placeholder/example ones."""
     emails = extract_emails(text)
     return [e for e in emails if not is_placeholder_email(e)]
 
 
+def _row_emails_filtered(text: str) -> List[str]:
+    """extract_emails_filtered for a row field: shares tokenize() with URL discovery."""
+    if not text:
+        return []
+    emails = _clean_emails(tokenize(str(text)).texts(EMAIL))
+    return [e for e in emails if not is_placeholder_email(e)]
+
+
 def enrich_row_local(bio_text: str, detected_emails: str) -> Tuple[str, str, str, str, str]:
     """
     Returns: (email, source_url, method, status, confidence)
@@ -83,11 +94,11 @@ def enrich_row_local(bio_text: str, detected_emails: str) -> Tuple[str, str, str
       2) bio_text (confidence 0.8)
       3) not_found
     """
-    emails = extract_emails_filtered(detected_emails)
+    emails = _row_emails_filtered(detected_emails)
     if emails:
         return emails[0], "detected_emails", "detected_emails", "found", "1.0"
 
-    emails = extract_emails_filtered(bio_text)
+    emails = _row_emails_filtered(bio_text)
     if emails:
         return emails[0], "bio_text", "bio_text", "found", "0.8"
 
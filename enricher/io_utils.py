@@ -2,12 +2,23 @@
 from __future__ import annotations
 
 import csv
+import glob
+import importlib.util
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple
+from typing import TYPE_CHECKING, Callable, Iterable, Mapping, Tuple
 
-import pandas as pd
+from .constants import CATEGORICAL_COLUMNS, RESULT_COLUMN_DEFAULTS
+
+# pandas is imported by the functions that need it, so the pure-Python path
+# (read_rows_robust / write_rows_safe) runs without loading it.
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Arrow-backed strings are used for external_urls when pyarrow is installed (optional dependency).
+_ARROW_STRING_DTYPE = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else None
 
 
 def detect_delimiter(file_path: Path, encoding: str) -> str:
@@ -23,6 +34,36 @@ def detect_delimiter(file_path: Path, encoding: str) -> str:
         return ","
 
 
+def expand_inputs(specs: Iterable[str], skip_outputs: bool = True) -> list[Path]:
+    """
+    Expand CLI input specs into a list of CSV files (order kept, duplicates dropped):
+    - a file path is kept as-is
+    - a directory expands to the *.csv files it contains
+    - a glob pattern (e.g. 'campaigns/*.csv') expands to its matches
+    Previous outputs (*_enriched*.csv) are skipped when expanding directories and globs,
+    unless skip_outputs=False.
+    """
+    out: list[Path] = []
+
+    def _add(p: Path) -> None:
+        if p not in out:
+            out.append(p)
+
+    for spec in specs:
+        p = Path(spec)
+        if p.is_dir():
+            matches = sorted(p.glob("*.csv"))
+        elif glob.has_magic(spec):
+            matches = sorted(Path(m) for m in glob.glob(spec) if Path(m).is_file())
+        else:
+            _add(p)
+            continue
+        for m in matches:
+            if not skip_outputs or "_enriched" not in m.stem:
+                _add(m)
+    return out
+
+
 def read_csv_robust(input_path: Path, in_sep: str | None, encoding: str) -> Tuple[pd.DataFrame, str]:
     """
     Robust CSV reader:
@@ -30,6 +71,8 @@ def read_csv_robust(input_path: Path, in_sep: str | None, encoding: str) -> Tupl
     - encoding fallbacks: utf-8-sig -> utf-8 -> cp1252 -> latin-1
     - fallback to python engine + skip bad lines for messy CSVs
     """
+    import pandas as pd
+
     used_sep = in_sep or detect_delimiter(input_path, encoding=encoding)
     read_kwargs = dict(sep=used_sep, dtype=str, keep_default_na=False)
 
@@ -83,27 +126,122 @@ def read_csv_robust(input_path: Path, in_sep: str | None, encoding: str) -> Tupl
         sys.exit(1)
 
 
-def ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
+def ensure_columns(df: pd.DataFrame, defaults: Mapping[str, str] = RESULT_COLUMN_DEFAULTS) -> pd.DataFrame:
     """
     Ensure all output columns exist.
     We keep defaults empty; status defaults to not_processed.
     """
-    columns_defaults = {
-        "email": "",
-        "source_url": "",
-        "method": "",
-        "status": "not_processed",
-        "confidence": "",
-        "external_urls": "",
-        "primary_domain": "",
-        "discovery_source": "",  # helpful for audit: bio_links / bio_text / description / none
-    }
-    for col, default in columns_defaults.items():
+    for col, default in defaults.items():
         if col not in df.columns:
             df[col] = default
     return df
 
 
+def compact_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store result columns compactly:
+    - status / method / confidence / discovery_source as categoricals
+      (known values + whatever the input already contains)
+    - external_urls as an Arrow-backed string column when pyarrow is available
+    """
+    import pandas as pd
+
+    for col, known in CATEGORICAL_COLUMNS.items():
+        if col not in df.columns:
+            continue
+        values = df[col].astype(str)
+        categories = list(known) + sorted(set(values.unique()) - set(known))
+        df[col] = pd.Categorical(values, categories=categories)
+
+    if _ARROW_STRING_DTYPE and "external_urls" in df.columns:
+        df["external_urls"] = df["external_urls"].astype(_ARROW_STRING_DTYPE)
+
+    return df
+
+
+def assign_columns(df: pd.DataFrame, values: Mapping[str, list]) -> pd.DataFrame:
+    """
+    Replace whole columns in one assignment each (instead of cell-by-cell writes), keeping
+    their dtype: categoricals (see compact_columns) gain new values as categories.
+    """
+    import pandas as pd
+
+    for col, data in values.items():
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            known = list(dtype.categories)
+            categories = known + sorted(set(data) - set(known))
+            df[col] = pd.Categorical(data, categories=categories)
+        else:
+            df[col] = pd.Series(data, index=df.index, dtype=dtype)
+    return df
+
+
+def memory_footprint(df: pd.DataFrame, columns: Iterable[str] | None = None) -> int:
+    """Deep memory usage in bytes of the given columns (all columns if omitted)."""
+    cols = [c for c in (columns or df.columns) if c in df.columns]
+    if not cols:
+        return 0
+    return int(df[cols].memory_usage(index=False, deep=True).sum())
+
+
+def format_bytes(n: int) -> str:
+    """Human-readable byte count (e.g. '1.5 MB')."""
+    if n < 1024:
+        return f"{n} B"
+    size = n / 1024
+    for unit in ("KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def read_rows_robust(
+    input_path: Path, in_sep: str | None, encoding: str
+) -> Tuple[list[str], list[dict], str] | None:
+    """
+    Pure-Python counterpart of read_csv_robust for well-formed files: (columns, rows, sep),
+    every value a string, same delimiter detection and encoding fallbacks.
+    Returns None when the file needs the pandas reader (no header, duplicate column names,
+    rows with a different number of fields), so the caller can fall back to it.
+    """
+    used_sep = in_sep or detect_delimiter(input_path, encoding=encoding)
+    for enc in dict.fromkeys((encoding, "utf-8", "cp1252", "latin-1")):
+        try:
+            with input_path.open("r", encoding=enc, newline="") as f:
+                reader = csv.reader(f, delimiter=used_sep)
+                columns = next(reader, None)
+                if not columns or len(set(columns)) != len(columns):
+                    return None
+                rows = []
+                for values in reader:
+                    if not values:  # blank line (skipped by pandas too)
+                        continue
+                    if len(values) != len(columns):
+                        return None
+                    rows.append(dict(zip(columns, values)))
+                return columns, rows, used_sep
+        except UnicodeDecodeError:
+            continue
+        except csv.Error:
+            return None
+    return None
+
+
+def _write_with_fallback(output_path: Path, write: Callable[[Path], None]) -> Path:
+    """Run write(path); if the file is open elsewhere (PermissionError), write to a timestamped alternative."""
+    try:
+        write(output_path)
+        return output_path
+    except PermissionError:
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        alt = output_path.with_name(f"{output_path.stem}_{ts}{output_path.suffix}")
+        print(f"Permission denied writing '{output_path.name}'. Writing to '{alt.name}' instead.")
+        write(alt)
+        return alt
+
+
 def write_csv_safe(df: pd.DataFrame, output_path: Path, sep: str) -> Path:
     """
     Write CSV safely (Excel-friendly UTF-8 with BOM).
@@ -120,12 +258,25 @@ def write_csv_safe(df: pd.DataFrame, output_path: Path, sep: str) -> Path:
             escapechar="\\",
         )
 
-    try:
-        _write(output_path)
-        return output_path
-    except PermissionError:
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        alt = output_path.with_name(f"{output_path.stem}_{ts}{output_path.suffix}")
-        print(f"Permission denied writing '{output_path.name}'. Writing to '{alt.name}' instead.")
-        _write(alt)
-        return alt
+    return _write_with_fallback(output_path, _write)
+
+
+def write_rows_safe(columns: list[str], rows: Iterable[Mapping[str, object]], output_path: Path, sep: str) -> Path:
+    """
+    Pure-Python counterpart of write_csv_safe: same bytes as DataFrame.to_csv with the
+    same options (pandas writes through the csv module with these dialect settings).
+    """
+    def _write(path: Path) -> None:
+        with path.open("w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(
+                f,
+                delimiter=sep,
+                quoting=csv.QUOTE_ALL,
+                escapechar="\\",
+                lineterminator=os.linesep,
+            )
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(["" if row.get(c) is None else row.get(c) for c in columns])
+
+    return _write_with_fallback(output_path, _write)
@@ -0,0 +1,297 @@
+# enricher/metrics.py
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# Upper bounds (seconds) for request latency histograms.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+# Upper bounds for the pages-fetched-per-domain histogram.
+PAGES_BUCKETS = (0, 1, 2, 3, 5, 10, math.inf)
+
+
+def max_rss_bytes() -> int | None:
+    """Peak resident set size of this process so far (None where unavailable)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # kilobytes on Linux
+
+
+def status_class(code: int) -> str:
+    """HTTP status -> '2xx' / '3xx' / '4xx' / '5xx', or 'error' for transport failures (0)."""
+    if code <= 0:
+        return "error"
+    return f"{code // 100}xx"
+
+
+@dataclass
+class CrawlCost:
+    """
+    Cost of the crawls it is passed to (crawl_for_email(..., cost=)), accumulated over calls:
+    - pages / bytes: pages fetched and response bytes downloaded (nothing for cache hits)
+    - http_status: status of the last page fetched (0 = transport error, None = nothing fetched)
+    """
+    pages: int = 0
+    bytes: int = 0
+    http_status: int | None = None
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus semantics: cumulative 'le' buckets, sum, count)."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                return
+
+    def cumulative(self) -> list[int]:
+        out, running = [], 0
+        for c in self.counts:
+            running += c
+            out.append(running)
+        return out
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile by linear interpolation inside the bucket that holds it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for upper, c in zip(self.buckets, self.counts):
+            if c and seen + c >= rank:
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+            if not math.isinf(upper):
+                lower = upper
+        return lower
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": _round(self.quantile(0.5)),
+            "p90": _round(self.quantile(0.9)),
+            "p99": _round(self.quantile(0.99)),
+            "buckets": {_le(b): c for b, c in zip(self.buckets, self.cumulative())},
+        }
+
+
+def _phase_dict(p: Dict[str, float]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"seconds": round(p["seconds"], 6), "calls": int(p["calls"])}
+    if "max_rss_bytes" in p:
+        out["max_rss_bytes"] = int(p["max_rss_bytes"])
+    return out
+
+
+def _round(v: float | None) -> float | None:
+    return None if v is None else round(v, 6)
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else f"{bound:g}"
+
+
+class Metrics:
+    """
+    Run instrumentation, safe to update from crawl worker threads:
+    - phases: wall time of sequential phases (read, write, stats...) and busy time of
+      per-row stages (local, discovery, crawl), summed over rows and threads; sequential
+      phases also record the process peak RSS reached by their end
+    - fetch latency histograms by status class: total request time and time to headers
+      (requests does not expose DNS / connect separately; they are part of time to headers,
+      the remainder is body transfer)
+    - bytes downloaded, pages fetched per crawled domain (one start URL)
+    - crawl cache hits / misses (read from `cache` at export time)
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._t0 = time.monotonic()
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.latency: Dict[str, Histogram] = {}
+        self.ttfb: Dict[str, Histogram] = {}
+        self.pages_per_domain = Histogram(PAGES_BUCKETS)
+        self.bytes_downloaded = 0
+        self.requests = 0
+        self.cache: Any = None
+
+    # -- recording --
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t, max_rss=max_rss_bytes())
+
+    def add_time(self, name: str, seconds: float, calls: int = 1, max_rss: int | None = None) -> None:
+        with self._lock:
+            p = self.phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+            p["seconds"] += seconds
+            p["calls"] += calls
+            if max_rss is not None:
+                p["max_rss_bytes"] = max(p.get("max_rss_bytes", 0), max_rss)
+
+    def observe_fetch(self, code: int, seconds: float, response: Any = None) -> None:
+        klass = status_class(code)
+        nbytes = 0
+        ttfb = None
+        if response is not None:
+            nbytes = len(response.content or b"")
+            if response.elapsed is not None:
+                ttfb = response.elapsed.total_seconds()
+        with self._lock:
+            self.requests += 1
+            self.bytes_downloaded += nbytes
+            self.latency.setdefault(klass, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            if ttfb is not None:
+                self.ttfb.setdefault(klass, Histogram(LATENCY_BUCKETS)).observe(ttfb)
+
+    def observe_crawl(self, pages: int) -> None:
+        with self._lock:
+            self.pages_per_domain.observe(pages)
+
+    # -- export --
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = getattr(self.cache, "hits", 0)
+            misses = getattr(self.cache, "misses", 0)
+            return {
+                "started_at": self.started,
+                "elapsed_seconds": round(time.monotonic() - self._t0, 3),
+                "phases": {k: _phase_dict(v) for k, v in self.phases.items()},
+                "fetch": {
+                    "requests": self.requests,
+                    "bytes_downloaded": self.bytes_downloaded,
+                    "latency_seconds": {k: h.to_dict() for k, h in sorted(self.latency.items())},
+                    "time_to_headers_seconds": {k: h.to_dict() for k, h in sorted(self.ttfb.items())},
+                },
+                "crawl": {"pages_per_domain": self.pages_per_domain.to_dict()},
+                "cache": {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        snap = self.snapshot()
+        lines: list[str] = []
+
+        def _metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP enricher_{name} {help_text}")
+            lines.append(f"# TYPE enricher_{name} {kind}")
+
+        _metric("phase_seconds_total", "counter", "Time spent per phase / stage (busy time for per-row stages).")
+        for name, p in snap["phases"].items():
+            lines.append(f'enricher_phase_seconds_total{{phase="{name}"}} {p["seconds"]}')
+        _metric("phase_max_rss_bytes", "gauge", "Process peak RSS at the end of each sequential phase.")
+        for name, p in snap["phases"].items():
+            if "max_rss_bytes" in p:
+                lines.append(f'enricher_phase_max_rss_bytes{{phase="{name}"}} {p["max_rss_bytes"]}')
+
+        for metric, hists, help_text in (
+            ("fetch_latency_seconds", self.latency, "Page fetch latency by HTTP status class."),
+            ("fetch_time_to_headers_seconds", self.ttfb, "Time to response headers (DNS + connect + server)."),
+        ):
+            _metric(metric, "histogram", help_text)
+            with self._lock:
+                items = [(k, h.buckets, h.cumulative(), h.sum, h.count) for k, h in sorted(hists.items())]
+            for klass, buckets, cum, total, count in items:
+                for b, c in zip(buckets, cum):
+                    lines.append(f'enricher_{metric}_bucket{{status="{klass}",le="{_le(b)}"}} {c}')
+                lines.append(f'enricher_{metric}_sum{{status="{klass}"}} {total}')
+                lines.append(f'enricher_{metric}_count{{status="{klass}"}} {count}')
+
+        _metric("fetch_bytes_total", "counter", "Response body bytes downloaded.")
+        lines.append(f"enricher_fetch_bytes_total {snap['fetch']['bytes_downloaded']}")
+
+        _metric("crawl_pages_per_domain", "histogram", "Pages fetched per crawled domain (start URL).")
+        with self._lock:
+            h = self.pages_per_domain
+            for b, c in zip(h.buckets, h.cumulative()):
+                lines.append(f'enricher_crawl_pages_per_domain_bucket{{le="{_le(b)}"}} {c}')
+            lines.append(f"enricher_crawl_pages_per_domain_sum {h.sum}")
+            lines.append(f"enricher_crawl_pages_per_domain_count {h.count}")
+
+        _metric("cache_hits_total", "counter", "Crawl result cache hits.")
+        lines.append(f"enricher_cache_hits_total {snap['cache']['hits']}")
+        _metric("cache_misses_total", "counter", "Crawl result cache misses.")
+        lines.append(f"enricher_cache_misses_total {snap['cache']['misses']}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Write via a temp file + rename so collectors never read a half-written file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class MetricsExporter:
+    """Write Metrics to a JSON file and/or a Prometheus textfile, every `interval` seconds and at stop()."""
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        json_path: Path | None = None,
+        prom_path: Path | None = None,
+        interval: float = 60.0,
+    ) -> None:
+        self.metrics = metrics
+        self.json_path = json_path
+        self.prom_path = prom_path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def export(self) -> None:
+        if self.json_path is not None:
+            _write_atomic(self.json_path, json.dumps(self.metrics.snapshot(), indent=2))
+        if self.prom_path is not None:
+            _write_atomic(self.prom_path, self.metrics.to_prometheus())
+
+    def start(self) -> "MetricsExporter":
+        if self.interval > 0 and (self.json_path or self.prom_path):
+            self._thread = threading.Thread(target=self._loop, name="metrics-export", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.export()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.export()
@@ -0,0 +1,639 @@
+# enricher/pipeline.py
+from __future__ import annotations
+
+import itertools
+import math
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, MutableMapping, Tuple
+
+from .constants import AUDIT_COLUMN_DEFAULTS, RESULT_COLUMN_DEFAULTS, SKIPPED_BUDGET
+from .discovery import DiscoveryConfig, discover_external_urls_from_row
+from .extractors import enrich_row_local
+from .metrics import CrawlCost, Metrics
+from .profiling import StageProfiler, profiled
+from .scheduler import RescoringQueue, YieldModel
+from .urls import get_domain
+
+# When racing a row's URLs: after a hit, how long higher-priority URLs still crawling may
+# take to produce a hit of their own (which then wins) before they are cancelled.
+RACE_GRACE_SECONDS = 0.25
+
+# --workers: rows per chunk handed to a worker process.
+WORKER_CHUNK_ROWS = 2000
+
+# Result columns a worker process sends back (those the local and discovery stages may write).
+STAGE_COLUMNS = tuple(RESULT_COLUMN_DEFAULTS)
+
+# A row travelling through the pipeline: input fields + result columns.
+Record = MutableMapping[str, object]
+
+# Same signature as crawler.crawl_for_email: (url, timeout=, max_pages=) -> (email, source_url, status, confidence)
+CrawlFn = Callable[..., Tuple[str, str, str, str]]
+
+
+@dataclass(frozen=True)
+class RowCrawl:
+    """
+    Outcome of crawling a row's external URLs (step 5).
+    - email/source_url/confidence: set when one of the URLs produced a hit
+    - blocked/errors: number of URLs that answered blocked / error
+    - skipped: number of URLs not crawled because their website's budget was spent
+    - url_index: 1-based position of the URL that produced the hit (0 = no hit)
+    - cost: pages / bytes / last HTTP status over the row's URLs (only when audited)
+    - seconds: wall time of the row's crawl
+    """
+    email: str = ""
+    source_url: str = ""
+    confidence: str = ""
+    blocked: int = 0
+    errors: int = 0
+    skipped: int = 0
+    url_index: int = 0
+    cost: CrawlCost | None = None
+    seconds: float = 0.0
+
+    @property
+    def found(self) -> bool:
+        return bool(self.email)
+
+
+@dataclass
+class PipelineCounters:
+    """
+    Live counters of a pipeline run.
+    rows/found_local/prepared are written by the producer thread only, completed by
+    the consumer only; the crawl counters are updated by crawl workers under the lock.
+    """
+    rows: int = 0
+    completed: int = 0
+    found_local: int = 0
+    prepared: int = 0
+    crawled: int = 0
+    found_crawl: int = 0
+    blocked: int = 0
+    errors: int = 0
+    skipped_budget: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add_crawl(self, result: "RowCrawl") -> None:
+        with self._lock:
+            self.crawled += 1
+            self.found_crawl += int(result.found)
+            self.blocked += result.blocked
+            self.errors += result.errors
+
+    def add_skipped(self) -> None:
+        with self._lock:
+            self.skipped_budget += 1
+
+
+def _text(record: Record, name: str) -> str:
+    value = record.get(name)
+    return "" if value is None else str(value)
+
+
+def init_record(record: Record, audit: bool = False) -> Record:
+    """
+    Add missing result columns with their defaults (same as io_utils.ensure_columns),
+    plus the crawl audit columns when `audit` is set.
+    Rows skipped by a previous time-budgeted run are put back in the crawl queue.
+    """
+    for col, default in RESULT_COLUMN_DEFAULTS.items():
+        if record.get(col) is None:
+            record[col] = default
+    if audit:
+        for col, default in AUDIT_COLUMN_DEFAULTS.items():
+            if record.get(col) is None:
+                record[col] = default
+    if record["status"] == SKIPPED_BUDGET:
+        record["status"] = "not_found"
+    return record
+
+
+def apply_local(record: Record) -> None:
+    """Step 2: local enrichment from detected_emails -> bio_text."""
+    if record["status"] != "not_processed":
+        return
+
+    email, src, method, status, conf = enrich_row_local(
+        _text(record, "bio_text"),
+        _text(record, "detected_emails"),
+    )
+    record["email"] = email
+    record["source_url"] = src
+    record["method"] = method
+    record["status"] = status
+    record["confidence"] = conf
+
+
+def apply_discovery(record: Record, cfg: DiscoveryConfig) -> None:
+    """Step 3: controlled discovery of external URLs for rows still missing an email."""
+    if record["status"] != "not_found":
+        return
+
+    row_map = {name: _text(record, name) for name in cfg.field_priority}
+    urls, src_field = discover_external_urls_from_row(row_map, cfg)
+
+    if urls:
+        record["external_urls"] = "|".join(urls)
+        record["primary_domain"] = get_domain(urls[0])
+        record["discovery_source"] = src_field
+    else:
+        record["discovery_source"] = "none"
+
+
+def stage_fields(cfg: DiscoveryConfig) -> tuple[str, ...]:
+    """Input fields the local and discovery stages read."""
+    return tuple(dict.fromkeys(("bio_text", "detected_emails", *cfg.field_priority)))
+
+
+def prepare_chunk(
+    rows: list[tuple], fields: tuple[str, ...], cfg: DiscoveryConfig
+) -> tuple[list[tuple], float, float]:
+    """
+    Worker-process side of run_pipeline(workers=): local enrichment and discovery over
+    (status, *fields) tuples of initialized records. Returns, per row, the STAGE_COLUMNS
+    values the stages wrote (None = left as is), and the busy seconds of each stage.
+    """
+    out: list[tuple] = []
+    local = discovery = 0.0
+    for status, *values in rows:
+        record: Record = dict(zip(fields, values))
+        record["status"] = status
+        t0 = time.perf_counter()
+        apply_local(record)
+        t1 = time.perf_counter()
+        apply_discovery(record, cfg)
+        t2 = time.perf_counter()
+        local += t1 - t0
+        discovery += t2 - t1
+        out.append(tuple(record.get(c) for c in STAGE_COLUMNS))
+    return out, local, discovery
+
+
+def _prepare_serial(
+    records: Iterable[Record],
+    cfg: DiscoveryConfig,
+    audit: bool,
+    metrics: Metrics | None,
+    profiler: StageProfiler | None,
+) -> Iterator[tuple[int, Record, bool]]:
+    """(seq, record, was_processed) after the CPU stages, row by row on this thread."""
+    for seq, record in enumerate(records):
+        init_record(record, audit)
+        was_processed = record["status"] != "not_processed"
+        t0 = time.perf_counter()
+        with profiled(profiler, "local"):
+            apply_local(record)
+        t1 = time.perf_counter()
+        with profiled(profiler, "discovery"):
+            apply_discovery(record, cfg)
+        if metrics is not None:
+            metrics.add_time("local", t1 - t0)
+            metrics.add_time("discovery", time.perf_counter() - t1)
+        yield seq, record, was_processed
+
+
+def _prepare_parallel(
+    records: Iterable[Record],
+    cfg: DiscoveryConfig,
+    audit: bool,
+    metrics: Metrics | None,
+    workers: int,
+) -> Iterator[tuple[int, Record, bool]]:
+    """
+    _prepare_serial on `workers` processes: records stay here, chunks of their stage fields
+    go out and the written result columns come back, applied in input order. At most two
+    chunks per worker are in flight, so memory stays bounded on large inputs.
+    """
+    fields = stage_fields(cfg)
+    pending: deque = deque()
+
+    def _apply() -> Iterator[tuple[int, Record, bool]]:
+        chunk, future = pending.popleft()
+        values, local, discovery = future.result()
+        for (seq, record, was_processed), row in zip(chunk, values):
+            for col, value in zip(STAGE_COLUMNS, row):
+                if value is not None:
+                    record[col] = value
+            yield seq, record, was_processed
+        if metrics is not None:
+            metrics.add_time("local", local, calls=len(chunk))
+            metrics.add_time("discovery", discovery, calls=len(chunk))
+
+    # spawn: the pool starts from the producer thread while crawl threads are running
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as procs:
+        numbered = enumerate(records)
+        while True:
+            chunk = []
+            for seq, record in itertools.islice(numbered, WORKER_CHUNK_ROWS):
+                init_record(record, audit)
+                chunk.append((seq, record, record["status"] != "not_processed"))
+            if not chunk:
+                break
+            rows = [(r["status"], *(r.get(f) for f in fields)) for _, r, _ in chunk]
+            pending.append((chunk, procs.submit(prepare_chunk, rows, fields, cfg)))
+            if len(pending) >= 2 * workers:
+                yield from _apply()
+        while pending:
+            yield from _apply()
+
+
+def split_urls(external_urls: str) -> list[str]:
+    return [u.strip() for u in (external_urls or "").split("|") if u.strip()]
+
+
+def needs_crawl(record: Record) -> bool:
+    return record["status"] == "not_found" and bool(split_urls(_text(record, "external_urls")))
+
+
+def crawl_row(
+    urls: Iterable[str],
+    crawl_fn: CrawlFn,
+    timeout: int,
+    max_pages: int,
+    audit: bool = False,
+    deadline: float | None = None,
+    pool: Executor | None = None,
+) -> RowCrawl:
+    """
+    Step 5 for one row: crawl its URLs in priority order and stop at the first hit.
+    With `audit`, a CrawlCost is passed to crawl_fn (cost=) and returned in the result.
+    With a `deadline` (the row's, as a time.monotonic() value), it is passed to crawl_fn
+    (deadline=), which stops crawling once it passes.
+    With a `pool`, the URLs are crawled concurrently on it instead (see race_row).
+    """
+    if pool is not None:
+        return race_row(list(urls), crawl_fn, timeout, max_pages, pool, audit, deadline)
+    cost = CrawlCost() if audit else None
+    extra: dict = {"cost": cost} if audit else {}
+    if deadline is not None:
+        extra["deadline"] = deadline
+    started = time.perf_counter()
+    blocked = errors = skipped = 0
+    for i, u in enumerate(urls, 1):
+        email, src, st, conf = crawl_fn(u, timeout=timeout, max_pages=max_pages, **extra)
+
+        if st == "found":
+            return RowCrawl(
+                email=email, source_url=src, confidence=conf, blocked=blocked, errors=errors,
+                skipped=skipped, url_index=i, cost=cost, seconds=time.perf_counter() - started,
+            )
+
+        if st == "blocked":
+            blocked += 1
+
+        if st == "error":
+            errors += 1
+
+        if st == SKIPPED_BUDGET:
+            skipped += 1
+
+    return RowCrawl(
+        blocked=blocked, errors=errors, skipped=skipped, cost=cost, seconds=time.perf_counter() - started
+    )
+
+
+def race_row(
+    urls: list[str],
+    crawl_fn: CrawlFn,
+    timeout: int,
+    max_pages: int,
+    pool: Executor,
+    audit: bool = False,
+    deadline: float | None = None,
+    grace: float = RACE_GRACE_SECONDS,
+) -> RowCrawl:
+    """
+    crawl_row with the row's URLs crawled concurrently on `pool` (whose size caps crawls
+    across all rows). The first hit cancels the lower-priority URLs (later in the list);
+    higher-priority ones still running get `grace` seconds to produce a hit of their own,
+    which then wins. Each crawl gets a threading.Event (cancel=) it checks between pages.
+    """
+    started = time.perf_counter()
+    costs = [CrawlCost() if audit else None for _ in urls]
+    cancels = [threading.Event() for _ in urls]
+    futures: dict[Future, int] = {}
+    for i, u in enumerate(urls):
+        extra: dict = {"cancel": cancels[i]}
+        if audit:
+            extra["cost"] = costs[i]
+        if deadline is not None:
+            extra["deadline"] = deadline
+        futures[pool.submit(crawl_fn, u, timeout=timeout, max_pages=max_pages, **extra)] = i
+
+    best: tuple[int, Tuple[str, str, str, str]] | None = None
+    blocked = errors = skipped = 0
+    pending = set(futures)
+    grace_end: float | None = None
+    while pending:
+        left = None if grace_end is None else max(0.0, grace_end - time.monotonic())
+        done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+        for f in done:
+            i = futures[f]
+            res = f.result()
+            if res[2] == "found" and (best is None or i < best[0]):
+                best = (i, res)
+            blocked += res[2] == "blocked"
+            errors += res[2] == "error"
+            skipped += res[2] == SKIPPED_BUDGET
+        if best is not None:
+            if grace_end is None:
+                grace_end = time.monotonic() + grace
+            losers = {f for f in pending if futures[f] > best[0] or time.monotonic() >= grace_end}
+            for f in losers:
+                f.cancel()
+                cancels[futures[f]].set()
+            pending -= losers
+
+    cost = None
+    if audit:
+        cost = CrawlCost(
+            pages=sum(c.pages for c in costs),
+            bytes=sum(c.bytes for c in costs),
+            http_status=(costs[best[0]] if best is not None else costs[-1]).http_status if costs else None,
+        )
+    seconds = time.perf_counter() - started
+    if best is None:
+        return RowCrawl(blocked=blocked, errors=errors, skipped=skipped, cost=cost, seconds=seconds)
+    email, src, _, conf = best[1]
+    return RowCrawl(
+        email=email, source_url=src, confidence=conf, blocked=blocked, errors=errors,
+        skipped=skipped, url_index=best[0] + 1, cost=cost, seconds=seconds,
+    )
+
+
+def apply_crawl(
+    record: Record,
+    crawl_fn: CrawlFn,
+    timeout: int,
+    max_pages: int,
+    audit: bool = False,
+    deadline: float | None = None,
+    pool: Executor | None = None,
+) -> RowCrawl:
+    """
+    Crawl a record's external URLs and write the hit (if any) into the record,
+    and the crawl cost into the audit columns when `audit` is set.
+    """
+    result = crawl_row(split_urls(_text(record, "external_urls")), crawl_fn, timeout, max_pages, audit, deadline, pool)
+    if result.found:
+        record["email"] = result.email
+        record["source_url"] = result.source_url
+        record["method"] = "crawl"
+        record["status"] = "found"
+        record["confidence"] = result.confidence
+    if result.cost is not None:
+        record["crawl_pages"] = str(result.cost.pages)
+        record["crawl_bytes"] = str(result.cost.bytes)
+        record["crawl_seconds"] = f"{result.seconds:.3f}"
+        record["crawl_http_status"] = "" if result.cost.http_status is None else str(result.cost.http_status)
+        record["crawl_url_index"] = str(result.url_index) if result.found else ""
+    return result
+
+
+class _Reorder:
+    """Release (seq, record) pairs either as they come or in input order."""
+
+    def __init__(self, keep_order: bool):
+        self.keep_order = keep_order
+        self.next_seq = 0
+        self.waiting: dict[int, Record] = {}
+
+    def push(self, seq: int, record: Record) -> list[Record]:
+        if not self.keep_order:
+            return [record]
+        self.waiting[seq] = record
+        out = []
+        while self.next_seq in self.waiting:
+            out.append(self.waiting.pop(self.next_seq))
+            self.next_seq += 1
+        return out
+
+
+_DONE = object()
+
+# How often a stage waiting for the consumer to take decided rows checks whether it left (seconds).
+EMIT_POLL_SECONDS = 0.1
+
+
+def run_pipeline(
+    records: Iterable[Record],
+    cfg: DiscoveryConfig,
+    crawl_fn: CrawlFn | None,
+    timeout: int = 10,
+    max_pages: int = 3,
+    concurrency: int = 8,
+    queue_size: int | None = None,
+    counters: PipelineCounters | None = None,
+    on_prepared: Callable[[PipelineCounters], None] | None = None,
+    deadline: float | None = None,
+    scheduler: YieldModel | None = None,
+    metrics: Metrics | None = None,
+    profiler: StageProfiler | None = None,
+    audit: bool = False,
+    row_budget: float | None = None,
+    race: bool = False,
+    workers: int = 1,
+) -> Iterator[tuple[int, Record]]:
+    """
+    Bounded producer/consumer pipeline over records, yielding (seq, record) in completion order.
+
+    - a producer thread runs the CPU stages (local enrichment, discovery) row by row
+    - a row that needs crawling goes straight to `concurrency` crawl workers, so network
+      I/O starts with the first such row and overlaps with the CPU stages for the whole run
+    - rows that are decided without crawling are yielded immediately
+    - at most `queue_size` rows (default concurrency * 4) wait on the crawler, and at most
+      concurrency * 4 decided rows wait for the consumer; the stages block beyond that,
+      keeping memory bounded on large inputs and with slow consumers
+
+    With a `scheduler`, waiting rows are crawled highest expected yield per second first,
+    rescored as crawl outcomes come in (RescoringQueue); the crawl queue is then unbounded
+    unless queue_size is given, so the ordering is global.
+    With `metrics`, busy time of the local / discovery / crawl stages is recorded; with a
+    `profiler`, each of them is profiled under its own stage name.
+    With `audit`, crawled records get the crawl cost columns (AUDIT_COLUMN_DEFAULTS).
+    With a `deadline` (time.monotonic() value), rows not crawled by then get status
+    "skipped_budget"; crawls in flight stop at the deadline (crawl_fn's deadline=) and, without
+    a hit, get "skipped_budget" too, as do rows with a URL crawl_fn skipped ("skipped_budget").
+    With a `row_budget` (seconds), each row's crawl gets a deadline that long after it starts.
+    With `race`, a row's URLs are crawled concurrently (race_row) on a pool of `concurrency`
+    threads shared by all rows, so at most `concurrency` URLs are crawled at once.
+    With `workers` > 1, the CPU stages run on that many processes over chunks of rows
+    (_prepare_parallel), with the same results; the profiler then does not see them.
+
+    on_prepared(counters) is called from the producer once every row went through the CPU stages.
+    Closing the iterator early stops the producer and leaves waiting rows uncrawled.
+    """
+    counters = counters if counters is not None else PipelineCounters()
+    crawlers = max(1, concurrency) if crawl_fn is not None else 0
+    out: queue.Queue = queue.Queue(maxsize=max(1, concurrency) * 4)
+    if scheduler is not None:
+        work: queue.Queue = RescoringQueue(scheduler, maxsize=queue_size or 0)
+    else:
+        work = queue.Queue(maxsize=queue_size or max(1, crawlers) * 4)
+    closed = threading.Event()  # set when the consumer stops iterating
+    pool = ThreadPoolExecutor(max_workers=crawlers, thread_name_prefix="race") if race and crawlers else None
+
+    def _time_left() -> float | None:
+        return None if deadline is None else deadline - time.monotonic()
+
+    def _emit(item: object) -> None:
+        # wait for room; once the consumer is gone, nothing takes items any more: drop them
+        while not closed.is_set():
+            try:
+                out.put(item, timeout=EMIT_POLL_SECONDS)
+                return
+            except queue.Full:
+                pass
+
+    def _skip(seq: int, record: Record) -> None:
+        record["status"] = SKIPPED_BUDGET
+        counters.add_skipped()
+        _emit((seq, record, None))
+
+    def _crawl_worker() -> None:
+        while True:
+            _, seq, record = work.get()
+            if record is None:
+                return
+            if closed.is_set():
+                continue  # the consumer is gone: drain without crawling
+            try:
+                left = _time_left()
+                if left is not None and left <= 0:
+                    _skip(seq, record)
+                    continue
+                row_timeout = timeout if left is None else max(1, min(timeout, int(left)))
+                started = time.monotonic()
+                # the crawl stops at the row budget or at the run deadline, whichever comes first
+                limits = [d for d in (deadline, None if row_budget is None else started + row_budget) if d is not None]
+                row_deadline = min(limits) if limits else None
+                with profiled(profiler, "crawl"):
+                    result = apply_crawl(record, crawl_fn, row_timeout, max_pages, audit, row_deadline, pool)
+                elapsed = time.monotonic() - started
+                if not result.found and (result.skipped or deadline is not None and time.monotonic() >= deadline):
+                    # cut by the run deadline, or a website's budget was spent before its crawl:
+                    # not crawled to the end, so a rerun crawls it again
+                    _skip(seq, record)
+                    continue
+                counters.add_crawl(result)
+                if scheduler is not None:
+                    scheduler.observe(record, result.found, elapsed)
+                if metrics is not None:
+                    metrics.add_time("crawl", elapsed)
+                _emit((seq, record, None))
+            except BaseException as e:  # surfaced in the consumer
+                _emit((seq, record, e))
+
+    threads = [
+        threading.Thread(target=_crawl_worker, name=f"crawl-{i}", daemon=True) for i in range(crawlers)
+    ]
+    for t in threads:
+        t.start()
+
+    def _produce() -> None:
+        try:
+            if workers > 1:
+                prepared = _prepare_parallel(records, cfg, audit, metrics, workers)
+            else:
+                prepared = _prepare_serial(records, cfg, audit, metrics, profiler)
+            for seq, record, was_processed in prepared:
+                if closed.is_set():
+                    break
+                counters.rows += 1
+                if record["status"] == "found":
+                    counters.found_local += int(not was_processed)
+                elif record["status"] == "not_found" and record["external_urls"]:
+                    counters.prepared += 1
+
+                if crawl_fn is not None and needs_crawl(record):
+                    left = _time_left()
+                    if left is not None and left <= 0:
+                        _skip(seq, record)
+                    else:
+                        priority = -scheduler.score(record) if scheduler is not None else 0.0
+                        work.put((priority, seq, record))
+                else:
+                    _emit((seq, record, None))
+
+            if on_prepared is not None:
+                on_prepared(counters)
+        except BaseException as e:
+            _emit((-1, None, e))
+        finally:
+            for _ in threads:
+                work.put((math.inf, math.inf, None))
+            for t in threads:
+                t.join()
+            if pool is not None:
+                pool.shutdown(wait=True)
+            _emit(_DONE)
+
+    producer = threading.Thread(target=_produce, name="enrich-producer", daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item = out.get()
+            if item is _DONE:
+                break
+            seq, record, exc = item
+            if exc is not None:
+                raise exc
+            counters.completed += 1
+            yield seq, record
+    finally:
+        closed.set()
+
+
+def stream_enrich(
+    records: Iterable[Record],
+    cfg: DiscoveryConfig,
+    crawl_fn: CrawlFn | None,
+    timeout: int = 10,
+    max_pages: int = 3,
+    concurrency: int = 8,
+    keep_order: bool = False,
+    deadline: float | None = None,
+    counters: PipelineCounters | None = None,
+    metrics: Metrics | None = None,
+    profiler: StageProfiler | None = None,
+    audit: bool = False,
+    row_budget: float | None = None,
+    race: bool = False,
+    workers: int = 1,
+) -> Iterator[Record]:
+    """
+    Enrich records one by one and yield each as soon as it is decided (see run_pipeline):
+    local hits immediately, crawled rows as their crawl finishes.
+    With keep_order=True records are yielded in input order.
+    A deadline enables yield-prioritized crawling, as in batch mode.
+    """
+    reorder = _Reorder(keep_order)
+    scheduler = YieldModel() if deadline is not None else None
+    for seq, record in run_pipeline(
+        records,
+        cfg,
+        crawl_fn,
+        timeout,
+        max_pages,
+        concurrency,
+        deadline=deadline,
+        scheduler=scheduler,
+        counters=counters,
+        metrics=metrics,
+        profiler=profiler,
+        audit=audit,
+        row_budget=row_budget,
+        race=race,
+        workers=workers,
+    ):
+        yield from reorder.push(seq, record)
@@ -0,0 +1,177 @@
+# enricher/planner.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping
+from urllib.parse import urlsplit
+
+from .constants import BLOCKED_DOMAINS, OPTIONAL_LOW_VALUE_DOMAINS, SPECULATIVE_PATHS
+from .pipeline import needs_crawl, split_urls
+from .sitemap import MAX_CHILD_SITEMAPS, SITEMAP_PATHS
+from .urls import extract_urls_from_text, get_domain, normalize_url
+
+# Default seconds per page fetch for the projected duration (--plan-latency).
+PLAN_LATENCY_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class CrawlPlan:
+    """
+    What a crawl would cost, from rows after local enrichment and discovery (no network):
+    - rows / rows_to_crawl: rows seen, and rows a crawl would visit
+    - start_urls / domains: unique start URLs and domains to crawl
+    - max_requests: upper bound on page fetches (max_pages per start URL, plus the sitemap
+      fetches with --sitemap, plus the wrong guesses of the --speculative wave, which do not
+      count against max_pages: up to max_pages - 1 more per start URL); retries come on top,
+      up to `retries` per fetch
+    - by_domain: max page fetches per domain
+    - cached_urls / cached_domains: row URLs (and their domains) answered by the run's
+      result cache, because an earlier row has the same start URL
+    - blocklisted: rows per domain that discovery dropped (BLOCKED_DOMAINS / low value)
+    - projected_seconds: duration at `latency` seconds per fetch over `concurrency` workers;
+      never below the longest row, whose URLs are crawled one after another
+    """
+    rows: int
+    rows_to_crawl: int
+    start_urls: int
+    domains: int
+    max_requests: int
+    by_domain: Dict[str, int]
+    cached_urls: int
+    cached_domains: int
+    blocklisted: Dict[str, int]
+    retries: int
+    concurrency: int
+    latency: float
+    projected_seconds: float
+
+
+class CrawlPlanner:
+    """
+    Incremental CrawlPlan over prepared records (the result columns set by the local and
+    discovery stages), in the order the crawl would see them.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 3,
+        concurrency: int = 8,
+        latency: float = PLAN_LATENCY_SECONDS,
+        fields: Iterable[str] = ("bio_links", "bio_text", "description"),
+        sitemap: bool = False,
+        race_urls: bool = False,
+        retries: int = 0,
+        speculative: bool = False,
+        speculative_paths: Iterable[str] = SPECULATIVE_PATHS,
+    ) -> None:
+        self.max_pages = max(1, max_pages)
+        self.concurrency = max(1, concurrency)
+        self.latency = latency
+        self.fields = tuple(fields)
+        self.sitemap = sitemap
+        self.race_urls = race_urls
+        self.retries = retries
+        self.speculative_paths = tuple(speculative_paths) if speculative else ()
+        self.rows = self.rows_to_crawl = self.cached_urls = 0
+        self.by_domain: Dict[str, int] = {}
+        self.blocklisted: Dict[str, int] = {}
+        self._start_urls: set[str] = set()
+        self._cached_domains: set[str] = set()
+        self._longest_row = 0
+
+    def add(self, record: Mapping[str, object]) -> None:
+        self.rows += 1
+        if record.get("status") != "not_found":
+            return
+        self._add_blocklisted(record)
+        if not needs_crawl(record):  # type: ignore[arg-type]
+            return
+        self.rows_to_crawl += 1
+        row_requests = 0
+        for url in split_urls(str(record.get("external_urls") or "")):
+            key = normalize_url(url)
+            domain = get_domain(key)
+            if key in self._start_urls:
+                self.cached_urls += 1
+                self._cached_domains.add(domain)
+                continue
+            self._start_urls.add(key)
+            pages = self.max_pages + self._wrong_guesses(key)
+            if self.sitemap and domain not in self.by_domain:
+                pages += len(SITEMAP_PATHS) + MAX_CHILD_SITEMAPS
+            self.by_domain[domain] = self.by_domain.get(domain, 0) + pages
+            row_requests = max(row_requests, pages) if self.race_urls else row_requests + pages
+        self._longest_row = max(self._longest_row, row_requests)
+
+    def _wrong_guesses(self, start_url: str) -> int:
+        # the guesses sharing the start page's wave (at most max_pages - 1) may all miss
+        parts = urlsplit(start_url)
+        root = f"{parts.scheme}://{parts.netloc}"
+        guesses = {normalize_url(root + p) for p in self.speculative_paths} - {start_url}
+        return min(len(guesses), self.max_pages - 1)
+
+    def _add_blocklisted(self, record: Mapping[str, object]) -> None:
+        # discovery drops these silently; count each domain once per row
+        seen = set()
+        for name in self.fields:
+            for u in extract_urls_from_text(str(record.get(name) or "")):
+                domain = get_domain(normalize_url(u))
+                if domain in BLOCKED_DOMAINS or domain in OPTIONAL_LOW_VALUE_DOMAINS:
+                    seen.add(domain)
+        for domain in seen:
+            self.blocklisted[domain] = self.blocklisted.get(domain, 0) + 1
+
+    def result(self) -> CrawlPlan:
+        total = sum(self.by_domain.values())
+        projected = max(total * self.latency / self.concurrency, self._longest_row * self.latency)
+        return CrawlPlan(
+            rows=self.rows,
+            rows_to_crawl=self.rows_to_crawl,
+            start_urls=len(self._start_urls),
+            domains=len(self.by_domain),
+            max_requests=total,
+            by_domain=dict(self.by_domain),
+            cached_urls=self.cached_urls,
+            cached_domains=len(self._cached_domains),
+            blocklisted=dict(self.blocklisted),
+            retries=self.retries,
+            concurrency=self.concurrency,
+            latency=self.latency,
+            projected_seconds=projected,
+        )
+
+
+def _duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+def format_plan(plan: CrawlPlan, top: int = 10, deadline_seconds: float | None = None) -> str:
+    """Human-readable plan: totals, then the domains with the most fetches."""
+    text = (
+        "=== Crawl Plan (dry run, no network) ===\n"
+        f"Rows: {plan.rows} | to crawl: {plan.rows_to_crawl}\n"
+        f"Unique domains: {plan.domains} | unique start URLs: {plan.start_urls}\n"
+        f"Max requests: {plan.max_requests}"
+        + (f" (up to {plan.max_requests * plan.retries} more with --retries {plan.retries})" if plan.retries else "")
+        + "\n"
+        f"Answered from the result cache: {plan.cached_urls} row URLs ({plan.cached_domains} domains)\n"
+        f"Blocklisted domains dropped by discovery: {len(plan.blocklisted)} "
+        f"({sum(plan.blocklisted.values())} row mentions)\n"
+        f"Projected duration: {_duration(plan.projected_seconds)} "
+        f"(concurrency {plan.concurrency}, {plan.latency:g}s per request)\n"
+    )
+    if deadline_seconds is not None and plan.projected_seconds > deadline_seconds:
+        text += f"Exceeds --time-budget ({_duration(deadline_seconds)}): low-yield rows would be skipped\n"
+    if plan.by_domain:
+        text += "Top domains by requests:\n"
+        ranked = sorted(plan.by_domain.items(), key=lambda kv: (-kv[1], kv[0]))
+        for domain, n in ranked[:top]:
+            text += f"  - {domain}: {n}\n"
+    if plan.blocklisted:
+        ranked = sorted(plan.blocklisted.items(), key=lambda kv: (-kv[1], kv[0]))
+        text += "Blocklisted: " + ", ".join(f"{d} ({n})" for d, n in ranked[:top]) + "\n"
+    return text
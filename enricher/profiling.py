@@ -0,0 +1,116 @@
+# enricher/profiling.py
+from __future__ import annotations
+
+import cProfile
+import json
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, Tuple
+
+_NULL = nullcontext()
+
+
+class StageProfiler:
+    """
+    cProfile per stage, one <out_dir>/<stage>.pstats file per stage name.
+
+    section(name) profiles the current thread while the block runs. Every thread gets its
+    own profile per stage (cProfile only sees the thread that enabled it), and the profiles
+    of a stage are merged when written: crawl.pstats covers all crawl workers, and a stage
+    run once per row (local, discovery, crawl) accumulates over every row and file.
+
+    With memory=True, tracemalloc runs for the whole process and section(name, memory=True)
+    also records the peak traced memory of the block and dumps a tracemalloc snapshot
+    (<stage>.tracemalloc) at its end. Peaks are only meaningful for blocks that do not
+    overlap other stages, so the pipeline only measures them around whole phases.
+
+    On Python 3.12+ only one cProfile can be active per process; sections that cannot
+    enable their profiler run unprofiled and are counted in `unprofiled`.
+    """
+
+    def __init__(self, out_dir: Path, memory: bool = False) -> None:
+        self.out_dir = Path(out_dir)
+        self.memory = memory
+        self.peaks: Dict[str, int] = {}
+        self.unprofiled: Dict[str, int] = {}
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self._used: set[Tuple[str, int]] = set()
+        self._lock = threading.Lock()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def section(self, name: str, memory: bool = False, cpu: bool = True) -> Iterator[None]:
+        """
+        Profile the block as stage `name`. cpu=False skips cProfile (memory only): for blocks
+        whose stages profile themselves, since profiles cannot nest on Python 3.12+.
+        """
+        key = (name, threading.get_ident())
+        prof = None
+        if cpu:
+            with self._lock:
+                prof = self._profiles.get(key)
+                if prof is None:
+                    prof = self._profiles[key] = cProfile.Profile()
+
+        track_memory = memory and self.memory
+        if track_memory:
+            tracemalloc.reset_peak()
+
+        enabled = False
+        if prof is not None:
+            try:
+                prof.enable()
+                enabled = True
+            except ValueError:  # another profiler is active (Python 3.12+)
+                with self._lock:
+                    self.unprofiled[name] = self.unprofiled.get(name, 0) + 1
+
+        try:
+            yield
+        finally:
+            if enabled:
+                prof.disable()
+                with self._lock:
+                    self._used.add(key)
+            if track_memory:
+                self._record_memory(name)
+
+    def _record_memory(self, name: str) -> None:
+        peak = tracemalloc.get_traced_memory()[1]
+        with self._lock:
+            self.peaks[name] = max(self.peaks.get(name, 0), peak)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tracemalloc.take_snapshot().dump(str(self.out_dir / f"{name}.tracemalloc"))
+
+    def write(self) -> list[Path]:
+        """Write one merged .pstats file per stage (plus memory.json with peaks); returns the paths."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        by_stage: Dict[str, list[cProfile.Profile]] = {}
+        with self._lock:
+            for key in sorted(self._used):
+                by_stage.setdefault(key[0], []).append(self._profiles[key])
+
+        written = []
+        for stage, profiles in by_stage.items():
+            path = self.out_dir / f"{stage}.pstats"
+            pstats.Stats(*profiles).dump_stats(str(path))
+            written.append(path)
+
+        if self.memory:
+            path = self.out_dir / "memory.json"
+            path.write_text(json.dumps({"peak_bytes": self.peaks}, indent=2), encoding="utf-8")
+            written.append(path)
+        return written
+
+    def close(self) -> None:
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def profiled(profiler: StageProfiler | None, name: str) -> ContextManager[None]:
+    """profiler.section(name), or a no-op when profiling is off."""
+    return profiler.section(name) if profiler is not None else _NULL
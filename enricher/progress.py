@@ -0,0 +1,168 @@
+# enricher/progress.py
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, TextIO
+
+# Rates (rows/s, pages/s) are computed over this sliding window, so the ETA follows
+# the current throughput rather than the run average.
+RATE_WINDOW_SECONDS = 30.0
+
+_BAR_WIDTH = 24
+
+
+def resolve_mode(mode: str, stream: TextIO) -> str:
+    """'auto' -> 'bar' on a TTY, 'log' otherwise. 'bar' / 'log' / 'off' are kept."""
+    if mode != "auto":
+        return mode
+    isatty = getattr(stream, "isatty", None)
+    return "bar" if isatty is not None and isatty() else "log"
+
+
+def format_duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "?"
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h{m:02d}m"
+    if m:
+        return f"{m}m{s:02d}s"
+    return f"{s}s"
+
+
+class ProgressReporter:
+    """
+    Live progress for a run: stage, rows done / total, rows/s, pages/s, in-flight requests,
+    emails found so far and ETA.
+
+    A background thread samples the counters the pipeline and crawler already keep
+    (PipelineCounters, CrawlState.pages / inflight), so the hot path pays nothing extra.
+    - 'bar': a single refreshed line on a TTY (every 0.5 s by default)
+    - 'log': periodic logfmt lines for log collectors (every 10 s by default), e.g.
+      progress stage=crawl rows_done=4500 rows_total=10000 rows_per_s=320.0 ... eta_s=17
+    - 'off': nothing
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        interval: float | None = None,
+        stream: TextIO | None = None,
+        state: Any = None,
+    ) -> None:
+        self.stream = stream or sys.stderr
+        self.mode = resolve_mode(mode, self.stream)
+        self.interval = interval if interval else (0.5 if self.mode == "bar" else 10.0)
+        self.state = state
+        self.stage = "start"
+        self.total: int | None = None
+        self.counters: Any = None
+        self._samples: deque = deque()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    # -- stage control (called by the run) --
+    def set_stage(self, stage: str, total: int | None = None, counters: Any = None) -> None:
+        with self._lock:
+            self.stage = stage
+            self.total = total
+            self.counters = counters
+            self._samples.clear()
+        self._emit()
+
+    def start(self) -> "ProgressReporter":
+        if self.mode != "off" and self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="progress", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._emit()
+        if self.mode == "bar":
+            with self._lock:
+                self.stream.write("\n")
+                self.stream.flush()
+
+    def __enter__(self) -> "ProgressReporter":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    # -- sampling / rendering --
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        c = self.counters
+        done = getattr(c, "completed", 0) if c is not None else 0
+        found = (getattr(c, "found_local", 0) + getattr(c, "found_crawl", 0)) if c is not None else 0
+        pages = getattr(self.state, "pages", 0) if self.state is not None else 0
+        inflight = getattr(self.state, "inflight", 0) if self.state is not None else 0
+
+        with self._lock:
+            self._samples.append((now, done, pages))
+            while len(self._samples) > 2 and now - self._samples[0][0] > RATE_WINDOW_SECONDS:
+                self._samples.popleft()
+            t0, done0, pages0 = self._samples[0]
+            total = self.total
+            stage = self.stage
+
+        span = now - t0
+        rows_per_s = (done - done0) / span if span > 0 else 0.0
+        pages_per_s = (pages - pages0) / span if span > 0 else 0.0
+        eta = None
+        if total is not None and rows_per_s > 0:
+            eta = max(0.0, (total - done) / rows_per_s)
+
+        return {
+            "stage": stage,
+            "rows_done": done,
+            "rows_total": total,
+            "rows_per_s": round(rows_per_s, 1),
+            "pages_per_s": round(pages_per_s, 1),
+            "inflight": inflight,
+            "found": found,
+            "eta_s": None if eta is None else int(round(eta)),
+        }
+
+    def render_bar(self, snap: Dict[str, Any]) -> str:
+        total = snap["rows_total"]
+        if total:
+            frac = min(1.0, snap["rows_done"] / total)
+            filled = int(frac * _BAR_WIDTH)
+            bar = "#" * filled + "-" * (_BAR_WIDTH - filled)
+            head = f"[{snap['stage']}] {bar} {frac * 100:5.1f}% {snap['rows_done']}/{total}"
+        else:
+            head = f"[{snap['stage']}] {snap['rows_done']} rows"
+        return (
+            f"{head} | {snap['rows_per_s']} rows/s | {snap['pages_per_s']} pages/s"
+            f" | in-flight {snap['inflight']} | found {snap['found']} | ETA {format_duration(snap['eta_s'])}"
+        )
+
+    @staticmethod
+    def render_log(snap: Dict[str, Any]) -> str:
+        fields = " ".join(f"{k}={'' if v is None else v}" for k, v in snap.items())
+        return f"progress {fields}"
+
+    def _emit(self) -> None:
+        if self.mode == "off":
+            return
+        snap = self.snapshot()
+        line = "\r\033[K" + self.render_bar(snap) if self.mode == "bar" else self.render_log(snap) + "\n"
+        # set_stage / stop (the run's thread) and the sampling thread both emit: one line at a time
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._emit()
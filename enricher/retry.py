@@ -0,0 +1,71 @@
+# enricher/retry.py
+from __future__ import annotations
+
+import random
+import threading
+from dataclasses import dataclass
+from typing import Dict
+
+# Failure classes of one fetch (see crawler.failure_class):
+# - connect: DNS / TCP / TLS errors and connect timeouts
+# - read_timeout: the server accepted the connection but stalled
+# - read: connection dropped while reading the body
+# - 5xx: server error responses
+RETRYABLE_CLASSES = ("connect", "read_timeout", "read", "5xx")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how long to wait before re-fetching a page after a transient failure:
+    - retries: extra attempts per fetch (0 = never retry)
+    - retry_on: failure classes worth retrying (4xx answers, 429 included, never are:
+      the circuit breaker handles throttling)
+    - base_delay / max_delay: exponential backoff with full jitter, i.e. a uniform wait in
+      [0, min(max_delay, base_delay * 2**attempt)], so workers retrying the same host spread out
+    """
+    retries: int = 2
+    retry_on: tuple[str, ...] = RETRYABLE_CLASSES
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def should_retry(self, kind: str | None, attempt: int) -> bool:
+        """attempt: 0 for the first retry of a fetch."""
+        return kind is not None and kind in self.retry_on and attempt < self.retries
+
+    def backoff(self, attempt: int, rng: random.Random | None = None) -> float:
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return (rng or random).uniform(0.0, cap)
+
+
+class RetryBudget:
+    """
+    Retries allowed over a whole run (thread-safe), so a dead network or an overloaded
+    upstream cannot multiply the run time: once spent, failures are final.
+    - limit: None = unlimited
+    - used / by_class: retries granted, in total and per failure class
+    - denied: retries refused because the budget was spent
+    """
+
+    def __init__(self, limit: int | None = None) -> None:
+        self.limit = limit
+        self.used = 0
+        self.denied = 0
+        self.by_class: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, kind: str) -> bool:
+        with self._lock:
+            if self.limit is not None and self.used >= self.limit:
+                self.denied += 1
+                return False
+            self.used += 1
+            self.by_class[kind] = self.by_class.get(kind, 0) + 1
+            return True
+
+    def summary(self) -> str:
+        parts = ", ".join(f"{k} {v}" for k, v in sorted(self.by_class.items()))
+        line = f"Retries: {self.used}" + (f" ({parts})" if parts else "")
+        if self.limit is not None:
+            line += f" | budget {self.limit}, denied {self.denied}"
+        return line
@@ -0,0 +1,141 @@
+# enricher/scheduler.py
+from __future__ import annotations
+
+import heapq
+import queue
+import threading
+from typing import Dict, Mapping
+from urllib.parse import urlparse
+
+from .constants import KEYWORD_HINTS
+
+# Prior probability that crawling a row finds an email, by the field its URLs came from.
+# Explicit bio links are the strongest signal; URLs guessed out of free text are weaker.
+SOURCE_PRIOR_HIT_RATE = {
+    "bio_links": 0.35,
+    "bio_text": 0.25,
+    "description": 0.2,
+}
+DEFAULT_PRIOR_HIT_RATE = 0.2
+
+# Weight of the prior, in pseudo-observations, when blending with hit rates observed in the run.
+PRIOR_WEIGHT = 10.0
+
+# Expected seconds per row crawl before any latency has been observed.
+DEFAULT_CRAWL_SECONDS = 3.0
+
+# Expected seconds for a URL that was already crawled in this process (answered from cache).
+CACHED_CRAWL_SECONDS = 0.01
+
+# Waiting rows rescored before each pick from a RescoringQueue (best by their last score first).
+RESCORE_WINDOW = 32
+
+
+def url_shape_factor(url: str) -> float:
+    """
+    Cheap multiplier from the shape of a URL:
+    - contact-ish path (contact/about/legal...) -> likely to hold an email right away
+    - homepage -> neutral
+    - deep paths (articles, products...) -> less likely
+    """
+    try:
+        path = urlparse(url).path.lower().strip("/")
+    except Exception:
+        return 1.0
+    if not path:
+        return 1.0
+    if any(k in path for k in KEYWORD_HINTS):
+        return 1.5
+    if path.count("/") >= 2:
+        return 0.7
+    return 0.9
+
+
+class YieldModel:
+    """
+    Scores crawl work by expected yield per second:
+
+        score = P(hit) / expected crawl seconds
+
+    P(hit) starts from a per-discovery_source prior blended with the hit rate observed
+    so far in the run, adjusted by URL shape. Expected seconds come from latencies observed
+    for the row's domain (near zero when its URL was already crawled), else the run average.
+    Thread-safe: crawl workers report outcomes with observe().
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._attempts: Dict[str, int] = {}
+        self._hits: Dict[str, int] = {}
+        self._domain_seconds: Dict[str, float] = {}
+        self._crawled_urls: set[str] = set()
+        self._total_seconds = 0.0
+        self._total_rows = 0
+
+    def hit_rate(self, source: str) -> float:
+        prior = SOURCE_PRIOR_HIT_RATE.get(source, DEFAULT_PRIOR_HIT_RATE)
+        with self._lock:
+            attempts = self._attempts.get(source, 0)
+            hits = self._hits.get(source, 0)
+        return (hits + prior * PRIOR_WEIGHT) / (attempts + PRIOR_WEIGHT)
+
+    def expected_seconds(self, urls: list[str], domain: str) -> float:
+        with self._lock:
+            if urls and urls[0] in self._crawled_urls:
+                return CACHED_CRAWL_SECONDS
+            if domain in self._domain_seconds:
+                return max(self._domain_seconds[domain], CACHED_CRAWL_SECONDS)
+            if self._total_rows:
+                return max(self._total_seconds / self._total_rows, CACHED_CRAWL_SECONDS)
+        return DEFAULT_CRAWL_SECONDS
+
+    def score(self, record: Mapping[str, object]) -> float:
+        urls = [u for u in str(record.get("external_urls") or "").split("|") if u]
+        if not urls:
+            return 0.0
+        p = self.hit_rate(str(record.get("discovery_source") or ""))
+        p_row = min(1.0, p * url_shape_factor(urls[0]))
+        # each extra URL is another (weaker) chance
+        for u in urls[1:]:
+            p_row += (1.0 - p_row) * p * url_shape_factor(u) * 0.5
+        return p_row / self.expected_seconds(urls, str(record.get("primary_domain") or ""))
+
+    def observe(self, record: Mapping[str, object], found: bool, seconds: float) -> None:
+        source = str(record.get("discovery_source") or "")
+        domain = str(record.get("primary_domain") or "")
+        urls = [u for u in str(record.get("external_urls") or "").split("|") if u]
+        with self._lock:
+            self._attempts[source] = self._attempts.get(source, 0) + 1
+            self._hits[source] = self._hits.get(source, 0) + int(found)
+            if domain:
+                self._domain_seconds[domain] = seconds
+            if urls:
+                self._crawled_urls.add(urls[0])
+            self._total_seconds += seconds
+            self._total_rows += 1
+
+
+class RescoringQueue(queue.PriorityQueue):
+    """
+    Crawl work queue of (priority, seq, record) entries, lowest priority first, where a
+    record's priority is -model.score(record).
+
+    Scores move as crawl workers observe() outcomes, so on each get the `window` best
+    entries by their last score are rescored and the best of them is returned; the others
+    go back with their new score. Entries with a None record (end-of-work sentinels) keep
+    their priority. Thread-safe and bounded like queue.PriorityQueue (maxsize).
+    """
+
+    def __init__(self, model: YieldModel, maxsize: int = 0, window: int = RESCORE_WINDOW) -> None:
+        super().__init__(maxsize)
+        self.model = model
+        self.window = max(1, window)
+
+    def _get(self):
+        head = [heapq.heappop(self.queue) for _ in range(min(self.window, len(self.queue)))]
+        head = [(p, seq, r) if r is None else (-self.model.score(r), seq, r) for p, seq, r in head]
+        best = min(head)
+        for entry in head:
+            if entry is not best:
+                heapq.heappush(self.queue, entry)
+        return best
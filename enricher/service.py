@@ -0,0 +1,189 @@
+# enricher/service.py
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import urlsplit
+
+from .api import Enricher
+from .metrics import Histogram
+
+# Request latency buckets: cached answers take milliseconds, fresh crawls seconds.
+SERVE_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+# Larger POST bodies are refused (413); batches that big belong in a CSV run.
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class ServiceStats:
+    """Request counters and the latency histogram of POST /enrich (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+        self.latency = Histogram(SERVE_LATENCY_BUCKETS)
+
+    def observe(self, seconds: float, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self.requests += 1
+            self.rows += len(rows)
+            self.latency.observe(seconds)
+            for row in rows:
+                st = row.get("status", "")
+                self.statuses[st] = self.statuses.get(st, 0) + 1
+
+    def error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self, enricher: Enricher) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {
+                "uptime_seconds": round(time.monotonic() - self._t0, 3),
+                "requests": self.requests,
+                "rows": self.rows,
+                "errors": self.errors,
+                "statuses": dict(self.statuses),
+                "latency_seconds": self.latency.to_dict(),
+            }
+        state = enricher.state
+        if state is not None:
+            cache = state.cache
+            out["cache"] = {
+                "size": len(cache),
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "coalesced": cache.coalesced,
+                "inflight": cache.inflight,
+            }
+            budget = state.retry_budget
+            out["retries"] = {"used": budget.used, "denied": budget.denied, "by_class": dict(budget.by_class)}
+            out["fetch_cuts"] = dict(state.timeouts.cuts)
+        if enricher.metrics is not None:
+            out["fetch"] = enricher.metrics.snapshot()["fetch"]
+        return out
+
+
+def parse_rows(body: bytes) -> tuple[List[Dict[str, str]], bool]:
+    """
+    Rows of a POST /enrich body and whether it was a single row:
+    - a JSON object is one row, a JSON array a list of rows
+    - values are converted to strings (null -> ""), as the CSV readers produce them
+    Raises ValueError on anything else.
+    """
+    data = json.loads(body.decode("utf-8"))
+    single = isinstance(data, dict)
+    items = [data] if single else data
+    if not isinstance(items, list) or not all(isinstance(r, dict) for r in items):
+        raise ValueError("expected a JSON object or an array of objects")
+    rows = [{str(k): "" if v is None else str(v) for k, v in r.items()} for r in items]
+    return rows, single
+
+
+class EnrichService:
+    """
+    Local HTTP API around one warm Enricher (cache, connection pools and circuit breakers
+    persist across requests; concurrent requests for a URL being crawled share that crawl):
+    - POST /enrich: a JSON row or array of rows in, the enriched row(s) out, input order kept
+    - GET /stats: request counts, latency percentiles, cache and fetch figures
+    - GET /health: {"status": "ok"}
+    Each request runs in its own thread (ThreadingHTTPServer).
+    """
+
+    def __init__(self, enricher: Enricher, host: str = "127.0.0.1", port: int = 8765) -> None:
+        self.enricher = enricher
+        self.stats = ServiceStats()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._httpd.server_address[:2]
+        return str(host), int(port)
+
+    def enrich(self, rows: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        t = time.perf_counter()
+        out = list(self.enricher.enrich_rows(rows))
+        self.stats.observe(time.perf_counter() - t, out)
+        return out
+
+    def _handler_class(self) -> type:
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 (http.server API)
+                path = urlsplit(self.path).path
+                if path == "/stats":
+                    return self._send(200, service.stats.snapshot(service.enricher))
+                if path == "/health":
+                    return self._send(200, {"status": "ok"})
+                self._send(404, {"error": f"not found: {path}"})
+
+            def do_POST(self) -> None:  # noqa: N802 (http.server API)
+                path = urlsplit(self.path).path
+                if path != "/enrich":
+                    return self._send(404, {"error": f"not found: {path}"})
+                raw_length = (self.headers.get("Content-Length") or "0").strip()
+                if not (raw_length.isascii() and raw_length.isdigit()):
+                    # the body cannot be delimited: answer and drop the connection
+                    self.close_connection = True
+                    service.stats.error()
+                    return self._send(400, {"error": f"invalid Content-Length: {raw_length!r}"})
+                length = int(raw_length)
+                if length > MAX_BODY_BYTES:
+                    self.close_connection = True
+                    return self._send(413, {"error": f"body larger than {MAX_BODY_BYTES} bytes"})
+                try:
+                    rows, single = parse_rows(self.rfile.read(length))
+                except ValueError as e:  # includes JSON and UTF-8 decoding errors
+                    service.stats.error()
+                    return self._send(400, {"error": f"invalid body: {e}"})
+                try:
+                    out = service.enrich(rows)
+                except Exception as e:
+                    service.stats.error()
+                    return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+                self._send(200, out[0] if single else out)
+
+            def _send(self, code: int, payload: Any) -> None:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        return Handler
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def start(self) -> "EnrichService":
+        """Serve from a background thread (embedding, tests)."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="enrich-service", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "EnrichService":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
@@ -0,0 +1,81 @@
+# enricher/sharding.py
+from __future__ import annotations
+
+import hashlib
+import re
+from pathlib import Path
+
+import pandas as pd
+
+# Original row position, carried through shard runs so merge can restore the input order.
+ROW_ID_COLUMN = "_row_id"
+
+_SHARD_SUFFIX_RE = re.compile(r"\.shard-\d+-of-\d+")
+
+
+def shard_key(domain: str) -> str:
+    """Domain used for partitioning: 'www.' variants of a site land in the same shard."""
+    d = (domain or "").strip().lower()
+    return d[4:] if d.startswith("www.") else d
+
+
+def shard_of(domain: str, shards: int) -> int:
+    """
+    Stable shard index for a domain (same result on every machine / Python run,
+    unlike hash()).
+    """
+    digest = hashlib.blake2b(shard_key(domain).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def assign_shards(df: pd.DataFrame, shards: int) -> list[int]:
+    """
+    Shard index per row:
+    - rows with a primary_domain are partitioned by domain, so each domain is crawled in one shard
+    - rows without one (resolved locally / nothing to crawl) are spread round-robin
+    """
+    if shards < 1:
+        raise ValueError("shards must be >= 1")
+    domains = df["primary_domain"].astype(str).tolist() if "primary_domain" in df.columns else [""] * len(df)
+    return [shard_of(d, shards) if d else i % shards for i, d in enumerate(domains)]
+
+
+def split_frame(df: pd.DataFrame, shards: int) -> list[pd.DataFrame]:
+    """Split a prepared frame into `shards` frames, tagging each row with its original position."""
+    df = df.copy()
+    df.insert(0, ROW_ID_COLUMN, [str(i) for i in range(len(df))])
+    assignment = pd.Series(assign_shards(df, shards), index=df.index)
+    return [df[assignment == i].reset_index(drop=True) for i in range(shards)]
+
+
+def merge_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Reassemble shard outputs into the original row order and drop the row id column.
+    Raises ValueError when row ids are missing or duplicated (e.g. a shard output is absent).
+    """
+    for f in frames:
+        if ROW_ID_COLUMN not in f.columns:
+            raise ValueError(f"Shard output has no '{ROW_ID_COLUMN}' column; was it produced by 'split'?")
+
+    merged = pd.concat(frames, ignore_index=True)
+    ids = merged[ROW_ID_COLUMN].astype(int)
+    if ids.duplicated().any():
+        raise ValueError("Duplicate rows across shard outputs (same shard given twice?).")
+    if len(ids) and (ids.min() != 0 or ids.max() != len(ids) - 1):
+        raise ValueError(f"Shard outputs cover {len(ids)} rows but row ids go up to {ids.max()}; a shard is missing.")
+
+    merged = merged.iloc[ids.argsort(kind="stable")].drop(columns=[ROW_ID_COLUMN])
+    return merged.reset_index(drop=True)
+
+
+def shard_path(input_path: Path, index: int, shards: int, out_dir: Path | None = None) -> Path:
+    """<out_dir>/<stem>.shard-01-of-04.csv (1-based in the name)."""
+    width = len(str(shards))
+    name = f"{input_path.stem}.shard-{index + 1:0{width}d}-of-{shards}{input_path.suffix or '.csv'}"
+    return (out_dir or input_path.parent) / name
+
+
+def merged_path(shard_output: Path) -> Path:
+    """Default merge output: strip the shard suffix -> <stem>_enriched.csv next to the shards."""
+    stem = _SHARD_SUFFIX_RE.sub("", shard_output.stem).replace("_enriched", "")
+    return shard_output.with_name(f"{stem}_enriched{shard_output.suffix or '.csv'}")
@@ -0,0 +1,135 @@
+# enricher/sitemap.py
+from __future__ import annotations
+
+import threading
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from urllib.parse import urlsplit
+
+from .constants import SITEMAP_PAGE_HINTS
+from .urls import get_domain, normalize_url
+
+# Where sitemaps are looked for, in order (the first one that answers is used).
+SITEMAP_PATHS = ("/sitemap.xml", "/sitemap_index.xml")
+
+# Child sitemaps followed from a sitemap index, and <loc> entries read per sitemap
+# (50,000 is the protocol's maximum).
+MAX_CHILD_SITEMAPS = 3
+MAX_LOCS = 50_000
+
+# Fetches a sitemap URL and returns its body as byte chunks, or None when unavailable.
+SitemapFetch = Callable[[str], Iterable[bytes] | None]
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _gunzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield d.decompress(chunk)
+    yield d.flush()
+
+
+def parse_sitemap(chunks: Iterable[bytes], gzipped: bool = False) -> Tuple[List[str], List[str]]:
+    """
+    Stream-parse a sitemap or sitemap index: (page URLs, child sitemap URLs).
+    Elements are dropped as soon as they are read, so memory stays flat on large sitemaps.
+    Malformed XML (or gzip data) ends the parse with what was read so far.
+    """
+    pages: List[str] = []
+    children: List[str] = []
+    parser = ET.XMLPullParser(events=("end",))
+    try:
+        for chunk in _gunzip(chunks) if gzipped else chunks:
+            parser.feed(chunk)
+            for _, elem in parser.read_events():
+                name = _local(elem.tag)
+                if name in ("url", "sitemap"):
+                    loc = next((c.text for c in elem if _local(c.tag) == "loc" and c.text), None)
+                    if loc:
+                        (pages if name == "url" else children).append(loc.strip())
+                    elem.clear()
+                if len(pages) + len(children) >= MAX_LOCS:
+                    return pages, children
+        parser.close()
+    except (ET.ParseError, zlib.error):
+        pass
+    return pages, children
+
+
+def contact_urls(urls: Iterable[str], domain: str, limit: int = 3) -> List[str]:
+    """
+    Same-domain page URLs whose path has a contact-ish hint (SITEMAP_PAGE_HINTS), best first:
+    by hint priority, then shortest path (/contact before /blog/how-to-contact-us).
+    """
+    ranked: Dict[str, Tuple[int, int]] = {}
+    for u in urls:
+        path = urlsplit(u).path.lower()
+        rank = next((i for i, hint in enumerate(SITEMAP_PAGE_HINTS) if hint in path), None)
+        if rank is None or get_domain(u) != domain:
+            continue
+        nu = normalize_url(u)
+        if nu and nu not in ranked:
+            ranked[nu] = (rank, len(path))
+    return sorted(ranked, key=ranked.__getitem__)[:limit]
+
+
+def find_contact_urls(root: str, fetch: SitemapFetch, limit: int = 3) -> List[str]:
+    """
+    Contact-ish URLs of a site from its sitemap: the first of SITEMAP_PATHS that answers,
+    and up to MAX_CHILD_SITEMAPS child sitemaps of an index (those with a contact-ish name first).
+    """
+    domain = get_domain(root)
+    for path in SITEMAP_PATHS:
+        url = root.rstrip("/") + path
+        body = fetch(url)
+        if body is None:
+            continue
+        pages, children = parse_sitemap(body, gzipped=url.endswith(".gz"))
+        # e.g. WordPress indexes: page-sitemap.xml is likelier to list /contact than post-sitemap.xml
+        children.sort(key=lambda c: not any(h in c.lower() for h in ("page", "main", *SITEMAP_PAGE_HINTS)))
+        for child in children[:MAX_CHILD_SITEMAPS]:
+            if get_domain(child) != domain:
+                continue
+            child_body = fetch(child)
+            if child_body is not None:
+                pages += parse_sitemap(child_body, gzipped=child.endswith(".gz"))[0]
+        return contact_urls(pages, domain, limit)
+    return []
+
+
+class SitemapCache:
+    """
+    Contact-ish URLs per domain, from its sitemap (thread-safe). Each domain's sitemap is
+    fetched once per process: concurrent lookups for a domain wait for the first one.
+    """
+
+    def __init__(self, limit: int = 3) -> None:
+        self.limit = limit
+        self._data: Dict[str, List[str]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.fetched = 0
+
+    def contact_urls(self, root: str, fetch: SitemapFetch) -> List[str]:
+        domain = get_domain(root)
+        with self._lock:
+            if domain in self._data:
+                return self._data[domain]
+            domain_lock = self._locks.setdefault(domain, threading.Lock())
+        with domain_lock:
+            with self._lock:
+                if domain in self._data:
+                    return self._data[domain]
+            urls = find_contact_urls(root, fetch, self.limit)
+            with self._lock:
+                self._data[domain] = urls
+                self.fetched += 1
+                self._locks.pop(domain, None)
+            return urls
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -2,7 +2,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-import pandas as pd
+from typing import TYPE_CHECKING, Iterable, Mapping
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 @dataclass(frozen=True)
@@ -14,6 +17,7 @@ class RunStats:
     blocked: int
     not_found: int
     prepared_with_external_urls: int
+    skipped_budget: int = 0
 
     def recovery_rate_pct(self) -> float:
         if self.total_rows <= 0:
@@ -26,6 +30,8 @@ def compute_stats(df: pd.DataFrame) -> RunStats:
     Compute execution stats from the enriched dataframe.
     Requires at least columns: status, method, external_urls.
     """
+    import pandas as pd
+
     total = len(df)
 
     def _count(mask) -> int:
@@ -41,6 +47,7 @@ def compute_stats(df: pd.DataFrame) -> RunStats:
     found_total = _count(status == "found")
     blocked = _count(status == "blocked")
     not_found = _count(status == "not_found")
+    skipped_budget = _count(status == "skipped_budget")
 
     found_local = _count((status == "found") & (method.isin(["detected_emails", "bio_text"])))
     found_crawl = _count((status == "found") & (method == "crawl"))
@@ -55,15 +62,73 @@ def compute_stats(df: pd.DataFrame) -> RunStats:
         blocked=blocked,
         not_found=not_found,
         prepared_with_external_urls=prepared,
+        skipped_budget=skipped_budget,
     )
 
 
-def format_stats(stats: RunStats) -> str:
+def combine_stats(parts: Iterable[RunStats]) -> RunStats:
+    """Sum RunStats of several files (or shards) into one."""
+    parts = list(parts)
+    return RunStats(
+        total_rows=sum(s.total_rows for s in parts),
+        found_total=sum(s.found_total for s in parts),
+        found_local=sum(s.found_local for s in parts),
+        found_crawl=sum(s.found_crawl for s in parts),
+        blocked=sum(s.blocked for s in parts),
+        not_found=sum(s.not_found for s in parts),
+        prepared_with_external_urls=sum(s.prepared_with_external_urls for s in parts),
+        skipped_budget=sum(s.skipped_budget for s in parts),
+    )
+
+
+class StatsTally:
+    """
+    Incremental RunStats for record-at-a-time runs (streaming mode),
+    counting exactly what compute_stats counts on a dataframe.
+    """
+
+    def __init__(self) -> None:
+        self.total = self.found_total = self.found_local = self.found_crawl = 0
+        self.blocked = self.not_found = self.prepared = self.skipped_budget = 0
+
+    def add(self, record: Mapping[str, object]) -> None:
+        status = record.get("status")
+        method = record.get("method")
+        self.total += 1
+        if status == "found":
+            self.found_total += 1
+            if method in ("detected_emails", "bio_text"):
+                self.found_local += 1
+            elif method == "crawl":
+                self.found_crawl += 1
+        elif status == "blocked":
+            self.blocked += 1
+        elif status == "not_found":
+            self.not_found += 1
+        elif status == "skipped_budget":
+            self.skipped_budget += 1
+        if str(record.get("external_urls") or ""):
+            self.prepared += 1
+
+    def result(self) -> RunStats:
+        return RunStats(
+            total_rows=self.total,
+            found_total=self.found_total,
+            found_local=self.found_local,
+            found_crawl=self.found_crawl,
+            blocked=self.blocked,
+            not_found=self.not_found,
+            prepared_with_external_urls=self.prepared,
+            skipped_budget=self.skipped_budget,
+        )
+
+
+def format_stats(stats: RunStats, title: str = "Run Summary") -> str:
     """
     Create a human-readable summary.
     """
-    return (
-        "=== Run Summary ===\n"
+    text = (
+        f"=== {title} ===\n"
         f"Total rows: {stats.total_rows}\n"
         f"Found (total): {stats.found_total} ({stats.recovery_rate_pct()}%)\n"
         f"  - Found (local): {stats.found_local}\n"
@@ -72,3 +137,6 @@ def format_stats(stats: RunStats) -> str:
         f"Blocked (403/429): {stats.blocked}\n"
         f"Not found: {stats.not_found}\n"
     )
+    if stats.skipped_budget:
+        text += f"Skipped (time budget): {stats.skipped_budget}\n"
+    return text
@@ -0,0 +1,68 @@
+# enricher/streaming.py
+from __future__ import annotations
+
+import csv
+import itertools
+import json
+from typing import Iterator, TextIO
+
+# Same candidates as io_utils.detect_delimiter
+_SNIFF_DELIMITERS = [",", ";", "\t", "|"]
+
+
+def _first_line(stream: TextIO) -> str:
+    for line in stream:
+        if line.strip():
+            return line
+    return ""
+
+
+def detect_format(first_line: str) -> str:
+    """'jsonl' if the first non-empty line is a JSON object, else 'csv'."""
+    return "jsonl" if first_line.lstrip("\ufeff").lstrip().startswith("{") else "csv"
+
+
+def read_records(stream: TextIO, fmt: str = "auto", sep: str | None = None) -> Iterator[dict]:
+    """
+    Lazily read records from a text stream (typically stdin).
+    - fmt: 'csv', 'jsonl' or 'auto' (sniffed from the first non-empty line)
+    - sep: CSV delimiter (sniffed from the header line if omitted)
+    Values are kept as strings for CSV; JSONL values are passed through as-is.
+    """
+    first = _first_line(stream)
+    if not first:
+        return
+
+    if fmt == "auto":
+        fmt = detect_format(first)
+
+    lines = itertools.chain([first.lstrip("\ufeff")], stream)
+
+    if fmt == "jsonl":
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if not isinstance(obj, dict):
+                raise ValueError(f"Expected one JSON object per line, got: {line[:80]}")
+            yield obj
+        return
+
+    if sep is None:
+        try:
+            sep = csv.Sniffer().sniff(first, delimiters=_SNIFF_DELIMITERS).delimiter
+        except csv.Error:
+            sep = ","
+
+    for row in csv.DictReader(lines, delimiter=sep):
+        # DictReader puts overflow cells (malformed rows) under the None key
+        row.pop(None, None)
+        yield {k: ("" if v is None else v) for k, v in row.items()}
+
+
+def write_record(record: dict, out: TextIO) -> None:
+    """Write one record as a JSON line and flush so downstream sees it immediately."""
+    out.write(json.dumps(record, ensure_ascii=False))
+    out.write("\n")
+    out.flush()
@@ -0,0 +1,105 @@
+# enricher/timeouts.py
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+# Why a fetch was cut short (counted by FetchTimeouts.cut):
+# - connect_timeout / read_timeout: the configured connect / read timeout expired
+# - adaptive_timeout: the read timeout lowered from the latencies seen so far expired
+# - domain_deadline / row_deadline: the time allowed for one website / one row ran out
+CUT_KINDS = ("connect_timeout", "read_timeout", "adaptive_timeout", "domain_deadline", "row_deadline")
+
+
+@dataclass(frozen=True)
+class TimeoutPolicy:
+    """
+    Fetch time limits on top of the crawl's `timeout` (the read timeout):
+    - connect: connect timeout in seconds (None = same as the read timeout)
+    - domain_budget: seconds for all pages of one website (domain), summed over every crawl
+      of the run that visits it (None = no limit)
+    - adaptive_multiplier: when set, the read timeout is capped at this multiple of the p95
+      latency of successful fetches so far, once `min_samples` were seen, never below
+      `min_timeout` (None = fixed timeouts)
+    - window: number of recent latencies the p95 is computed over
+    """
+    connect: float | None = 5.0
+    domain_budget: float | None = None
+    adaptive_multiplier: float | None = None
+    min_timeout: float = 2.0
+    min_samples: int = 50
+    window: int = 1000
+
+
+class FetchTimeouts:
+    """
+    Run-wide timeout state shared by the crawl workers (thread-safe): recent fetch
+    latencies for the adaptive read timeout, crawl time spent per domain for the domain
+    budget, and how many fetches each limit cut.
+    """
+
+    def __init__(self, policy: TimeoutPolicy | None = None) -> None:
+        self.policy = policy or TimeoutPolicy()
+        self.cuts: Dict[str, int] = dict.fromkeys(CUT_KINDS, 0)
+        self._latencies: deque[float] = deque(maxlen=self.policy.window)
+        self._since_p95 = 0
+        self._p95: float | None = None
+        self._domain_spent: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Latency of a fetch that got an answer (feeds the adaptive timeout)."""
+        if self.policy.adaptive_multiplier is None:
+            return
+        with self._lock:
+            self._latencies.append(seconds)
+            self._since_p95 += 1
+            # the percentile is refreshed every few fetches, not on each one
+            if len(self._latencies) >= self.policy.min_samples and (self._p95 is None or self._since_p95 >= 20):
+                ordered = sorted(self._latencies)
+                self._p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+                self._since_p95 = 0
+
+    @property
+    def p95(self) -> float | None:
+        return self._p95
+
+    def limits(self, timeout: float) -> Tuple[float, float, bool]:
+        """(connect, read, adaptive) timeouts for one fetch; adaptive = read was lowered by the p95 rule."""
+        p = self.policy
+        read = float(timeout)
+        adaptive = False
+        if p.adaptive_multiplier is not None and self._p95 is not None:
+            cap = max(p.min_timeout, self._p95 * p.adaptive_multiplier)
+            if cap < read:
+                read, adaptive = cap, True
+        connect = read if p.connect is None else min(p.connect, read)
+        return connect, read, adaptive
+
+    def domain_time_left(self, domain: str) -> float | None:
+        """Seconds of domain_budget a domain has left (None = no budget)."""
+        if self.policy.domain_budget is None:
+            return None
+        with self._lock:
+            return self.policy.domain_budget - self._domain_spent.get(domain, 0.0)
+
+    def spend(self, domain: str, seconds: float) -> None:
+        """Crawl time spent on a domain (concurrent crawls of it may overrun the budget together)."""
+        if self.policy.domain_budget is None:
+            return
+        with self._lock:
+            self._domain_spent[domain] = self._domain_spent.get(domain, 0.0) + seconds
+
+    def cut(self, kind: str) -> None:
+        with self._lock:
+            self.cuts[kind] += 1
+
+    def summary(self) -> str:
+        parts = " | ".join(f"{k.replace('_', ' ')}: {v}" for k, v in self.cuts.items())
+        line = f"Fetches cut: {parts}"
+        if self._p95 is not None:
+            line += f" | p95 latency {self._p95:.2f}s"
+        return line
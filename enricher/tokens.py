@@ -0,0 +1,81 @@
+# enricher/tokens.py
+from __future__ import annotations
+
+import functools
+import re
+from typing import List, NamedTuple
+
+from .constants import EMAIL_REGEX
+
+# Token kinds (Tokens fields); URL_KINDS is the order discovery takes URL candidates in.
+EMAIL = "email"
+HTTP_URL = "http_url"
+WWW_URL = "www_url"
+DOMAIN = "domain"
+URL_KINDS = (HTTP_URL, WWW_URL, DOMAIN)
+
+# Basic list of commonly used TLD patterns (not exhaustive, but safe)
+# We only use this to avoid obvious false positives like "hello.local" or "abc.def" if you decide.
+# Here we keep it permissive: 2-24 letters (covers most real TLDs).
+DOMAIN_REGEX = re.compile(
+    r"""(?ix)
+    \b
+    (?:[a-z0-9-]+\.)+          # one or more labels + dots
+    [a-z]{2,24}                # tld
+    \b
+    """
+)
+
+HTTP_URL_REGEX = re.compile(r"(?ix)\bhttps?://[^\s<>\"]+")
+WWW_URL_REGEX = re.compile(r"(?ix)\bwww\.[^\s<>\"]+")
+
+# Row fields up to this length are memoized, so the local and discovery stages share one
+# tokenization; longer ones are tokenized on each call.
+TOKENIZE_CACHE_MAX_CHARS = 4096
+
+
+class Tokens(NamedTuple):
+    """
+    Token texts of each kind in a row field, in text order. No positions: neither stage
+    uses offsets, and keeping them (match objects or spans) made tokenizing slower than
+    the findall calls it replaced.
+    """
+    email: List[str]
+    http_url: List[str]
+    www_url: List[str]
+    domain: List[str]
+
+    def texts(self, *kinds: str) -> List[str]:
+        """Token texts of these kinds, kind after kind (a new list)."""
+        return [t for kind in kinds for t in getattr(self, kind)]
+
+
+def _tokenize(text: str) -> Tokens:
+    # a pattern only scans texts holding a substring all its matches contain,
+    # so a plain-words bio costs three substring checks
+    dotted = "." in text
+    return Tokens(
+        EMAIL_REGEX.findall(text) if "@" in text else [],
+        HTTP_URL_REGEX.findall(text) if "://" in text else [],
+        WWW_URL_REGEX.findall(text) if dotted else [],
+        DOMAIN_REGEX.findall(text) if dotted else [],
+    )
+
+
+_tokenize_cached = functools.lru_cache(maxsize=1024)(_tokenize)
+
+
+def tokenize(text: str) -> Tokens:
+    """
+    Emails, http(s) URLs, www URLs and naked domains of a row field (bio_text, bio_links...),
+    computed once per field and shared by the local and discovery stages: a bio scanned
+    for emails is not scanned again for URLs.
+    Each kind is its pattern's non-overlapping matches over the whole text, exactly what
+    the stages found with separate findall calls, so kinds overlap (the domain half of an
+    email is also a DOMAIN token). That is why the kinds are not one alternation regex in a
+    single scan: it would give each character to one kind only and change results.
+    For row fields only: crawled pages want emails alone (EMAIL_REGEX).
+    """
+    if len(text) <= TOKENIZE_CACHE_MAX_CHARS:
+        return _tokenize_cached(text)
+    return _tokenize(text)
@@ -1,26 +1,10 @@
 # enricher/urls.py
 from __future__ import annotations
 
-import re
 from urllib.parse import urlparse, urlunparse
 
 from .constants import BLOCKED_DOMAINS, OPTIONAL_LOW_VALUE_DOMAINS, STRIP_CHARS
-
-
-# Basic list of commonly used TLD patterns (not exhaustive, but safe)
-# We only use this to avoid obvious false positives like "hello.local" or "abc.def" if you decide.
-# Here we keep it permissive: 2-24 letters (covers most real TLDs).
-_DOMAIN_REGEX = re.compile(
-    r"""(?ix)
-    \b
-    (?:[a-z0-9-]+\.)+          # one or more labels + dots
-    [a-z]{2,24}                # tld
-    \b
-    """
-)
-
-_HTTP_URL_REGEX = re.compile(r"(?ix)\bhttps?://[^\s<>\"]+")
-_WWW_URL_REGEX = re.compile(r"(?ix)\bwww\.[^\s<>\"]+")
+from .tokens import DOMAIN_REGEX, URL_KINDS, tokenize
 
 
 def normalize_url(url: str) -> str:
@@ -82,7 +66,7 @@ def is_probable_domain(text: str) -> bool:
     if "@" in t:
         return False
 
-    return bool(_DOMAIN_REGEX.search(t))
+    return bool(DOMAIN_REGEX.search(t))
 
 
 def extract_urls_from_text(text: str) -> list[str]:
@@ -96,20 +80,8 @@ def extract_urls_from_text(text: str) -> list[str]:
     if not text:
         return []
 
-    s = str(text)
-
-    candidates: list[str] = []
-
-    # 1) http(s)
-    candidates.extend(_HTTP_URL_REGEX.findall(s))
-
-    # 2) www.
-    candidates.extend(_WWW_URL_REGEX.findall(s))
-
-    # 3) naked domains (domain.tld)
-    # We will take matches and normalize to https://domain.tld
-    for m in _DOMAIN_REGEX.findall(s):
-        candidates.append(m)
+    # 1) http(s), 2) www., 3) naked domains (domain.tld), normalized to https://domain.tld
+    candidates = tokenize(str(text)).texts(*URL_KINDS)
 
     # Normalize + dedup preserve order
     seen = set()
@@ -0,0 +1,123 @@
+# tests/test_api.py
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pandas as pd
+
+import enricher
+from enricher.api import Enricher, EnricherConfig
+
+
+class FakeCrawl:
+    """Stands in for crawl_for_email; remembers results per URL like the crawl cache does."""
+
+    def __init__(self) -> None:
+        self.fetched: list[str] = []
+        self.cache: dict[str, tuple] = {}
+
+    def __call__(self, url, timeout=10, max_pages=3, **kwargs):
+        if url not in self.cache:
+            self.fetched.append(url)
+            self.cache[url] = ("hi@" + url.split("//")[1].split("/")[0], url, "found", "0.6")
+        return self.cache[url]
+
+
+ROWS = [
+    {"username": "a", "bio_text": "write to me@local.com", "bio_links": ""},
+    {"username": "b", "bio_text": "", "bio_links": "https://site-b.com"},
+    {"username": "c", "bio_text": "nothing here", "bio_links": ""},
+]
+
+
+def test_enrich_rows_keeps_order_and_leaves_inputs_untouched():
+    with Enricher(EnricherConfig(concurrency=2), crawl_fn=FakeCrawl()) as e:
+        out = list(e.enrich_rows(ROWS))
+
+    assert [r["username"] for r in out] == ["a", "b", "c"]
+    assert [r["status"] for r in out] == ["found", "found", "not_found"]
+    assert out[0]["email"] == "me@local.com" and out[1]["email"] == "hi@site-b.com"
+    assert "status" not in ROWS[0]
+
+
+def test_warm_state_is_reused_across_calls():
+    crawl = FakeCrawl()
+    e = Enricher(EnricherConfig(concurrency=2), crawl_fn=crawl)
+    list(e.enrich_rows(ROWS))
+    list(e.enrich_rows(ROWS))
+    assert crawl.fetched == ["https://site-b.com"]
+
+
+def test_enrich_dataframe_with_non_range_index():
+    df = pd.DataFrame(ROWS, index=[10, 5, 7])
+    e = Enricher(EnricherConfig(concurrency=2), crawl_fn=FakeCrawl())
+    out = e.enrich_dataframe(df)
+
+    assert "status" not in df.columns  # copy by default
+    assert out.loc[5, "email"] == "hi@site-b.com"
+    assert out.loc[10, "email"] == "me@local.com"
+    assert out.loc[7, "status"] == "not_found"
+
+
+def test_async_variants_and_package_exports():
+    assert enricher.Enricher is Enricher
+    e = enricher.Enricher(enricher.EnricherConfig(crawl=False))
+
+    async def _collect():
+        rows = [r async for r in e.aenrich_rows(ROWS)]
+        frame = await e.aenrich_dataframe(pd.DataFrame(ROWS))
+        return rows, frame
+
+    rows, frame = asyncio.run(_collect())
+    assert [r["username"] for r in rows] == ["a", "b", "c"]
+    assert rows[1]["external_urls"] == "https://site-b.com" and rows[1]["status"] == "not_found"
+    assert frame["email"].tolist() == ["me@local.com", "", ""]
+
+
+def test_aenrich_rows_stops_the_pipeline_when_the_consumer_leaves():
+    calls = []
+
+    def slow_crawl(url, timeout=10, max_pages=3, **kwargs):
+        calls.append(url)
+        time.sleep(0.02)
+        return "", "", "not_found", ""
+
+    e = Enricher(EnricherConfig(concurrency=1), crawl_fn=slow_crawl)
+    rows = [{"bio_links": f"https://site{i}.com"} for i in range(100)]
+
+    async def _first():
+        agen = e.aenrich_rows(rows)
+        first = await agen.__anext__()
+        await agen.aclose()
+        return first
+
+    assert asyncio.run(_first())["status"] == "not_found"
+    time.sleep(0.3)
+    seen = len(calls)
+    time.sleep(0.2)
+    assert len(calls) == seen < 100
+
+
+def test_aenrich_rows_pipeline_waits_for_a_slow_consumer():
+    crawled = []
+
+    def crawl(url, timeout=10, max_pages=3, **kwargs):
+        crawled.append(url)
+        return "", "", "not_found", ""
+
+    e = Enricher(EnricherConfig(concurrency=1), crawl_fn=crawl)
+    rows = [{"bio_links": f"https://site{i}.com"} for i in range(100)]
+
+    async def _slow():
+        agen = e.aenrich_rows(rows)
+        first = await agen.__anext__()
+        await asyncio.sleep(0.3)  # the consumer is busy: the pipeline must not run ahead
+        ahead = len(crawled)
+        rest = [r async for r in agen]
+        return first, ahead, rest
+
+    first, ahead, rest = asyncio.run(_slow())
+    # 4 rows wait in the async queue, a few more in the pipeline's own bounded queues
+    assert ahead < 30
+    assert len(rest) == 99 and len(crawled) == 100
@@ -0,0 +1,74 @@
+# tests/test_archive.py
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import enricher.crawler as crawler
+from enricher.archive import ArchiveIndex, PageArchive, read_archive
+
+
+def test_archive_round_trip_index_and_truncated_tail(tmp_path: Path):
+    path = tmp_path / "pages.warc.gz"
+    archive = PageArchive(path)
+    archive.write("https://a.com", 200, {"Content-Type": "text/html", "Content-Encoding": "gzip"}, b"<p>v1</p>")
+    archive.write("https://a.com/missing", 404, {}, b"")
+    archive.write("https://a.com", 200, {"Content-Type": "text/html"}, "<p>v2 é</p>".encode())
+    archive.close()
+    # a run killed mid-write leaves a partial record at the end
+    with path.open("ab") as f:
+        f.write(path.read_bytes()[:40])
+
+    pages = list(read_archive(path))
+    assert [(p.url, p.status) for p in pages] == [("https://a.com", 200), ("https://a.com/missing", 404), ("https://a.com", 200)]
+    assert pages[0].headers == (("Content-Type", "text/html"),)  # body is stored decoded
+    assert pages[0].date.endswith("Z")
+
+    index = ArchiveIndex(path)
+    assert len(index) == 2 and "https://a.com/missing" in index
+    assert index.get("https://a.com").body == "<p>v2 é</p>".encode()  # last record wins
+    assert index.get("https://b.com") is None
+    index.close()
+
+
+class _Site(BaseHTTPRequestHandler):
+    pages = {"/": "<p>Écrivez à team@realcompany.com</p>".encode()}
+
+    def do_GET(self) -> None:  # noqa: N802
+        body = self.pages.get(self.path)
+        self.send_response(200 if body is not None else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body or b"")))
+        self.end_headers()
+        self.wfile.write(body or b"")
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def test_archived_crawl_replays_without_network(tmp_path: Path):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Site)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    path = tmp_path / "pages.warc.gz"
+    try:
+        state = crawler.CrawlState(pool_size=2, archive=PageArchive(path))
+        live = crawler.crawl_for_email(base + "/", timeout=5, max_pages=3, state=state)
+        assert crawler.crawl_for_email(base + "/gone", timeout=5, max_pages=1, state=state)[2] == "not_found"
+        state.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    assert live == ("team@realcompany.com", base + "/", "found", "0.6")
+    assert [p.status for p in read_archive(path)] == [200, 404]
+
+    # the server is gone: every page comes from the archive
+    replay_state = crawler.CrawlState(session=crawler.ArchiveSession(ArchiveIndex(path)))
+    try:
+        assert crawler.crawl_for_email(base + "/", timeout=5, max_pages=3, state=replay_state) == live
+        for url in (base + "/gone", base + "/never-fetched"):
+            assert crawler.crawl_for_email(url, timeout=5, max_pages=1, state=replay_state)[2] == "not_found"
+    finally:
+        replay_state.close()
@@ -0,0 +1,30 @@
+# tests/test_benchmarks.py
+from __future__ import annotations
+
+from benchmarks.generate import GeneratorConfig, generate_rows
+from benchmarks.server import BenchServer, SiteProfile, route_crawler_to, site_for
+from enricher import crawler
+
+
+def test_generator_is_deterministic_and_shares_hosts():
+    cfg = GeneratorConfig(rows=500, seed=7)
+    rows = list(generate_rows(cfg))
+    assert rows == list(generate_rows(cfg))
+    sites = [r["bio_links"] for r in rows if "bench.invalid" in r["bio_links"]]
+    assert 150 < len(sites) < 300  # bio_link_rate 0.45
+    assert len(set(sites)) < len(sites)
+
+
+def test_crawler_reaches_virtual_hosts_through_local_server(monkeypatch):
+    profile = SiteProfile(latency_ms=(0, 1), blocked_rate=0, throttled_rate=0, email_home_rate=0, email_contact_rate=1)
+    monkeypatch.setattr(crawler, "make_session", crawler.make_session)  # restored after the test
+    with BenchServer(profile) as server:
+        route_crawler_to(server.port)
+        state = crawler.CrawlState(pool_size=2)
+        host = "site3.bench.invalid"
+        email, src, status, _ = crawler.crawl_for_email(f"https://{host}", timeout=5, max_pages=3, state=state)
+        state.close()
+
+    assert (email, src, status) == (f"hello@{host}", f"https://{host}/contact", "found")
+    assert server.requests >= 2
+    assert site_for(host, profile) == site_for(host, profile)
@@ -1,8 +1,12 @@
 # tests/test_crawler.py
 from __future__ import annotations
 
+import threading
+import time
 import types
 
+import requests
+
 import enricher.crawler as crawler
 
 
@@ -10,6 +14,8 @@ class FakeResponse:
     def __init__(self, status_code: int, text: str):
         self.status_code = status_code
         self.text = text
+        self.content = text.encode()
+        self.headers = {}
 
     @property
     def ok(self) -> bool:
@@ -104,3 +110,251 @@ def test_crawl_for_email_low_value_page_ignored(monkeypatch):
     email, src, status, conf = crawler.crawl_for_email("https://example.com/doc_email", timeout=5, max_pages=1)
     assert status == "not_found"
     assert email == ""
+
+
+def test_crawl_state_caches_result_per_start_url():
+    calls = []
+
+    class FakeSession:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True):
+            calls.append(url)
+            return FakeResponse(200, "<html>hello@realcompany.com</html>")
+
+        def close(self):
+            pass
+
+    state = crawler.CrawlState(session=FakeSession())
+    r1 = crawler.crawl_for_email("https://example.com", timeout=5, max_pages=3, state=state)
+    r2 = crawler.crawl_for_email("https://example.com?utm=1#top", timeout=5, max_pages=3, state=state)
+    assert r1 == r2 == ("hello@realcompany.com", "https://example.com", "found", "0.6")
+    assert len(calls) == 1
+    assert state.cache.hits == 1
+
+
+def test_result_cache_coalesces_concurrent_crawls_of_one_url():
+    cache = crawler.ResultCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_crawl():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ("a@b.com", "https://b.com", "found", "0.6"), True
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_crawl("https://b.com", slow_crawl)))
+    leader.start()
+    started.wait(5)
+    waiters = [
+        threading.Thread(target=lambda: results.append(cache.get_or_crawl("https://b.com", slow_crawl)))
+        for _ in range(3)
+    ]
+    for t in waiters:
+        t.start()
+    while cache.coalesced < 3:
+        time.sleep(0.01)
+    release.set()
+    for t in [leader, *waiters]:
+        t.join(5)
+
+    assert len(calls) == 1 and len(results) == 4
+    assert set(results) == {("a@b.com", "https://b.com", "found", "0.6")}
+    assert cache.misses == 1 and cache.coalesced == 3 and cache.inflight == 0
+
+
+def test_domain_breaker_opens_after_consecutive_failures(monkeypatch):
+    calls = []
+
+    class FailingSession:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True):
+            calls.append(url)
+            raise crawler.requests.ConnectionError("reset")
+
+    state = crawler.CrawlState(session=FailingSession(), breaker=crawler.DomainBreaker(threshold=2))
+    for _ in range(4):
+        assert crawler.fetch_html("https://down.com/x", timeout=1, state=state) == (0, "")
+    assert len(calls) == 2
+    assert state.breaker.is_open("down.com")
+    assert not state.breaker.is_open("up.com")
+
+
+def test_crawl_cost_counts_pages_bytes_and_last_status(monkeypatch):
+    pages = {
+        "https://example.com": (200, '<a href="/contact">contact</a>'),
+        "https://example.com/contact": (404, ""),
+    }
+
+    def fake_get(url, headers=None, timeout=None, allow_redirects=True):
+        code, text = pages[url]
+        resp = FakeResponse(code, text)
+        resp.content = text.encode()
+        return resp
+
+    monkeypatch.setattr(crawler.requests, "get", fake_get)
+
+    cost = crawler.CrawlCost()
+    result = crawler.crawl_for_email("https://example.com", timeout=5, max_pages=3, cost=cost)
+    assert result[2] == "not_found"
+    assert cost.pages == 2
+    assert cost.bytes == len(pages["https://example.com"][1])
+    assert cost.http_status == 404
+
+
+def test_fetch_retries_transient_failures_within_budget():
+    answers = {
+        "https://flaky.com": [crawler.requests.ConnectionError("reset"), FakeResponse(503, ""), FakeResponse(200, "ok")],
+        "https://gone.com": [FakeResponse(404, "")],
+    }
+    calls = []
+
+    class FlakySession:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True):
+            calls.append(url)
+            answer = answers[url].pop(0) if len(answers[url]) > 1 else answers[url][0]
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+    state = crawler.CrawlState(
+        session=FlakySession(),
+        retry=crawler.RetryPolicy(retries=3, base_delay=0.0),
+        retry_budget=crawler.RetryBudget(limit=2),
+    )
+    assert crawler.fetch_html("https://flaky.com", timeout=1, state=state) == (200, "ok")
+    assert state.retry_budget.by_class == {"connect": 1, "5xx": 1}
+
+    # 404 is not transient; and the budget is spent anyway
+    assert crawler.fetch_html("https://gone.com", timeout=1, state=state) == (404, "")
+    assert calls.count("https://gone.com") == 1
+    answers["https://flaky.com"] = [FakeResponse(502, "")]
+    assert crawler.fetch_html("https://flaky.com", timeout=1, state=state) == (502, "")
+    assert state.retry_budget.denied == 1
+
+
+def test_failure_class():
+    exc = crawler.requests.exceptions
+    assert crawler.failure_class(0, exc.ConnectTimeout()) == "connect"
+    assert crawler.failure_class(0, exc.ReadTimeout()) == "read_timeout"
+    assert crawler.failure_class(0, exc.ChunkedEncodingError()) == "read"
+    assert crawler.failure_class(0, exc.InvalidURL()) is None
+    assert crawler.failure_class(503) == "5xx"
+    assert crawler.failure_class(429) is None
+
+
+def test_dns_failures_are_not_retried():
+    import socket
+    from urllib3.exceptions import MaxRetryError, NameResolutionError
+
+    dns = NameResolutionError("parked.example", None, socket.gaierror(-2, "Name or service not known"))
+    error = crawler.requests.ConnectionError(MaxRetryError(None, "/", dns))
+    assert crawler.failure_class(0, error) is None
+    assert crawler.failure_class(0, crawler.requests.ConnectionError(socket.gaierror(-3, "again"))) is None
+    assert crawler.failure_class(0, crawler.requests.ConnectionError("reset")) == "connect"
+
+    calls = []
+
+    class DeadSession:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True):
+            calls.append(url)
+            raise error
+
+    state = crawler.CrawlState(session=DeadSession(), retry=crawler.RetryPolicy(retries=2, base_delay=0.0))
+    assert crawler.fetch_html("https://parked.example", timeout=1, state=state)[0] == 0
+    assert calls == ["https://parked.example"] and state.retry_budget.used == 0
+
+
+class StreamResponse(FakeResponse):
+    raw = None  # no urllib3 read1: bodies are read through iter_content
+
+    def __init__(self, status_code: int, text: str, reads: list):
+        super().__init__(status_code, text)
+        self.reads = reads
+
+    def iter_content(self, size):
+        self.reads.append(self.status_code)
+        return iter([self.text.encode()])
+
+    def close(self):
+        pass
+
+
+def test_speculative_wave_fetches_paths_in_parallel_and_skips_404_bodies():
+    reads, started = [], []
+    barrier = threading.Barrier(3, timeout=5)
+
+    class Session:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True, stream=False):
+            assert stream
+            started.append(url)
+            barrier.wait()  # the whole wave is in flight at once
+            if url == "https://example.com/impressum":
+                return StreamResponse(200, "<p>Impressum: info@realcompany.de</p>", reads)
+            return StreamResponse(404 if url != "https://example.com" else 200, "<p>nothing here</p>", reads)
+
+        def close(self):
+            pass
+
+    state = crawler.CrawlState(session=Session(), speculative_paths=("/contact", "/impressum", "/about"))
+    try:
+        result = crawler.crawl_for_email("https://example.com", timeout=5, max_pages=3, state=state)
+    finally:
+        state.close()
+    assert result == ("info@realcompany.de", "https://example.com/impressum", "found", "0.6")
+    # max_pages caps the wave: /about is never requested
+    assert sorted(started) == ["https://example.com", "https://example.com/contact", "https://example.com/impressum"]
+    assert sorted(reads) == [200, 200]  # the 404 body was not downloaded
+
+
+def test_page_text_decodes_without_charset_detection():
+    assert crawler.page_text(b"<p>hi@realcompany.com</p>") == "<p>hi@realcompany.com</p>"
+    utf8 = "adresse électronique : a@b.fr".encode()
+    assert crawler.page_text(utf8) == "adresse électronique : a@b.fr"  # undeclared: UTF-8 first
+    latin = "adresse électronique".encode("latin-1")
+    assert crawler.page_text(latin, "text/html; charset=ISO-8859-1") == "adresse électronique"
+    assert crawler.page_text(b'<meta charset="latin-1">' + latin) == '<meta charset="latin-1">adresse électronique'
+    assert crawler.page_text(b"caf\xe9", "text/html; charset=bogus") == "café"  # cp1252 fallback
+
+
+def test_fetch_never_runs_requests_charset_detection():
+    class NoDetection(requests.Response):
+        @property
+        def apparent_encoding(self):
+            raise AssertionError("charset detection")
+
+    class Session:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True):
+            r = NoDetection()
+            r.status_code = 200
+            r._content = "Écrivez-nous : team@realcompany.com".encode()
+            return r
+
+        def close(self):
+            pass
+
+    state = crawler.CrawlState(session=Session())
+    assert crawler.fetch_html("https://example.com", timeout=5, state=state) == (200, "Écrivez-nous : team@realcompany.com")
+
+
+def test_speculative_misses_leave_the_page_budget_to_start_page_links():
+    reads: list = []
+    pages = {
+        "https://example.com": (200, '<a href="/team-contact">Contact</a> no email here'),
+        "https://example.com/team-contact": (200, "<p>team@realcompany.com</p>"),
+        "https://example.com/contact-us": (403, ""),
+    }
+
+    class Session:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True, stream=False):
+            return StreamResponse(*pages.get(url, (404, "")), reads)
+
+        def close(self):
+            pass
+
+    state = crawler.CrawlState(session=Session(), speculative_paths=("/contact", "/contact-us"))
+    try:
+        # the guesses miss (404, 403): no site-level status, and the start page's link is followed
+        result = crawler.crawl_for_email("https://example.com", timeout=5, max_pages=3, state=state)
+    finally:
+        state.close()
+    assert result == ("team@realcompany.com", "https://example.com/team-contact", "found", "0.6")
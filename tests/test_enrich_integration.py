@@ -1,11 +1,18 @@
 # tests/test_enrich_integration.py
 from __future__ import annotations
 
+import argparse
+import io
+import json
+import subprocess
+import sys
 from pathlib import Path
 import pandas as pd
 
 import enrich as enrich_module
 
+ROOT = Path(enrich_module.__file__).resolve().parent
+
 
 def test_pipeline_discovers_url_outside_bio_links_and_crawls(monkeypatch, tmp_path: Path):
     # 1) create input CSV (no bio_links)
@@ -22,7 +29,7 @@ def test_pipeline_discovers_url_outside_bio_links_and_crawls(monkeypatch, tmp_pa
     df.to_csv(input_csv, index=False, encoding="utf-8-sig", sep=",")
 
     # 2) monkeypatch crawl_for_email to avoid real HTTP
-    def fake_crawl(url: str, timeout: int = 10, max_pages: int = 3):
+    def fake_crawl(url: str, timeout: int = 10, max_pages: int = 3, **kwargs):
         if "example.com" in url:
             return "hello@realcompany.com", "https://www.example.com/contact", "found", "0.6"
         if "mybusiness.fr" in url:
@@ -63,3 +70,286 @@ def test_pipeline_discovers_url_outside_bio_links_and_crawls(monkeypatch, tmp_pa
 
     assert "mybusiness.fr" in out.loc[1, "external_urls"]
     assert out.loc[1, "email"] == "contact@mybusiness.fr"
+
+
+def test_stream_mode_reads_stdin_and_writes_jsonl(monkeypatch, capsys):
+    def fake_crawl(url: str, timeout: int = 10, max_pages: int = 3, **kwargs):
+        return "contact@mybusiness.fr", url + "/contact", "found", "0.6"
+
+    monkeypatch.setattr(enrich_module, "crawl_for_email", fake_crawl)
+    stdin = "bio_links,bio_text,detected_emails\nhttps://mybusiness.fr,,\n,,me@local.com\n"
+    monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    monkeypatch.setattr("sys.argv", ["enrich.py", "-", "--stream", "--keep-order"])
+
+    enrich_module.main()
+
+    captured = capsys.readouterr()
+    lines = [json.loads(x) for x in captured.out.splitlines()]
+    assert [r["email"] for r in lines] == ["contact@mybusiness.fr", "me@local.com"]
+    assert lines[0]["method"] == "crawl" and lines[1]["method"] == "detected_emails"
+    assert "Run Summary" in captured.err
+
+
+def test_batch_mode_processes_several_files_with_one_crawl_state(monkeypatch, tmp_path: Path, capsys):
+    for name in ("camp1.csv", "camp2.csv"):
+        pd.DataFrame({"bio_links": ["https://shared.com"], "detected_emails": [""]}).to_csv(
+            tmp_path / name, index=False, encoding="utf-8-sig"
+        )
+
+    states = []
+
+    def fake_crawl(url: str, timeout: int = 10, max_pages: int = 3, **kwargs):
+        states.append(kwargs.get("state"))
+        return "team@shared.com", url, "found", "0.6"
+
+    monkeypatch.setattr(enrich_module, "crawl_for_email", fake_crawl)
+    monkeypatch.setattr("sys.argv", ["enrich.py", str(tmp_path / "*.csv")])
+
+    enrich_module.main()
+
+    for name in ("camp1_enriched.csv", "camp2_enriched.csv"):
+        out = pd.read_csv(tmp_path / name, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+        assert out.loc[0, "email"] == "team@shared.com"
+
+    assert len(states) == 2 and states[0] is not None and states[0] is states[1]
+    assert "All files (2)" in capsys.readouterr().out
+
+
+def test_split_run_shards_as_processes_then_merge(tmp_path: Path):
+    n = 30
+    df = pd.DataFrame(
+        {
+            "bio_links": [f"https://site{i % 7}.com" if i % 3 else "" for i in range(n)],
+            "bio_text": [f"write to user{i}@mail.com" if i % 3 == 0 else "" for i in range(n)],
+            "description": [""] * n,
+            "detected_emails": [""] * n,
+        }
+    )
+    input_csv = tmp_path / "camp.csv"
+    df.to_csv(input_csv, index=False, encoding="utf-8-sig")
+
+    # reference: one single-process run
+    single = tmp_path / "single.csv"
+    enrich_module.main([str(input_csv), "--no-crawl", "-o", str(single)])
+
+    shard_dir = tmp_path / "shards"
+    enrich_module.main(["split", str(input_csv), "--shards", "3", "--out-dir", str(shard_dir)])
+    shards = sorted(shard_dir.glob("camp.shard-*.csv"))
+    assert len(shards) == 3
+
+    script = Path(enrich_module.__file__)
+    procs = [
+        subprocess.Popen([sys.executable, str(script), str(s), "--no-crawl"], stdout=subprocess.DEVNULL)
+        for s in shards
+    ]
+    assert [p.wait(timeout=120) for p in procs] == [0, 0, 0]
+
+    merged = tmp_path / "merged.csv"
+    enrich_module.main(["merge", str(shard_dir / "*_enriched.csv"), "-o", str(merged)])
+
+    a = pd.read_csv(single, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    b = pd.read_csv(merged, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    pd.testing.assert_frame_equal(a, b)
+
+
+def test_metrics_files_written_at_end_of_run(monkeypatch, tmp_path: Path):
+    input_csv = tmp_path / "input.csv"
+    pd.DataFrame({"bio_links": ["https://shop.com", ""], "detected_emails": ["", "me@local.com"]}).to_csv(
+        input_csv, index=False, encoding="utf-8-sig"
+    )
+
+    def fake_crawl(url: str, timeout: int = 10, max_pages: int = 3, **kwargs):
+        return "team@shop.com", url, "found", "0.6"
+
+    monkeypatch.setattr(enrich_module, "crawl_for_email", fake_crawl)
+    metrics_json, metrics_prom = tmp_path / "metrics.json", tmp_path / "metrics.prom"
+    enrich_module.main(
+        [str(input_csv), "--progress", "off", "--metrics-json", str(metrics_json), "--metrics-prom", str(metrics_prom)]
+    )
+
+    data = json.loads(metrics_json.read_text())
+    assert {"read", "pipeline", "local", "discovery", "crawl", "write", "stats"} <= set(data["phases"])
+    assert data["phases"]["crawl"]["calls"] == 1
+    assert 'enricher_phase_seconds_total{phase="write"}' in metrics_prom.read_text()
+
+
+def test_profile_writes_one_pstats_per_stage(monkeypatch, tmp_path: Path):
+    input_csv = tmp_path / "input.csv"
+    pd.DataFrame({"bio_links": ["https://shop.com", ""], "detected_emails": ["", "me@local.com"]}).to_csv(
+        input_csv, index=False, encoding="utf-8-sig"
+    )
+
+    def fake_crawl(url: str, timeout: int = 10, max_pages: int = 3, **kwargs):
+        return "team@shop.com", url, "found", "0.6"
+
+    monkeypatch.setattr(enrich_module, "crawl_for_email", fake_crawl)
+    enrich_module.main([str(input_csv), "--progress", "off", "--profile", str(tmp_path / "prof")])
+
+    written = {p.name for p in (tmp_path / "prof").glob("*.pstats")}
+    assert {f"{s}.pstats" for s in ("read", "local", "discovery", "crawl", "write", "stats")} <= written
+    assert "pipeline.pstats" not in written  # its stages profile themselves (no nesting on 3.12+)
+
+
+def test_audit_columns_only_filled_for_crawled_rows(monkeypatch, tmp_path: Path):
+    input_csv = tmp_path / "input.csv"
+    pd.DataFrame({"bio_links": ["https://shop.com", ""], "detected_emails": ["", "me@local.com"]}).to_csv(
+        input_csv, index=False, encoding="utf-8-sig"
+    )
+
+    def fake_crawl(url: str, timeout: int = 10, max_pages: int = 3, cost=None, **kwargs):
+        cost.pages, cost.bytes, cost.http_status = 2, 5120, 200
+        return "team@shop.com", url + "/contact", "found", "0.6"
+
+    monkeypatch.setattr(enrich_module, "crawl_for_email", fake_crawl)
+    out_csv = tmp_path / "out.csv"
+    enrich_module.main([str(input_csv), "-o", str(out_csv), "--progress", "off", "--audit-columns"])
+
+    out = pd.read_csv(out_csv, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    assert list(out.loc[0, ["crawl_pages", "crawl_bytes", "crawl_http_status", "crawl_url_index"]]) == [
+        "2", "5120", "200", "1"
+    ]
+    assert out.loc[1, "crawl_pages"] == "" and out.loc[1, "crawl_seconds"] == ""
+
+
+def test_python_engine_output_is_identical_to_pandas_engine(monkeypatch, tmp_path: Path):
+    input_csv = tmp_path / "input.csv"
+    input_csv.write_text(
+        "bio_links;bio_text;description;detected_emails;note\n"
+        'https://shop.com;"multi\nline; with ""quotes""";;;C:\\path\\x\n'
+        ';écrivez-moi: moi@exemple.fr;;;\n'
+        '\n'
+        ';;voir mybusiness.fr/contact;;  spaced  \n',
+        encoding="utf-8-sig",
+    )
+
+    def fake_crawl(url: str, timeout: int = 10, max_pages: int = 3, **kwargs):
+        if "shop.com" in url:
+            return "team@shop.com", url, "found", "0.6"
+        return "", "", "not_found", ""
+
+    monkeypatch.setattr(enrich_module, "crawl_for_email", fake_crawl)
+    outputs = {}
+    for engine in ("python", "pandas"):
+        out_csv = tmp_path / f"out-{engine}.csv"
+        enrich_module.main([str(input_csv), "-o", str(out_csv), "--progress", "off", "--engine", engine])
+        outputs[engine] = out_csv.read_bytes()
+
+    assert outputs["python"] == outputs["pandas"]
+    assert b"team@shop.com" in outputs["python"] and b"moi@exemple.fr" in outputs["python"]
+
+
+def test_enrich_import_skips_pandas_and_requests():
+    code = (
+        "import sys, enrich; "
+        "print(','.join(m for m in ('pandas', 'requests', 'enricher.crawler') if m in sys.modules))"
+    )
+    res = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert res.stdout.strip() == ""
+
+
+def _cumulative_import_us(module: str) -> int:
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # "import time: <self us> | <cumulative us> | <module>"; the top-level module comes last
+    for line in reversed(res.stderr.splitlines()):
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    raise AssertionError(f"no importtime line for {module}")
+
+
+def test_enrich_import_time_below_pandas_import_time():
+    assert _cumulative_import_us("enrich") < _cumulative_import_us("pandas")
+
+
+def test_plan_mode_reports_without_crawling_or_writing(monkeypatch, tmp_path: Path, capsys):
+    def no_crawl(*args, **kwargs):
+        raise AssertionError("--plan must not crawl")
+
+    monkeypatch.setattr(enrich_module, "crawl_for_email", no_crawl)
+    input_csv = tmp_path / "in.csv"
+    input_csv.write_text(
+        "bio_links,bio_text,detected_emails\nhttps://a.com,,\nhttps://a.com,,\n,see instagram.com/x,\n,,me@local.com\n",
+        encoding="utf-8",
+    )
+    enrich_module.main([str(input_csv), "--plan", "--max-pages", "2", "--concurrency", "4"])
+
+    out = capsys.readouterr().out
+    assert "Unique domains: 1 | unique start URLs: 1" in out
+    assert "Max requests: 2" in out
+    assert "Answered from the result cache: 1 row URLs (1 domains)" in out
+    assert "Blocklisted domains dropped by discovery: 1" in out
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["in.csv"]
+
+
+def test_reextract_replays_archive_through_current_extractors(tmp_path: Path, capsys):
+    from enricher.archive import PageArchive
+
+    archive_path = tmp_path / "pages.warc.gz"
+    archive = PageArchive(archive_path)
+    archive.write("https://mybusiness.fr", 200, {"Content-Type": "text/html"}, b"<p>contact@mybusiness.fr</p>")
+    archive.close()
+    input_csv = tmp_path / "in.csv"
+    input_csv.write_text("bio_links,bio_text\nhttps://mybusiness.fr,\nhttps://notarchived.fr,\n", encoding="utf-8")
+
+    enrich_module.main(["reextract", str(archive_path), str(input_csv)])
+
+    out = pd.read_csv(tmp_path / "in_reextracted.csv", dtype=str, keep_default_na=False)
+    assert out["email"].tolist() == ["contact@mybusiness.fr", ""]
+    assert out["method"].tolist() == ["crawl", ""]
+    assert "Archive pages.warc.gz: 1 pages" in capsys.readouterr().out
+
+
+def test_workers_output_is_identical_to_single_process(monkeypatch, tmp_path: Path):
+    import enricher.pipeline as pipeline
+
+    monkeypatch.setattr(pipeline, "WORKER_CHUNK_ROWS", 3)  # several chunks, some waiting on the pool
+    lines = ["bio_links,bio_text,description,detected_emails,status,external_urls"]
+    for i in range(20):
+        lines.append(f"https://s{i}.com,,,,not_processed,")
+        lines.append(f",write to Me{i}@Mail{i}.fr,,,not_processed,")
+        lines.append(f",,see www.d{i}.io and x{i}.org,x{i}@x.org,not_processed,")
+        # rerun of a row left undecided: discovery finds nothing and keeps its earlier URLs
+        lines.append(f",,nothing here,,not_found,https://old{i}.com")
+    input_csv = tmp_path / "input.csv"
+    input_csv.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def fake_crawl(url: str, timeout: int = 10, max_pages: int = 3, **kwargs):
+        if url.startswith("https://s1"):
+            return "hi@s1.com", url, "found", "0.6"
+        return "", "", "not_found", ""
+
+    monkeypatch.setattr(enrich_module, "crawl_for_email", fake_crawl)
+    outputs = {}
+    for engine in ("python", "pandas"):
+        for workers in ("1", "2"):
+            out_csv = tmp_path / f"out-{engine}-{workers}.csv"
+            argv = [str(input_csv), "-o", str(out_csv), "--progress", "off", "--engine", engine, "--workers", workers]
+            enrich_module.main(argv)
+            outputs[engine, workers] = out_csv.read_bytes()
+
+    assert outputs["python", "2"] == outputs["python", "1"]
+    assert outputs["pandas", "2"] == outputs["pandas", "1"]
+    assert b"me7@mail7.fr" in outputs["pandas", "2"] and b"https://old3.com" in outputs["pandas", "2"]
+
+
+def test_subcommand_parsers_inherit_every_main_option_default():
+    main = vars(enrich_module.build_arg_parser().parse_args(["in.csv"]))
+    split = vars(enrich_module.build_split_parser().parse_args(["in.csv", "--shards", "2"]))
+    reextract = vars(enrich_module.build_reextract_parser().parse_args(["pages.warc.gz", "in.csv"]))
+    serve = vars(enrich_module.build_serve_parser().parse_args([]))
+    assert set(main) <= set(split) and set(main) <= set(reextract) and set(main) - {"input_csv"} <= set(serve)
+    assert split["no_crawl"] and split["concurrency"] == 1 and split["retries"] == 0
+    assert not reextract["no_crawl"] and reextract["archive"] is None and reextract["retries"] == 0
+    assert reextract["concurrency"] == 8 and reextract["engine"] == "auto"  # its own options keep their defaults
+    assert serve["keep_order"] and serve["port"] == 8765
+    assert {k: serve[k] for k in main if k not in ("input_csv", "keep_order")} == {
+        k: v for k, v in main.items() if k not in ("input_csv", "keep_order")
+    }
+    for args in (split, reextract, serve):
+        enrich_module.enricher_config(argparse.Namespace(**args))
@@ -5,7 +5,16 @@ from pathlib import Path
 
 import pandas as pd
 
-from enricher.io_utils import detect_delimiter, read_csv_robust, ensure_columns, write_csv_safe
+from enricher.io_utils import (
+    assign_columns,
+    compact_columns,
+    detect_delimiter,
+    ensure_columns,
+    expand_inputs,
+    memory_footprint,
+    read_csv_robust,
+    write_csv_safe,
+)
 
 
 def test_detect_delimiter_semicolon(tmp_path: Path):
@@ -49,3 +58,49 @@ def test_write_csv_safe_creates_file(tmp_path: Path):
     assert p.exists()
     text = p.read_text(encoding="utf-8-sig")
     assert "a" in text and "b" in text
+
+
+def test_compact_columns_uses_categoricals_and_shrinks_memory():
+    df = ensure_columns(pd.DataFrame({"x": ["1"] * 1000}))
+    df["status"] = ["found", "not_found"] * 500
+    before = memory_footprint(df, ["status", "method", "confidence", "discovery_source"])
+
+    df = compact_columns(df)
+    assert isinstance(df["status"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["discovery_source"].dtype, pd.CategoricalDtype)
+    assert memory_footprint(df, ["status", "method", "confidence", "discovery_source"]) < before
+
+    # known values can be written without extending the categories
+    df.at[0, "status"] = "blocked"
+    df.at[0, "method"] = "crawl"
+    assert (df["status"] == "found").sum() == 499
+
+
+def test_compact_columns_keeps_unknown_input_values(tmp_path: Path):
+    df = ensure_columns(pd.DataFrame({"status": ["custom", "found"]}))
+    df = compact_columns(df)
+    assert list(df["status"]) == ["custom", "found"]
+
+    out = write_csv_safe(df, tmp_path / "out.csv", sep=",")
+    back = pd.read_csv(out, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    assert list(back["status"]) == ["custom", "found"]
+
+
+def test_assign_columns_keeps_dtypes_and_extends_categories():
+    df = compact_columns(ensure_columns(pd.DataFrame({"x": ["a", "b", "c"]})))
+    str_dtype = df["email"].dtype
+    assign_columns(df, {"status": ["found", "custom", "not_found"], "email": ["e@x.com", "", ""]})
+    assert isinstance(df["status"].dtype, pd.CategoricalDtype)
+    assert df["status"].tolist() == ["found", "custom", "not_found"]
+    assert "custom" in df["status"].cat.categories
+    assert df["email"].dtype == str_dtype and df["email"].tolist() == ["e@x.com", "", ""]
+
+
+def test_expand_inputs_files_dirs_and_globs(tmp_path: Path):
+    for name in ("a.csv", "b.csv", "b_enriched.csv", "notes.txt"):
+        (tmp_path / name).write_text("x\n1\n", encoding="utf-8")
+
+    assert expand_inputs([str(tmp_path)]) == [tmp_path / "a.csv", tmp_path / "b.csv"]
+    assert expand_inputs([str(tmp_path / "b*.csv")]) == [tmp_path / "b.csv"]
+    # explicit paths are kept as given, duplicates dropped
+    assert expand_inputs([str(tmp_path / "a.csv"), str(tmp_path)]) == [tmp_path / "a.csv", tmp_path / "b.csv"]
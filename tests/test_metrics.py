@@ -0,0 +1,86 @@
+# tests/test_metrics.py
+from __future__ import annotations
+
+import datetime as dt
+import json
+from types import SimpleNamespace
+
+import enricher.crawler as crawler
+from enricher.metrics import Histogram, LATENCY_BUCKETS, Metrics, MetricsExporter, status_class
+
+
+def test_status_class():
+    assert status_class(200) == "2xx"
+    assert status_class(404) == "4xx"
+    assert status_class(503) == "5xx"
+    assert status_class(0) == "error"
+
+
+def test_histogram_buckets_and_quantiles():
+    h = Histogram(LATENCY_BUCKETS)
+    for v in (0.01, 0.02, 0.03, 0.3, 20.0):
+        h.observe(v)
+    assert h.count == 5
+    assert h.cumulative()[0] == 3  # le=0.05
+    assert h.cumulative()[-1] == 5  # le=+Inf
+    assert 0 < h.quantile(0.5) <= 0.05
+    assert 10.0 < h.quantile(0.99) <= 30.0
+    assert Histogram(LATENCY_BUCKETS).quantile(0.5) is None
+
+
+def test_observe_fetch_records_bytes_and_time_to_headers():
+    m = Metrics()
+    resp = SimpleNamespace(content=b"x" * 120, elapsed=dt.timedelta(milliseconds=40))
+    m.observe_fetch(200, 0.2, resp)
+    m.observe_fetch(0, 1.0, None)
+    snap = m.snapshot()
+    assert snap["fetch"]["requests"] == 2
+    assert snap["fetch"]["bytes_downloaded"] == 120
+    assert set(snap["fetch"]["latency_seconds"]) == {"2xx", "error"}
+    assert snap["fetch"]["time_to_headers_seconds"]["2xx"]["count"] == 1
+
+
+def test_crawl_with_metrics_counts_pages_and_cache():
+    class FakeSession:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True):
+            html = "<html>hello@realcompany.com</html>"
+            return SimpleNamespace(
+                status_code=200, ok=True, text=html, content=html.encode(), headers={},
+                elapsed=dt.timedelta(milliseconds=5),
+            )
+
+        def close(self):
+            pass
+
+    m = Metrics()
+    state = crawler.CrawlState(session=FakeSession(), metrics=m)
+    m.cache = state.cache
+    crawler.crawl_for_email("https://example.com", timeout=5, max_pages=3, state=state)
+    crawler.crawl_for_email("https://example.com", timeout=5, max_pages=3, state=state)
+
+    snap = m.snapshot()
+    assert snap["fetch"]["requests"] == 1
+    assert snap["crawl"]["pages_per_domain"]["count"] == 1
+    assert snap["cache"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_exporter_writes_json_and_prometheus(tmp_path):
+    m = Metrics()
+    with m.phase("read"):
+        pass
+    m.add_time("crawl", 1.5)
+    m.observe_fetch(200, 0.2)
+
+    json_path, prom_path = tmp_path / "m.json", tmp_path / "m.prom"
+    MetricsExporter(m, json_path, prom_path, interval=0).start().stop()
+
+    data = json.loads(json_path.read_text())
+    assert data["phases"]["crawl"] == {"seconds": 1.5, "calls": 1}
+    assert "read" in data["phases"]
+
+    prom = prom_path.read_text()
+    assert 'enricher_phase_seconds_total{phase="crawl"} 1.5' in prom
+    assert 'enricher_fetch_latency_seconds_bucket{status="2xx",le="0.25"} 1' in prom
+    assert 'enricher_fetch_latency_seconds_count{status="2xx"} 1' in prom
+    assert "# TYPE enricher_fetch_latency_seconds histogram" in prom
+    assert not list(tmp_path.glob("*.tmp"))
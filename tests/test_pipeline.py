@@ -0,0 +1,266 @@
+# tests/test_pipeline.py
+from __future__ import annotations
+
+import threading
+import time
+
+from enricher.discovery import DiscoveryConfig
+from enricher.pipeline import PipelineCounters, apply_crawl, crawl_row, run_pipeline, stream_enrich
+from enricher.scheduler import YieldModel
+
+
+def test_crawl_row_stops_at_first_hit_and_counts_failures():
+    calls = []
+
+    def fake_crawl(url, timeout=10, max_pages=3):
+        calls.append(url)
+        if "blocked" in url:
+            return "", "", "blocked", ""
+        if "hit" in url:
+            return "a@hit.com", url, "found", "0.6"
+        return "", "", "not_found", ""
+
+    res = crawl_row(["https://blocked.com", "https://hit.com", "https://never.com"], fake_crawl, 1, 1)
+    assert res.found and res.email == "a@hit.com"
+    assert res.blocked == 1
+    assert calls == ["https://blocked.com", "https://hit.com"]
+
+
+def test_apply_crawl_audit_columns_accumulate_cost_over_urls():
+    def fake_crawl(url, timeout=10, max_pages=3, cost=None):
+        cost.pages += 2
+        cost.bytes += 1000
+        cost.http_status = 200
+        if "hit" in url:
+            return "a@hit.com", url, "found", "0.6"
+        return "", "", "not_found", ""
+
+    record = {"external_urls": "https://miss.com|https://hit.com", "status": "not_found"}
+    apply_crawl(record, fake_crawl, 1, 3, audit=True)
+    assert record["crawl_pages"] == "4" and record["crawl_bytes"] == "2000"
+    assert record["crawl_http_status"] == "200" and record["crawl_url_index"] == "2"
+    assert float(record["crawl_seconds"]) >= 0
+
+    # without audit, crawl_fn is called without cost= and no column is added
+    plain = {"external_urls": "https://hit.com", "status": "not_found"}
+    apply_crawl(plain, lambda u, timeout, max_pages: ("a@hit.com", u, "found", "0.6"), 1, 3)
+    assert "crawl_pages" not in plain and plain["email"] == "a@hit.com"
+
+
+def test_stream_enrich_emits_local_hits_before_slow_crawls():
+    release = threading.Event()
+
+    def slow_crawl(url, timeout=10, max_pages=3):
+        release.wait(5)
+        return "hi@slow.com", url, "found", "0.6"
+
+    records = [
+        {"bio_links": "https://slow.com", "bio_text": "", "description": "", "detected_emails": ""},
+        {"bio_text": "mail me: me@fast.com"},
+    ]
+    gen = stream_enrich(records, DiscoveryConfig(), slow_crawl, concurrency=2)
+
+    first = next(gen)
+    assert first["email"] == "me@fast.com" and first["method"] == "bio_text"
+
+    release.set()
+    second = next(gen)
+    assert second["email"] == "hi@slow.com" and second["method"] == "crawl"
+    assert list(gen) == []
+
+
+def test_stream_enrich_keep_order():
+    def crawl(url, timeout=10, max_pages=3):
+        return "", "", "not_found", ""
+
+    records = [{"bio_links": f"https://site{i}.com"} if i % 2 else {"bio_text": f"u{i}@x.com"} for i in range(20)]
+    out = list(stream_enrich(records, DiscoveryConfig(), crawl, concurrency=4, keep_order=True))
+    assert [r.get("bio_links") or r.get("bio_text") for r in out] == [
+        r.get("bio_links") or r.get("bio_text") for r in records
+    ]
+    assert out[1]["status"] == "not_found" and out[1]["primary_domain"] == "site1.com"
+
+
+def test_run_pipeline_starts_crawling_before_input_is_exhausted():
+    crawl_started = threading.Event()
+    seen_before_end = []
+
+    def crawl(url, timeout=10, max_pages=3):
+        crawl_started.set()
+        return "", "", "not_found", ""
+
+    def records():
+        yield {"bio_links": "https://first.com"}
+        # the producer is still reading input: the first row must already be crawling
+        seen_before_end.append(crawl_started.wait(5))
+        for i in range(10):
+            yield {"bio_text": f"u{i}@x.com"}
+
+    counters = PipelineCounters()
+    out = list(run_pipeline(records(), DiscoveryConfig(), crawl, concurrency=2, queue_size=1, counters=counters))
+    assert seen_before_end == [True]
+    assert sorted(seq for seq, _ in out) == list(range(11))
+    assert counters.rows == 11 and counters.found_local == 10
+    assert counters.prepared == 1 and counters.crawled == 1
+
+
+def test_run_pipeline_orders_crawls_by_yield_and_skips_after_deadline():
+    first_taken = threading.Event()
+    all_queued = threading.Event()
+    crawled = []
+
+    def crawl(url, timeout=10, max_pages=3, deadline=None):
+        first_taken.set()
+        all_queued.wait(5)
+        if url.split("/")[2] not in crawled:
+            crawled.append(url.split("/")[2])
+        return "", "", "not_found", ""
+
+    records = [
+        {"description": "see https://low.com/blog/a/b"},
+        {"bio_links": "https://mid.com"},
+        {"bio_links": "https://top.com/contact"},
+        {"bio_text": "me@local.com"},
+    ]
+
+    def feed():
+        yield records[0]
+        first_taken.wait(5)  # the single worker is now busy with row 0
+        yield from records[1:]
+
+    counters = PipelineCounters()
+    out = dict(
+        run_pipeline(
+            feed(),
+            DiscoveryConfig(),
+            crawl,
+            concurrency=1,
+            counters=counters,
+            on_prepared=lambda c: all_queued.set(),
+            deadline=time.monotonic() + 60,
+            scheduler=YieldModel(),
+        )
+    )
+    # first row was already taken by the single worker; the rest follow by score
+    assert crawled == ["low.com", "top.com", "mid.com"]
+    assert out[3]["status"] == "found"
+
+    expired = list(run_pipeline(records[:2], DiscoveryConfig(), crawl, deadline=time.monotonic() - 1))
+    assert [r["status"] for _, r in expired] == ["skipped_budget", "skipped_budget"]
+
+
+def test_run_pipeline_stops_a_slow_crawl_at_the_run_deadline():
+    from functools import partial
+
+    from enricher.crawler import CrawlState, crawl_for_email
+
+    fetched = []
+
+    class SlowPage:
+        status_code = 200
+        ok = True
+        headers = {}
+        raw = None
+
+        def __init__(self, text):
+            self.text = text
+            self.content = text.encode()
+
+        def iter_content(self, size):
+            return iter([self.content])
+
+        def close(self):
+            pass
+
+    class SlowSession:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True, stream=False):
+            fetched.append(url)
+            time.sleep(0.3)
+            return SlowPage('<a href="/contact">c</a> <a href="/about">a</a> <a href="/privacy">p</a>')
+
+        def close(self):
+            pass
+
+    crawl = partial(crawl_for_email, state=CrawlState(session=SlowSession()))
+    started = time.monotonic()
+    out = list(
+        run_pipeline(
+            [{"bio_links": "https://slow.com"}], DiscoveryConfig(), crawl, max_pages=4, deadline=started + 0.45
+        )
+    )
+    # four pages would take 1.2s: the crawl stops after the page in flight at the deadline
+    assert time.monotonic() - started < 0.9
+    assert len(fetched) == 2
+    assert [r["status"] for _, r in out] == ["skipped_budget"]
+
+
+def test_run_pipeline_marks_rows_skipped_by_a_spent_domain_budget():
+    def crawl(url, timeout=10, max_pages=3):
+        return ("", "", "skipped_budget", "") if "spent" in url else ("", "", "not_found", "")
+
+    records = [{"bio_links": "https://spent.com https://miss.com"}, {"bio_links": "https://miss.com"}]
+    counters = PipelineCounters()
+    out = dict(run_pipeline(records, DiscoveryConfig(max_urls_per_row=2), crawl, counters=counters))
+    assert [out[0]["status"], out[1]["status"]] == ["skipped_budget", "not_found"]
+    assert counters.skipped_budget == 1 and counters.crawled == 1
+
+
+def _racer(delays, found):
+    """Fake crawl_fn: URL -> sleep (interruptible by cancel=) then hit or miss; records full crawls."""
+    finished = []
+
+    def crawl(url, timeout=10, max_pages=3, cancel=None, **kwargs):
+        if cancel.wait(delays[url]):
+            return "", "", "not_found", ""
+        finished.append(url)
+        if url in found:
+            return f"a@{url.split('//')[1]}", url, "found", "0.6"
+        return "", "", "not_found", ""
+
+    return crawl, finished
+
+
+def test_race_row_prefers_higher_priority_hit_within_grace():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from enricher.pipeline import race_row
+
+    urls = ["https://first.com", "https://second.com", "https://third.com"]
+    crawl, finished = _racer({urls[0]: 0.1, urls[1]: 0.0, urls[2]: 5}, found={urls[0], urls[1]})
+    with ThreadPoolExecutor(3) as pool:
+        started = time.monotonic()
+        res = race_row(urls, crawl, 1, 1, pool, grace=1.0)
+    assert res.email == "a@first.com" and res.url_index == 1
+    assert sorted(finished) == urls[:2] and time.monotonic() - started < 2
+
+    # past the grace period, the lower-priority hit wins and the slow URL is cancelled
+    crawl, finished = _racer({urls[0]: 5, urls[1]: 0.0, urls[2]: 0.0}, found={urls[0], urls[1]})
+    with ThreadPoolExecutor(3) as pool:
+        started = time.monotonic()
+        res = race_row(urls, crawl, 1, 1, pool, grace=0.05)
+    assert res.email == "a@second.com" and res.url_index == 2
+    assert urls[0] not in finished and time.monotonic() - started < 2
+
+
+def test_run_pipeline_race_stays_within_concurrency():
+    lock = threading.Lock()
+    active = peak = 0
+
+    def crawl(url, timeout=10, max_pages=3, cancel=None, **kwargs):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return ("hi@x.com", url, "found", "0.6") if "//c" in url else ("", "", "not_found", "")
+
+    records = [
+        {"bio_links": f"https://a{i}.com https://b{i}.com https://c{i}.com", "bio_text": "", "description": ""}
+        for i in range(6)
+    ]
+    cfg = DiscoveryConfig(field_priority=("bio_links",), max_urls_per_row=3)
+    out = [r for _, r in run_pipeline(records, cfg, crawl, concurrency=2, race=True)]
+    assert peak <= 2
+    assert all(r["email"] == "hi@x.com" for r in out)
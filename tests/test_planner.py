@@ -0,0 +1,50 @@
+# tests/test_planner.py
+from __future__ import annotations
+
+from enricher.planner import CrawlPlanner, format_plan
+
+
+def _row(status="not_found", external_urls="", **fields):
+    return {"status": status, "external_urls": external_urls, **fields}
+
+
+def test_planner_counts_requests_cache_hits_and_blocklisted_domains():
+    planner = CrawlPlanner(max_pages=3, concurrency=2, latency=0.5)
+    planner.add(_row(external_urls="https://a.com|https://b.com", bio_links="https://a.com https://b.com"))
+    planner.add(_row(external_urls="https://a.com", bio_text="https://a.com or instagram.com/a"))
+    planner.add(_row(bio_links="https://www.facebook.com/x"))  # discovery kept nothing
+    planner.add(_row(status="found"))
+    plan = planner.result()
+
+    assert (plan.rows, plan.rows_to_crawl, plan.start_urls, plan.domains) == (4, 2, 2, 2)
+    assert plan.max_requests == 6 and plan.by_domain == {"a.com": 3, "b.com": 3}
+    assert (plan.cached_urls, plan.cached_domains) == (1, 1)
+    assert plan.blocklisted == {"instagram.com": 1, "www.facebook.com": 1}
+    # 6 fetches over 2 workers, but the first row crawls its 2 URLs one after another
+    assert plan.projected_seconds == 3.0
+
+    text = format_plan(plan, deadline_seconds=1)
+    assert "Max requests: 6" in text and "a.com: 3" in text and "Exceeds --time-budget" in text
+
+
+def test_planner_sitemap_and_race_urls():
+    planner = CrawlPlanner(max_pages=2, concurrency=100, latency=1.0, sitemap=True, race_urls=True)
+    planner.add(_row(external_urls="https://a.com|https://a.com/shop"))
+    plan = planner.result()
+    # sitemap fetches are counted once per domain; raced URLs overlap in time
+    assert plan.by_domain == {"a.com": 2 + 5 + 2}
+    assert plan.projected_seconds == 7.0
+
+
+def test_planner_counts_wrong_speculative_guesses():
+    paths = ("/contact", "/impressum", "/about", "/legal")
+    planner = CrawlPlanner(max_pages=3, speculative=True, speculative_paths=paths)
+    planner.add(_row(external_urls="https://a.com|https://b.com/contact"))
+    plan = planner.result()
+    # 2 guesses fit next to the start page and may both miss, then 2 pages from its links
+    assert plan.by_domain == {"a.com": 3 + 2, "b.com": 3 + 2}
+    assert plan.max_requests == 10
+
+    planner = CrawlPlanner(max_pages=3, speculative=False, speculative_paths=paths)
+    planner.add(_row(external_urls="https://a.com"))
+    assert planner.result().max_requests == 3
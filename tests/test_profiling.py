@@ -0,0 +1,72 @@
+# tests/test_profiling.py
+from __future__ import annotations
+
+import json
+import pstats
+import threading
+
+from enricher.profiling import StageProfiler, profiled
+
+
+def _work(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+def test_sections_from_several_threads_merge_into_one_file(tmp_path):
+    prof = StageProfiler(tmp_path)
+
+    def worker():
+        for _ in range(3):
+            with prof.section("crawl"):
+                _work(1000)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with prof.section("read"):
+        _work(10)
+
+    paths = prof.write()
+    assert sorted(p.name for p in paths) == ["crawl.pstats", "read.pstats"]
+
+    stats = pstats.Stats(str(tmp_path / "crawl.pstats"))
+    calls = [v[1] for k, v in stats.stats.items() if k[2] == "_work"]
+    assert calls == [9]
+
+
+def test_memory_peaks_per_phase(tmp_path):
+    prof = StageProfiler(tmp_path, memory=True)
+    try:
+        with prof.section("read", memory=True):
+            blob = [bytes(1000) for _ in range(1000)]
+            del blob
+        prof.write()
+    finally:
+        prof.close()
+
+    peaks = json.loads((tmp_path / "memory.json").read_text())["peak_bytes"]
+    assert peaks["read"] >= 1_000_000
+    assert (tmp_path / "read.tracemalloc").exists()
+
+
+def test_profiled_is_noop_without_profiler():
+    with profiled(None, "local"):
+        assert _work(3) == 5
+
+
+def test_memory_only_section_leaves_cprofile_to_nested_stages(tmp_path):
+    prof = StageProfiler(tmp_path, memory=True)
+    try:
+        # as RunContext.phase("pipeline"): only one cProfile may be active on Python 3.12+
+        with prof.section("pipeline", memory=True, cpu=False):
+            with prof.section("local"):
+                _work(100)
+        paths = prof.write()
+    finally:
+        prof.close()
+
+    assert prof.unprofiled == {}
+    assert sorted(p.name for p in paths if p.suffix == ".pstats") == ["local.pstats"]
+    assert json.loads((tmp_path / "memory.json").read_text())["peak_bytes"]["pipeline"] >= 0
@@ -0,0 +1,92 @@
+# tests/test_progress.py
+from __future__ import annotations
+
+import io
+import threading
+import time
+from types import SimpleNamespace
+
+from enricher.progress import ProgressReporter, format_duration, resolve_mode
+
+
+class _Tty(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+def test_resolve_mode_auto_follows_tty():
+    assert resolve_mode("auto", _Tty()) == "bar"
+    assert resolve_mode("auto", io.StringIO()) == "log"
+    assert resolve_mode("off", _Tty()) == "off"
+
+
+def test_format_duration():
+    assert format_duration(None) == "?"
+    assert format_duration(42) == "42s"
+    assert format_duration(192) == "3m12s"
+    assert format_duration(3720) == "1h02m"
+
+
+def test_snapshot_rates_and_eta():
+    counters = SimpleNamespace(completed=0, found_local=0, found_crawl=0)
+    state = SimpleNamespace(pages=0, inflight=3)
+    rep = ProgressReporter(mode="off", state=state)
+    rep.set_stage("crawl", total=100, counters=counters)
+    rep.snapshot()
+
+    time.sleep(0.05)
+    counters.completed, counters.found_local, counters.found_crawl = 50, 10, 5
+    state.pages = 20
+    snap = rep.snapshot()
+
+    assert snap["stage"] == "crawl"
+    assert snap["rows_done"] == 50 and snap["rows_total"] == 100
+    assert snap["found"] == 15 and snap["inflight"] == 3
+    assert snap["rows_per_s"] > 0 and snap["pages_per_s"] > 0
+    assert snap["eta_s"] is not None and snap["eta_s"] < 10
+
+
+def test_log_mode_writes_periodic_logfmt_lines():
+    out = io.StringIO()
+    counters = SimpleNamespace(completed=7, found_local=1, found_crawl=0)
+    with ProgressReporter(mode="log", interval=0.01, stream=out) as rep:
+        rep.set_stage("crawl", total=10, counters=counters)
+        time.sleep(0.1)
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) >= 3
+    assert all(line.startswith("progress stage=") for line in lines)
+    fields = dict(kv.split("=", 1) for kv in lines[-1].split()[1:])
+    assert fields["rows_done"] == "7" and fields["rows_total"] == "10" and fields["found"] == "1"
+
+
+def test_bar_mode_renders_single_refreshed_line():
+    out = _Tty()
+    rep = ProgressReporter(mode="auto", interval=10, stream=out)
+    rep.set_stage("crawl", total=4, counters=SimpleNamespace(completed=1, found_local=0, found_crawl=1))
+    rep.stop()
+    text = out.getvalue()
+    assert text.startswith("\r") and text.endswith("\n")
+    assert "[crawl]" in text and "25.0%" in text and "found 1" in text
+
+
+def test_concurrent_emits_write_whole_lines():
+    class _Slow(io.StringIO):
+        # a write split in two, as a pipe may do with long lines
+        def write(self, text: str) -> int:
+            half = len(text) // 2
+            super().write(text[:half])
+            time.sleep(0.001)
+            return super().write(text[half:])
+
+    out = _Slow()
+    rep = ProgressReporter(mode="log", stream=out)
+    rep.set_stage("crawl", total=10, counters=SimpleNamespace(completed=3, found_local=0, found_crawl=0))
+    threads = [threading.Thread(target=lambda: [rep._emit() for _ in range(20)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 81
+    assert all(line.startswith("progress stage=crawl ") and line.endswith(" eta_s=") for line in lines)
@@ -0,0 +1,32 @@
+# tests/test_retry.py
+from __future__ import annotations
+
+import random
+
+from enricher.retry import RetryBudget, RetryPolicy
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(retries=5, base_delay=0.5, max_delay=2.0)
+    rng = random.Random(1)
+    waits = [policy.backoff(a, rng) for a in range(6) for _ in range(50)]
+    assert all(0.0 <= w <= 2.0 for w in waits)
+    assert max(policy.backoff(0, rng) for _ in range(50)) <= 0.5
+    assert len(set(waits)) > 100  # spread, not a fixed schedule
+
+
+def test_should_retry_by_class_and_attempt():
+    policy = RetryPolicy(retries=2, retry_on=("connect", "5xx"))
+    assert policy.should_retry("connect", 0) and policy.should_retry("5xx", 1)
+    assert not policy.should_retry("5xx", 2)
+    assert not policy.should_retry("read_timeout", 0)
+    assert not policy.should_retry(None, 0)
+
+
+def test_budget_limits_retries_over_the_run():
+    budget = RetryBudget(limit=2)
+    assert budget.acquire("connect") and budget.acquire("5xx")
+    assert not budget.acquire("connect")
+    assert (budget.used, budget.denied) == (2, 1)
+    assert budget.summary() == "Retries: 2 (5xx 1, connect 1) | budget 2, denied 1"
+    assert RetryBudget().acquire("read")
@@ -0,0 +1,51 @@
+# tests/test_scheduler.py
+from __future__ import annotations
+
+from enricher.scheduler import RescoringQueue, YieldModel, url_shape_factor
+
+
+def _row(url: str, source: str = "bio_links", domain: str = "") -> dict:
+    return {"external_urls": url, "discovery_source": source, "primary_domain": domain or url.split("/")[2]}
+
+
+def test_url_shape_factor_prefers_contact_pages():
+    assert url_shape_factor("https://a.com/contact") > url_shape_factor("https://a.com")
+    assert url_shape_factor("https://a.com") > url_shape_factor("https://a.com/blog/2024/post")
+
+
+def test_score_uses_discovery_source_prior():
+    m = YieldModel()
+    assert m.score(_row("https://a.com", "bio_links")) > m.score(_row("https://b.com", "description"))
+    assert m.score({"external_urls": ""}) == 0.0
+
+
+def test_observed_latency_and_hit_rates_drive_the_score():
+    m = YieldModel()
+    slow, fast = _row("https://slow.com"), _row("https://fast.com/x")
+    m.observe(_row("https://slow.com/other"), found=False, seconds=9.0)
+    m.observe(_row("https://fast.com/y"), found=False, seconds=0.5)
+    assert m.score(fast) > m.score(slow)
+
+    # an already-crawled URL is answered from cache: cheapest work of all
+    m.observe(_row("https://cached.com"), found=True, seconds=4.0)
+    assert m.score(_row("https://cached.com")) > m.score(fast)
+
+    before = m.hit_rate("description")
+    for _ in range(20):
+        m.observe(_row("https://d.com", "description"), found=True, seconds=1.0)
+    assert m.hit_rate("description") > before
+
+
+def test_rescoring_queue_reorders_waiting_rows_after_observe():
+    m = YieldModel()
+    q = RescoringQueue(m)
+    bio, desc = _row("https://bio.com", "bio_links"), _row("https://desc.com", "description")
+    for seq, row in enumerate([bio, desc]):
+        q.put((-m.score(row), seq, row))
+    q.put((float("inf"), float("inf"), None))
+    assert m.score(bio) > m.score(desc)
+
+    # both rows are already queued when bio links turn out to miss all the time
+    for _ in range(50):
+        m.observe(_row("https://other.com", "bio_links"), found=False, seconds=3.0)
+    assert [q.get()[2] for _ in range(3)] == [desc, bio, None]
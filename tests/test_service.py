@@ -0,0 +1,69 @@
+# tests/test_service.py
+from __future__ import annotations
+
+import http.client
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from enricher.api import Enricher, EnricherConfig
+from enricher.service import EnrichService, parse_rows
+
+
+def _call(service: EnrichService, path: str, body: object = None) -> tuple[int, object]:
+    host, port = service.address
+    data = None if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    req = urllib.request.Request(f"http://{host}:{port}{path}", data=data, method="POST" if data else "GET")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def fake_crawl(url, timeout=10, max_pages=3, **kwargs):
+    return "hi@" + url.split("//")[1].strip("/"), url, "found", "0.6"
+
+
+def test_parse_rows_single_and_list():
+    assert parse_rows(b'{"bio_text": "x", "followers": 12, "note": null}') == (
+        [{"bio_text": "x", "followers": "12", "note": ""}],
+        True,
+    )
+    assert parse_rows(b'[{"a": "1"}, {"a": "2"}]')[1] is False
+    with pytest.raises(ValueError):
+        parse_rows(b'["not a row"]')
+
+
+def test_serve_enrich_and_stats():
+    enricher = Enricher(EnricherConfig(concurrency=2), crawl_fn=fake_crawl)
+    with EnrichService(enricher, port=0) as service:
+        code, row = _call(service, "/enrich", {"username": "a", "bio_links": "https://site.com"})
+        assert code == 200 and row["email"] == "hi@site.com" and row["username"] == "a"
+
+        code, rows = _call(service, "/enrich", [{"bio_text": "me@local.com"}, {"bio_text": "none"}])
+        assert code == 200 and [r["status"] for r in rows] == ["found", "not_found"]
+
+        assert _call(service, "/enrich", b"{oops")[0] == 400
+        assert _call(service, "/nope")[0] == 404
+
+        code, stats = _call(service, "/stats")
+    assert code == 200
+    assert stats["requests"] == 2 and stats["rows"] == 3 and stats["errors"] == 1
+    assert stats["statuses"] == {"found": 2, "not_found": 1}
+    assert stats["latency_seconds"]["count"] == 2 and stats["latency_seconds"]["p50"] is not None
+
+
+@pytest.mark.parametrize("length, code", [("abc", 400), ("-1", 400), (str(10**9), 413)])
+def test_serve_rejects_bad_content_length(length, code):
+    enricher = Enricher(EnricherConfig(crawl=False))
+    with EnrichService(enricher, port=0) as service:
+        conn = http.client.HTTPConnection(*service.address, timeout=5)
+        conn.putrequest("POST", "/enrich")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        resp = conn.getresponse()
+        assert resp.status == code and "error" in json.loads(resp.read())
+        conn.close()
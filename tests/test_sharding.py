@@ -0,0 +1,57 @@
+# tests/test_sharding.py
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from enricher.sharding import (
+    ROW_ID_COLUMN,
+    assign_shards,
+    merge_frames,
+    merged_path,
+    shard_of,
+    shard_path,
+    split_frame,
+)
+
+
+def test_shard_of_is_stable_and_ignores_www():
+    assert shard_of("mybusiness.fr", 8) == shard_of("www.mybusiness.fr", 8)
+    assert shard_of("MyBusiness.fr", 8) == shard_of("mybusiness.fr", 8)
+    assert all(0 <= shard_of(f"site{i}.com", 3) < 3 for i in range(50))
+
+
+def test_assign_shards_keeps_each_domain_in_one_shard():
+    df = pd.DataFrame({"primary_domain": ["a.com", "b.com", "", "a.com", "www.b.com", ""]})
+    shards = assign_shards(df, 4)
+    assert shards[0] == shards[3]
+    assert shards[1] == shards[4]
+    # rows without a domain are spread round-robin
+    assert shards[2] == 2 % 4 and shards[5] == 5 % 4
+
+
+def test_split_then_merge_restores_order():
+    df = pd.DataFrame({"primary_domain": [f"d{i % 5}.com" for i in range(20)], "v": [str(i) for i in range(20)]})
+    parts = split_frame(df, 3)
+    assert sum(len(p) for p in parts) == 20
+    merged = merge_frames(list(reversed(parts)))
+    assert ROW_ID_COLUMN not in merged.columns
+    assert merged.equals(df)
+
+
+def test_merge_detects_missing_shard():
+    df = pd.DataFrame({"primary_domain": ["", "", "", ""], "v": ["0", "1", "2", "3"]})
+    parts = split_frame(df, 2)
+    with pytest.raises(ValueError):
+        merge_frames([parts[0], parts[0]])
+    with pytest.raises(ValueError):
+        merge_frames([parts[0]])
+
+
+def test_shard_and_merged_paths():
+    p = shard_path(Path("/data/camp.csv"), 0, 12)
+    assert p == Path("/data/camp.shard-01-of-12.csv")
+    out = p.with_name(p.stem + "_enriched.csv")
+    assert merged_path(out) == Path("/data/camp_enriched.csv")
@@ -0,0 +1,113 @@
+# tests/test_sitemap.py
+from __future__ import annotations
+
+import gzip
+
+import enricher.crawler as crawler
+from enricher.sitemap import SitemapCache, contact_urls, find_contact_urls, parse_sitemap
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+URLSET = f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS}>
+  <url><loc>https://site.com/</loc></url>
+  <url><loc>https://site.com/blog/how-to-contact-your-bank</loc><lastmod>2024-01-01</lastmod></url>
+  <url><loc>https://site.com/about</loc></url>
+  <url><loc>https://site.com/contact</loc></url>
+  <url><loc>https://other.com/contact</loc></url>
+</urlset>""".encode()
+
+INDEX = f"""<sitemapindex {NS}>
+  <sitemap><loc>https://site.com/post-sitemap.xml</loc></sitemap>
+  <sitemap><loc>https://site.com/page-sitemap.xml</loc></sitemap>
+</sitemapindex>""".encode()
+
+
+def _chunks(data: bytes, size: int = 7):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_parse_sitemap_streams_urlsets_indexes_and_gzip():
+    pages, children = parse_sitemap(_chunks(URLSET))
+    assert len(pages) == 5 and children == []
+    assert parse_sitemap(_chunks(INDEX))[1] == ["https://site.com/post-sitemap.xml", "https://site.com/page-sitemap.xml"]
+    assert parse_sitemap(_chunks(gzip.compress(URLSET)), gzipped=True)[0] == pages
+    # truncated / malformed: what was read so far
+    assert parse_sitemap([URLSET[:200]])[0] == ["https://site.com/"]
+    assert parse_sitemap([b"<html><body>Not found"]) == ([], [])
+
+
+def test_contact_urls_ranked_and_same_domain():
+    pages = parse_sitemap([URLSET])[0]
+    assert contact_urls(pages, "site.com") == [
+        "https://site.com/contact",
+        "https://site.com/blog/how-to-contact-your-bank",
+        "https://site.com/about",
+    ]
+
+
+def test_find_contact_urls_follows_index_and_cache_fetches_once():
+    bodies = {
+        "https://site.com/sitemap_index.xml": INDEX,
+        "https://site.com/page-sitemap.xml": URLSET,
+        "https://site.com/post-sitemap.xml": f"<urlset {NS}></urlset>".encode(),
+    }
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return _chunks(bodies[url]) if url in bodies else None
+
+    cache = SitemapCache(limit=1)
+    assert cache.contact_urls("https://site.com", fetch) == ["https://site.com/contact"]
+    # the page sitemap is read before the post sitemap
+    assert fetched == [
+        "https://site.com/sitemap.xml",
+        "https://site.com/sitemap_index.xml",
+        "https://site.com/page-sitemap.xml",
+        "https://site.com/post-sitemap.xml",
+    ]
+    assert cache.contact_urls("https://site.com/shop", fetch) == ["https://site.com/contact"]
+    assert len(fetched) == 4 and cache.fetched == 1
+    assert find_contact_urls("https://none.com", fetch) == []
+
+
+class _Response:
+    def __init__(self, status_code, body=b"", content_type="text/html"):
+        self.status_code = status_code
+        self.body = body
+        self.text = body.decode()
+        self.content = body
+        self.headers = {"Content-Type": content_type}
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 300
+
+    def iter_content(self, size):
+        return _chunks(self.body, size)
+
+    def close(self):
+        pass
+
+
+def test_crawl_visits_sitemap_contact_page_first():
+    pages = {
+        "https://site.com/sitemap.xml": _Response(200, URLSET, "application/xml"),
+        "https://site.com/contact": _Response(200, b"<p>hello@site.com</p>"),
+        "https://site.com": _Response(200, b"<p>no email, js app</p>"),
+    }
+    visited = []
+
+    class Session:
+        def get(self, url, headers=None, timeout=None, allow_redirects=True, stream=False):
+            visited.append(url)
+            return pages.get(url, _Response(404))
+
+        def close(self):
+            pass
+
+    state = crawler.CrawlState(session=Session(), sitemaps=SitemapCache())
+    result = crawler.crawl_for_email("https://site.com", timeout=5, max_pages=1, state=state)
+    assert result == ("hello@site.com", "https://site.com/contact", "found", "0.6")
+    assert visited == ["https://site.com/sitemap.xml", "https://site.com/contact"]
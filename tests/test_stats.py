@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import pandas as pd
 
-from enricher.stats import compute_stats, format_stats
+from enricher.stats import combine_stats, compute_stats, format_stats
 
 
 def test_compute_stats_counts_correctly():
@@ -39,3 +39,27 @@ def test_format_stats_contains_key_lines():
     assert "Run Summary" in txt
     assert "Total rows" in txt
     assert "Found (total)" in txt
+
+
+def test_combine_stats_sums_files():
+    a = compute_stats(pd.DataFrame({"status": ["found"], "method": ["crawl"], "external_urls": ["https://a.com"]}))
+    b = compute_stats(pd.DataFrame({"status": ["not_found", "blocked"], "method": ["", ""], "external_urls": ["", ""]}))
+    total = combine_stats([a, b])
+    assert total.total_rows == 3
+    assert total.found_crawl == 1
+    assert total.blocked == 1 and total.not_found == 1
+    assert total.prepared_with_external_urls == 1
+
+
+def test_skipped_budget_is_counted_and_reported():
+    df = pd.DataFrame(
+        {
+            "status": ["found", "skipped_budget", "skipped_budget"],
+            "method": ["crawl", "", ""],
+            "external_urls": ["https://a.com", "https://b.com", "https://c.com"],
+        }
+    )
+    s = compute_stats(df)
+    assert s.skipped_budget == 2
+    assert "Skipped (time budget): 2" in format_stats(s)
+    assert "Skipped" not in format_stats(compute_stats(df.head(1)))
@@ -0,0 +1,34 @@
+# tests/test_streaming.py
+from __future__ import annotations
+
+import io
+import json
+
+from enricher.streaming import read_records, write_record
+
+
+def test_read_records_csv_auto_sniffs_delimiter():
+    src = io.StringIO("\ufeffbio_text;detected_emails\nhello;a@b.com\n\nbye;\n")
+    rows = list(read_records(src))
+    assert rows == [
+        {"bio_text": "hello", "detected_emails": "a@b.com"},
+        {"bio_text": "bye", "detected_emails": ""},
+    ]
+
+
+def test_read_records_jsonl_auto():
+    src = io.StringIO('{"bio_text": "x", "n": 1}\n\n{"bio_text": "y"}\n')
+    rows = list(read_records(src))
+    assert rows == [{"bio_text": "x", "n": 1}, {"bio_text": "y"}]
+
+
+def test_read_records_empty_stream():
+    assert list(read_records(io.StringIO(""))) == []
+
+
+def test_write_record_one_json_line():
+    out = io.StringIO()
+    write_record({"email": "café@x.fr"}, out)
+    line = out.getvalue()
+    assert line.endswith("\n") and line.count("\n") == 1
+    assert json.loads(line) == {"email": "café@x.fr"}
@@ -0,0 +1,88 @@
+# tests/test_timeouts.py
+from __future__ import annotations
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import enricher.crawler as crawler
+from enricher.timeouts import FetchTimeouts, TimeoutPolicy
+
+
+def test_adaptive_read_timeout_follows_p95():
+    t = FetchTimeouts(TimeoutPolicy(connect=3.0, adaptive_multiplier=3.0, min_timeout=0.5, min_samples=20))
+    assert t.limits(10) == (3.0, 10.0, False)  # not enough samples yet
+    for i in range(100):
+        t.observe(0.1 + i / 1000)  # 0.100 .. 0.199
+    assert 0.19 <= t.p95 <= 0.2
+    connect, read, adaptive = t.limits(10)
+    assert adaptive and abs(read - 3 * t.p95) < 1e-9 and connect == read
+    assert t.limits(0.4) == (0.4, 0.4, False)  # never above the configured timeout
+
+
+def test_domain_budget_is_shared_by_every_crawl_of_a_domain():
+    t = FetchTimeouts(TimeoutPolicy(domain_budget=10.0))
+    t.spend("a.com", 4.0)
+    t.spend("a.com", 3.5)
+    assert t.domain_time_left("a.com") == 2.5 and t.domain_time_left("b.com") == 10.0
+    assert FetchTimeouts().domain_time_left("a.com") is None
+
+
+def test_fixed_timeouts_ignore_latencies():
+    t = FetchTimeouts(TimeoutPolicy(connect=None))
+    for _ in range(100):
+        t.observe(0.01)
+    assert t.p95 is None and t.limits(7) == (7.0, 7.0, False)
+
+
+class _Tarpit(BaseHTTPRequestHandler):
+    """Answers at once, then drips the body one byte every 50 ms; /slow waits before answering."""
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path == "/slow":
+            time.sleep(1.5)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", "100")
+        self.end_headers()
+        try:
+            for _ in range(100):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.05)
+        except OSError:
+            pass
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def test_deadlines_cut_slow_dripping_servers_and_timeouts_are_counted():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Tarpit)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    try:
+        state = crawler.CrawlState(pool_size=2)
+        started = time.monotonic()
+        res = crawler.crawl_for_email(base + "/", timeout=5, max_pages=1, state=state, deadline=started + 0.5)
+        assert res[2] == "not_found" and time.monotonic() - started < 2
+        assert state.timeouts.cuts["row_deadline"] == 1
+        assert len(state.cache) == 0  # cut by the row deadline: not cached
+
+        state = crawler.CrawlState(pool_size=2, timeouts=FetchTimeouts(TimeoutPolicy(domain_budget=0.5)))
+        crawler.crawl_for_email(base + "/", timeout=5, max_pages=1, state=state)
+        assert state.timeouts.cuts["domain_deadline"] == 1 and len(state.cache) == 1
+        # the budget is per website: another start URL on the same domain gets what is left (nothing)
+        started = time.monotonic()
+        res = crawler.crawl_for_email(base + "/other", timeout=5, max_pages=1, state=state)
+        assert res[2] == "skipped_budget" and time.monotonic() - started < 0.1
+        assert state.timeouts.cuts["domain_deadline"] == 2
+        assert len(state.cache) == 1  # not a real miss: not cached
+
+        state = crawler.CrawlState(pool_size=2)
+        crawler.crawl_for_email(base + "/slow", timeout=1, max_pages=1, state=state)
+        assert state.timeouts.cuts["read_timeout"] == 1
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,49 @@
+# tests/test_tokens.py
+from __future__ import annotations
+
+from enricher.constants import EMAIL_REGEX
+from enricher.tokens import (
+    DOMAIN,
+    DOMAIN_REGEX,
+    EMAIL,
+    HTTP_URL,
+    HTTP_URL_REGEX,
+    TOKENIZE_CACHE_MAX_CHARS,
+    URL_KINDS,
+    WWW_URL,
+    WWW_URL_REGEX,
+    tokenize,
+)
+
+TEXTS = [
+    "",
+    "just words, no links",
+    "Contact: Jane.Doe@Shop.example.fr or https://www.shop.fr/contact?x=1 (www.other.io)",
+    "mail me a@b.co|see http://x.com/www.y.com and foo.bar.baz",
+    "<a href=\"https://q.org\">q.org</a> v1.2 e.g. end.",
+    "@handle only",
+    "x" * (TOKENIZE_CACHE_MAX_CHARS + 1) + " long@page.com www.long.com",
+]
+
+
+def test_tokens_match_each_pattern_over_whole_text():
+    for text in TEXTS:
+        tokens = tokenize(text)
+        assert tokens.texts(EMAIL) == EMAIL_REGEX.findall(text)
+        assert tokens.texts(HTTP_URL) == HTTP_URL_REGEX.findall(text)
+        assert tokens.texts(WWW_URL) == WWW_URL_REGEX.findall(text)
+        assert tokens.texts(DOMAIN) == DOMAIN_REGEX.findall(text)
+        assert tokens.texts(*URL_KINDS) == (
+            HTTP_URL_REGEX.findall(text) + WWW_URL_REGEX.findall(text) + DOMAIN_REGEX.findall(text)
+        )
+
+
+def test_tokens_cached_per_row_field():
+    text = "write to a@b.com or visit www.b.com"
+    tokens = tokenize(text)
+    assert tokenize(text) is tokens  # short fields: one tokenization shared by both stages
+    # the domain half of an email is a DOMAIN token too
+    assert tokens.texts(DOMAIN) == ["b.com", "www.b.com"]
+    # callers get their own lists
+    tokens.texts(EMAIL).append("x")
+    assert tokens.texts(EMAIL) == ["a@b.com"]